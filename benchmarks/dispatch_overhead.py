@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/17 23:58
+# @Author  : Tuffy
+# @Description : 视图集视图与普通FastAPI路由的单次请求耗时对比，在仓库根目录执行 python -m benchmarks.dispatch_overhead
+import argparse
+import asyncio
+import time
+from typing import Dict, List
+
+from fastapi import APIRouter, FastAPI
+
+from fast_cbv import Action, BaseViewSet
+
+
+class SingletonViewSet(BaseViewSet):
+    lifecycle = "singleton"
+
+    @Action.get("/item")
+    async def item(self, q: int = 0):
+        return {"q": q}
+
+
+class PerRequestViewSet(SingletonViewSet):
+    lifecycle = "per_request"
+
+
+class PooledViewSet(SingletonViewSet):
+    lifecycle = "pooled"
+
+
+def create_app() -> FastAPI:
+    app_ = FastAPI()
+
+    @app_.get("/plain/item")
+    async def item(q: int = 0):
+        return {"q": q}
+
+    router_ = APIRouter()
+    for viewset_ in (SingletonViewSet, PerRequestViewSet, PooledViewSet):
+        viewset_.register(router_)
+    app_.include_router(router_)
+    return app_
+
+
+async def request_time(app: FastAPI, path: str, iterations: int) -> float:
+    """
+    直接调用ASGI应用，返回每次请求的平均微秒数，不包括网络与HTTP客户端的开销
+    """
+    scope_ = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET", "scheme": "http",
+        "path": path, "raw_path": path.encode(), "root_path": "", "query_string": b"q=1", "headers": [],
+        "client": ("127.0.0.1", 1), "server": ("test", 80),
+    }
+    status_: List[int] = []
+
+    async def receive() -> Dict:
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message: Dict) -> None:
+        if message["type"] == "http.response.start":
+            status_.append(message["status"])
+
+    for _ in range(min(iterations, 1000)):
+        await app(scope_, receive, send)
+    assert status_ and all(s == 200 for s in status_), f"{path} returned {set(status_)}"
+    start_ = time.perf_counter()
+    for _ in range(iterations):
+        await app(scope_, receive, send)
+    return (time.perf_counter() - start_) / iterations * 1e6
+
+
+async def main(iterations: int, rounds: int) -> None:
+    app_ = create_app()
+    paths_ = {
+        "plain FastAPI": "/plain/item",
+        "singleton": "/singleton/item",
+        "per_request": "/per_request/item",
+        "pooled": "/pooled/item",
+    }
+    # 取多轮中的最小值，减少其它进程的干扰
+    results_: Dict[str, float] = {}
+    for _ in range(rounds):
+        for name_, path_ in paths_.items():
+            us_ = await request_time(app_, path_, iterations)
+            results_[name_] = min(results_.get(name_, us_), us_)
+    baseline_ = results_["plain FastAPI"]
+    print(f"{'route':<16}{'us/request':>12}{'overhead':>12}")
+    for name_, us_ in results_.items():
+        print(f"{name_:<16}{us_:>12.2f}{us_ - baseline_:>+12.2f}")
+
+
+if __name__ == "__main__":
+    parser_ = argparse.ArgumentParser()
+    parser_.add_argument("--iterations", type=int, default=20000)
+    parser_.add_argument("--rounds", type=int, default=3)
+    args_ = parser_.parse_args()
+    asyncio.run(main(args_.iterations, args_.rounds))
@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/17 23:59
+# @Author  : Tuffy
+# @Description : timed_query、timed_build的额外耗时，未开启统计时超过预算(每次1微秒)则以非0状态退出，
+#                在仓库根目录执行 python -m benchmarks.metrics_overhead
+import argparse
+import asyncio
+import sys
+import time
+from typing import Callable, Dict
+
+from fast_cbv.metrics import ViewTimings, current_timings, timed_build, timed_query
+
+BUDGET_NS = 1000
+
+
+async def _query() -> list:
+    return [1]
+
+
+def _build() -> list:
+    return [1]
+
+
+async def query_ns(iterations: int, timed: bool) -> float:
+    start_ = time.perf_counter_ns()
+    if timed:
+        for _ in range(iterations):
+            await timed_query(_query())
+    else:
+        for _ in range(iterations):
+            await _query()
+    return (time.perf_counter_ns() - start_) / iterations
+
+
+async def build_ns(iterations: int, timed: bool) -> float:
+    start_ = time.perf_counter_ns()
+    if timed:
+        for _ in range(iterations):
+            timed_build(_build)
+    else:
+        for _ in range(iterations):
+            _build()
+    return (time.perf_counter_ns() - start_) / iterations
+
+
+async def overhead(measure: Callable, iterations: int, rounds: int) -> float:
+    """
+    计时与不计时的差值，取多轮中的最小值
+    """
+    timed_ = min([await measure(iterations, True) for _ in range(rounds)])
+    plain_ = min([await measure(iterations, False) for _ in range(rounds)])
+    return timed_ - plain_
+
+
+async def main(iterations: int, rounds: int) -> Dict[str, float]:
+    results_ = {}
+    for enabled_ in (False, True):
+        token_ = current_timings.set(ViewTimings() if enabled_ else None)
+        try:
+            state_ = "enabled" if enabled_ else "disabled"
+            results_[f"timed_query ({state_})"] = await overhead(query_ns, iterations, rounds)
+            results_[f"timed_build ({state_})"] = await overhead(build_ns, iterations, rounds)
+        finally:
+            current_timings.reset(token_)
+    return results_
+
+
+if __name__ == "__main__":
+    parser_ = argparse.ArgumentParser()
+    parser_.add_argument("--iterations", type=int, default=200000)
+    parser_.add_argument("--rounds", type=int, default=5)
+    args_ = parser_.parse_args()
+    results_ = asyncio.run(main(args_.iterations, args_.rounds))
+    for name_, ns_ in results_.items():
+        print(f"{name_:<26}{ns_:>10.0f} ns")
+    over_ = [name_ for name_, ns_ in results_.items() if "disabled" in name_ and ns_ > BUDGET_NS]
+    if over_:
+        print(f"Over the {BUDGET_NS} ns budget: {', '.join(over_)}")
+        sys.exit(1)
@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/17 23:59
+# @Author  : Tuffy
+# @Description : 大量视图集的定义与注册耗时，在仓库根目录执行 python -m benchmarks.register_many
+import argparse
+import time
+from typing import List
+
+from fastapi import APIRouter, FastAPI
+
+from fast_cbv import Action, BaseViewSet, register_many
+
+
+class BaseResourceViewSet(BaseViewSet):
+    @Action.get("/all")
+    async def all(self):
+        return []
+
+    @Action.get("/{pk}")
+    async def get(self, pk: int):
+        return {"id": pk}
+
+    @Action.post("")
+    async def create(self, name: str):
+        return {"name": name}
+
+    @Action.patch("/{pk}")
+    async def update(self, pk: int, name: str):
+        return {"id": pk, "name": name}
+
+    @Action.delete("/{pk}")
+    async def delete(self, pk: int):
+        return {"id": pk}
+
+
+def define_viewsets(count: int) -> List[type]:
+    """
+    定义count个继承同一组视图的视图集，每个视图集5个视图
+    """
+    return [type(f"Resource{idx_}ViewSet", (BaseResourceViewSet,), {}) for idx_ in range(count)]
+
+
+def main(count: int) -> None:
+    start_ = time.perf_counter()
+    viewsets_ = define_viewsets(count)
+    defined_ = time.perf_counter()
+    router_ = APIRouter()
+    register_many(router_, viewsets_)
+    registered_ = time.perf_counter()
+    app_ = FastAPI()
+    app_.include_router(router_)
+    included_ = time.perf_counter()
+
+    routes_ = len(router_.routes)
+    print(f"{count} viewsets, {routes_} routes")
+    print(f"{'define':<16}{(defined_ - start_) * 1000:>10.1f} ms")
+    print(f"{'register_many':<16}{(registered_ - defined_) * 1000:>10.1f} ms ({(registered_ - defined_) / routes_ * 1e6:.1f} us/route)")
+    print(f"{'include_router':<16}{(included_ - registered_) * 1000:>10.1f} ms")
+
+
+if __name__ == "__main__":
+    parser_ = argparse.ArgumentParser()
+    parser_.add_argument("--count", type=int, default=300)
+    main(parser_.parse_args().count)
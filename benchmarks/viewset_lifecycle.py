@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/18 17:50
+# @Author  : Tuffy
+# @Description : 视图集实例持有构造成本较高的状态时，singleton、per_request、pooled 三种生命周期的单次请求耗时对比，
+#                在仓库根目录执行 python -m benchmarks.viewset_lifecycle
+import argparse
+import asyncio
+from typing import Dict
+
+from fastapi import APIRouter, FastAPI
+
+from fast_cbv import Action, BaseViewSet
+from .dispatch_overhead import request_time
+
+
+class LookupViewSet(BaseViewSet):
+    lifecycle = "singleton"
+    table_size = 2000
+
+    def __init__(self):
+        # 模拟实例持有的预计算查找表、客户端等状态
+        self.table = {f"k{idx_}": idx_ * idx_ for idx_ in range(self.table_size)}
+
+    @Action.get("/item")
+    async def item(self, q: int = 0):
+        return {"q": self.table[f"k{q}"]}
+
+
+class LookupPerRequestViewSet(LookupViewSet):
+    lifecycle = "per_request"
+
+
+class LookupPooledViewSet(LookupViewSet):
+    lifecycle = "pooled"
+
+
+def create_app() -> FastAPI:
+    router_ = APIRouter()
+    for viewset_ in (LookupViewSet, LookupPerRequestViewSet, LookupPooledViewSet):
+        viewset_.register(router_)
+    app_ = FastAPI()
+    app_.include_router(router_)
+    return app_
+
+
+async def main(iterations: int, rounds: int) -> None:
+    app_ = create_app()
+    paths_ = {
+        "per_request": "/lookup_per_request/item",
+        "singleton": "/lookup/item",
+        "pooled": "/lookup_pooled/item",
+    }
+    # 取多轮中的最小值，减少其它进程的干扰
+    results_: Dict[str, float] = {}
+    for _ in range(rounds):
+        for name_, path_ in paths_.items():
+            us_ = await request_time(app_, path_, iterations)
+            results_[name_] = min(results_.get(name_, us_), us_)
+    baseline_ = results_["per_request"]
+    print(f"{'lifecycle':<16}{'us/request':>12}{'saved':>12}")
+    for name_, us_ in results_.items():
+        print(f"{name_:<16}{us_:>12.2f}{baseline_ - us_:>+12.2f}")
+
+
+if __name__ == "__main__":
+    parser_ = argparse.ArgumentParser()
+    parser_.add_argument("--iterations", type=int, default=5000)
+    parser_.add_argument("--rounds", type=int, default=3)
+    args_ = parser_.parse_args()
+    asyncio.run(main(args_.iterations, args_.rounds))
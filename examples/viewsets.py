@@ -21,7 +21,7 @@ class UserViewSet(BaseViewSet):
     @Action("", methods=["POST"], response_model=UserPydantic)
     async def create(self, user: UserCreatePydantic):
         create_dict_ = user.dict(exclude={"password_again"})
-        create_dict_["password"] = make_password(user.password)
+        create_dict_["password"] = await self.run_in_executor(make_password, user.password)
         # 生成uid
         pre_ = arrow.now(tz=LOCAL_TIMEZONE).format("YYMM")
         suf_ = await User.filter(uid__startswith=pre_).count()
@@ -45,7 +45,7 @@ class UserViewSet(BaseViewSet):
         # 密码加密
         update_dict_ = user.dict(exclude={"password_again"}, exclude_unset=True, exclude_defaults=True)
         if "password" in update_dict_:
-            update_dict_["password"] = make_password(update_dict_["password"])
+            update_dict_["password"] = await self.run_in_executor(make_password, update_dict_["password"])
         await User.filter(uid=uid).update(**update_dict_)
         return await UserPydantic.from_queryset_single(User.get(uid=uid))
 
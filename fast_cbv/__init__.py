@@ -2,6 +2,23 @@
 # @Time    : 2021/11/26 16:39
 # @Author  : Tuffy
 # @Description : 
+from importlib import import_module
 
-from .viewsets import BaseViewSet
+from .viewsets import BaseViewSet, register_many
+from .cache import BaseCacheBackend, MemoryCacheBackend
 from .decorators import Action
+from .metrics import BaseMetricsSink, HistogramMetricsSink, prometheus_endpoint
+
+# 依赖tortoise的模块在第一次访问时导入，只使用Action的服务不会导入orm
+_lazy_imports = {
+    "QuerySetStreamingResponse": ".streaming",
+    "FilterSet": ".filters",
+}
+
+
+def __getattr__(name: str):
+    if name in _lazy_imports:
+        value_ = getattr(import_module(_lazy_imports[name], __name__), name)
+        globals()[name] = value_
+        return value_
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/17 22:05
+# @Author  : Tuffy
+# @Description :
+import asyncio
+from typing import List, Optional, Set, Tuple, Type
+
+from tortoise.models import MODEL
+from tortoise.transactions import in_transaction
+
+from .db import ConnectionRouter
+
+
+class CreateBatcher(object):
+    """
+    合并并发的创建请求：window秒内到达或累计max_size条的数据在一个事务中插入，减少提交次数。
+    主键不由数据库生成时以一条 bulk_create 插入；数据库生成主键时 bulk_create 不会回填主键，改为在同一事务中逐条插入。
+    整批插入失败(例如唯一约束冲突)时逐条重新插入，每个请求得到各自的结果或异常
+
+        batcher = CreateBatcher(Company, window=0.002, max_size=100)
+        obj = await batcher.create(Company(name="a"))
+    """
+
+    def __init__(
+        self,
+        model: Type[MODEL],
+        window: float,
+        max_size: int = 100,
+        db: Optional[ConnectionRouter] = None,
+    ):
+        """
+        Args:
+            model: orm模型
+            window: 第一条数据到达后等待合并的秒数
+            max_size: 每批的最大数量，达到后立即插入
+            db: 插入使用的连接，默认使用模型默认的连接
+        """
+        self.model = model
+        self.window = window
+        self.max_size = max(1, max_size)
+        self.db = db or ConnectionRouter()
+        self.__pending: List[Tuple[MODEL, "asyncio.Future[MODEL]"]] = []
+        self.__timer: Optional[asyncio.TimerHandle] = None
+        self.__tasks: Set["asyncio.Task[None]"] = set()
+
+    async def create(self, obj: MODEL) -> MODEL:
+        """
+        加入待插入的批次，插入完成后返回已保存的obj
+        """
+        future_ = asyncio.get_running_loop().create_future()
+        self.__pending.append((obj, future_))
+        if len(self.__pending) >= self.max_size:
+            self.__flush()
+        elif len(self.__pending) == 1:
+            self.__timer = asyncio.get_running_loop().call_later(self.window, self.__flush)
+        return await future_
+
+    def __flush(self) -> None:
+        if self.__timer is not None:
+            self.__timer.cancel()
+            self.__timer = None
+        batch_, self.__pending = self.__pending, []
+        # 保留任务的引用，避免执行中被回收
+        task_ = asyncio.get_running_loop().create_task(self.__insert(batch_))
+        self.__tasks.add(task_)
+        task_.add_done_callback(self.__tasks.discard)
+
+    async def __insert(self, batch: List[Tuple[MODEL, "asyncio.Future[MODEL]"]]) -> None:
+        # 已取消的请求不再插入
+        batch = [(obj_, future_) for obj_, future_ in batch if not future_.done()]
+        if not batch:
+            return
+        try:
+            async with in_transaction(self.db.write_connection or self.model._meta.default_connection) as conn_:
+                if self.model._meta.pk.generated:
+                    for obj_, _ in batch:
+                        await obj_.save(using_db=conn_)
+                else:
+                    await self.model.bulk_create([obj_ for obj_, _ in batch], using_db=conn_)
+        except Exception:
+            for obj_, future_ in batch:
+                await self.__insert_one(obj_, future_)
+            return
+        for obj_, future_ in batch:
+            if not future_.done():
+                future_.set_result(obj_)
+
+    async def __insert_one(self, obj: MODEL, future: "asyncio.Future[MODEL]") -> None:
+        if future.done():
+            return
+        try:
+            await obj.save(using_db=self.db.write(), force_create=True)
+        except Exception as e:
+            if not future.done():
+                future.set_exception(e)
+            return
+        if not future.done():
+            future.set_result(obj)
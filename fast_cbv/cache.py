@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/17 14:10
+# @Author  : Tuffy
+# @Description :
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+
+class BaseCacheBackend(object):
+    """
+    视图集响应缓存的存储后端，缓存内容为序列化后的响应字节；
+    跨进程共享缓存时继承此类实现对应的存储(例如Redis)
+    """
+
+    async def get(self, key: str) -> Optional[bytes]:
+        """
+        获取缓存，不存在或已过期返回None
+        """
+        raise NotImplementedError
+
+    async def set(self, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        """
+        设置缓存
+        Args:
+            key: 缓存键
+            value: 响应字节
+            ttl: 过期秒数，为None时不过期
+        """
+        raise NotImplementedError
+
+    async def delete_prefix(self, prefix: str) -> None:
+        """
+        删除指定前缀的全部缓存
+        """
+        raise NotImplementedError
+
+
+class MemoryCacheBackend(BaseCacheBackend):
+    """
+    进程内的LRU缓存，超过maxsize时淘汰最久未使用的缓存
+    """
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self.__store: "OrderedDict[str, Tuple[Optional[float], bytes]]" = OrderedDict()
+
+    async def get(self, key: str) -> Optional[bytes]:
+        item_ = self.__store.get(key)
+        if item_ is None:
+            return None
+        expire_at_, value_ = item_
+        if expire_at_ is not None and expire_at_ <= time.monotonic():
+            del self.__store[key]
+            return None
+        self.__store.move_to_end(key)
+        return value_
+
+    async def set(self, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        self.__store[key] = (None if ttl is None else time.monotonic() + ttl, value)
+        self.__store.move_to_end(key)
+        while len(self.__store) > self.maxsize:
+            self.__store.popitem(last=False)
+
+    async def delete_prefix(self, prefix: str) -> None:
+        for key_ in [k for k in self.__store if k.startswith(prefix)]:
+            del self.__store[key_]
+
+    def clear(self) -> None:
+        self.__store.clear()
@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/17 21:10
+# @Author  : Tuffy
+# @Description :
+from contextvars import ContextVar
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    from tortoise.backends.base.client import BaseDBAsyncClient
+
+# 写入后记录主库期限的cookie，期限内该客户端的读请求使用主库
+PRIMARY_COOKIE = "fast_cbv_primary_until"
+# 当前请求的读操作是否使用主库
+use_primary: ContextVar[bool] = ContextVar("fast_cbv_use_primary", default=False)
+
+
+class ConnectionRouter(object):
+    """
+    视图使用的数据库连接：读视图使用read_connection，写视图使用write_connection；
+    客户端写入后的read_your_writes期间读操作也使用write_connection。
+    连接名称为Tortoise配置中connections的名称，为None时使用模型默认的连接
+    """
+
+    def __init__(self, read_connection: Optional[str] = None, write_connection: Optional[str] = None):
+        from tortoise import connections
+
+        self.read_connection = read_connection
+        self.write_connection = write_connection
+        self.__connections = connections
+
+    def read(self) -> Optional["BaseDBAsyncClient"]:
+        """
+        读操作使用的连接
+        """
+        name_ = self.write_connection if use_primary.get() else self.read_connection
+        return None if name_ is None else self.__connections.get(name_)
+
+    def write(self) -> Optional["BaseDBAsyncClient"]:
+        """
+        写操作使用的连接
+        """
+        return None if self.write_connection is None else self.__connections.get(self.write_connection)
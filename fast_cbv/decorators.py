@@ -7,8 +7,10 @@ from typing import (
     Callable,
     Dict,
     List,
+    NamedTuple,
     Optional,
     Sequence,
+    Tuple,
     Type,
     Union,
 )
@@ -20,6 +22,59 @@ from fastapi.responses import ORJSONResponse, Response
 from fastapi.types import DecoratedCallable
 from starlette.routing import BaseRoute
 
+# ViewSpec中只在视图集转发时使用的字段
+_DISPATCH_OPTIONS = ("cache", "mutating", "max_concurrency", "max_queue", "timeout", "executor", "query_budget")
+
+
+class ViewSpec(NamedTuple):
+    """
+    视图的路由参数，创建后不可修改；注册时由 route_params 生成每个路由各自的参数，
+    同一个视图集可以注册到多个路由，子类也可以继承父类的视图
+    """
+    path: str
+    methods: Optional[Tuple[str, ...]]
+    response_model: Optional[Type[Any]]
+    status_code: Optional[int]
+    tags: Optional[Tuple[str, ...]]
+    dependencies: Optional[Tuple[params.Depends, ...]]
+    summary: Optional[str]
+    description: Optional[str]
+    response_description: str
+    responses: Optional[Dict[Union[int, str], Dict[str, Any]]]
+    deprecated: Optional[bool]
+    operation_id: Optional[str]
+    response_model_include: Optional[Union[SetIntStr, DictIntStrAny]]
+    response_model_exclude: Optional[Union[SetIntStr, DictIntStrAny]]
+    response_model_by_alias: bool
+    response_model_exclude_unset: bool
+    response_model_exclude_defaults: bool
+    response_model_exclude_none: bool
+    include_in_schema: bool
+    response_class: Type[Response]
+    name: Optional[str]
+    callbacks: Optional[List[BaseRoute]]
+    openapi_extra: Optional[Dict[str, Any]]
+    # 视图集转发时使用的选项，不会传递给FastAPI
+    cache: bool  # 视图集配置了cache_backend时缓存响应，开启single_flight时合并相同参数的并发请求
+    mutating: bool  # 执行成功后使视图集的缓存失效
+    max_concurrency: Optional[int]  # 同时执行的最大数量，为None时使用视图集的配置
+    max_queue: Optional[int]  # 达到max_concurrency后等待执行的最大数量，为None时使用视图集的配置
+    timeout: Optional[float]  # 执行的最大秒数，超时取消并返回504，为None时使用视图集的配置
+    executor: Optional[str]  # 执行视图的池："thread"、"process"，为None时同步视图在线程池中执行，异步视图在事件循环中执行
+    query_budget: Optional[int]  # 每个请求允许执行的最大SQL数量，为None时使用视图集的配置
+
+    def route_params(self) -> Dict[str, Any]:
+        """
+        生成FastAPI add_api_route 的参数，每次调用返回新的字典
+        """
+        params_ = self._asdict()
+        for key_ in _DISPATCH_OPTIONS:
+            del params_[key_]
+        for key_ in ("methods", "tags", "dependencies"):
+            if params_[key_] is not None:
+                params_[key_] = list(params_[key_])
+        return params_
+
 
 class Action(object):
     def __init__(
@@ -48,35 +103,49 @@ class Action(object):
         name: Optional[str] = None,
         callbacks: Optional[List[BaseRoute]] = None,
         openapi_extra: Optional[Dict[str, Any]] = None,
+        cache: bool = False,
+        mutating: bool = False,
+        max_concurrency: Optional[int] = None,
+        max_queue: Optional[int] = None,
+        timeout: Optional[float] = None,
+        executor: Optional[str] = None,
+        query_budget: Optional[int] = None,
     ):
-        self.__fast_params = {
-            "path": path,
-            "response_model": response_model,
-            "status_code": status_code,
-            "tags": tags,
-            "dependencies": dependencies,
-            "summary": summary,
-            "description": description,
-            "response_description": response_description,
-            "responses": responses,
-            "deprecated": deprecated,
-            "methods": methods,
-            "operation_id": operation_id,
-            "response_model_include": response_model_include,
-            "response_model_exclude": response_model_exclude,
-            "response_model_by_alias": response_model_by_alias,
-            "response_model_exclude_unset": response_model_exclude_unset,
-            "response_model_exclude_defaults": response_model_exclude_defaults,
-            "response_model_exclude_none": response_model_exclude_none,
-            "include_in_schema": include_in_schema,
-            "response_class": response_class,
-            "name": name,
-            "callbacks": callbacks,
-            "openapi_extra": openapi_extra,
-        }
+        self.__spec = ViewSpec(
+            path=path,
+            methods=None if methods is None else tuple(methods),
+            response_model=response_model,
+            status_code=status_code,
+            tags=None if tags is None else tuple(tags),
+            dependencies=None if dependencies is None else tuple(dependencies),
+            summary=summary,
+            description=description,
+            response_description=response_description,
+            responses=responses,
+            deprecated=deprecated,
+            operation_id=operation_id,
+            response_model_include=response_model_include,
+            response_model_exclude=response_model_exclude,
+            response_model_by_alias=response_model_by_alias,
+            response_model_exclude_unset=response_model_exclude_unset,
+            response_model_exclude_defaults=response_model_exclude_defaults,
+            response_model_exclude_none=response_model_exclude_none,
+            include_in_schema=include_in_schema,
+            response_class=response_class,
+            name=name,
+            callbacks=callbacks,
+            openapi_extra=openapi_extra,
+            cache=cache,
+            mutating=mutating,
+            max_concurrency=max_concurrency,
+            max_queue=max_queue,
+            timeout=timeout,
+            executor=executor,
+            query_budget=query_budget,
+        )
 
     def __call__(self, func: Callable) -> DecoratedCallable:
-        func.__dict__["__fast_view__"] = self.__fast_params
+        func.__dict__["__fast_view__"] = self.__spec
         return func
 
     @staticmethod
@@ -104,6 +173,13 @@ class Action(object):
         name: Optional[str] = None,
         callbacks: Optional[List[BaseRoute]] = None,
         openapi_extra: Optional[Dict[str, Any]] = None,
+        cache: bool = False,
+        mutating: bool = False,
+        max_concurrency: Optional[int] = None,
+        max_queue: Optional[int] = None,
+        timeout: Optional[float] = None,
+        executor: Optional[str] = None,
+        query_budget: Optional[int] = None,
     ):
         return Action(
             path,
@@ -129,6 +205,13 @@ class Action(object):
             name=name,
             callbacks=callbacks,
             openapi_extra=openapi_extra,
+            cache=cache,
+            mutating=mutating,
+            max_concurrency=max_concurrency,
+            max_queue=max_queue,
+            timeout=timeout,
+            executor=executor,
+            query_budget=query_budget,
         )
 
     @staticmethod
@@ -156,6 +239,13 @@ class Action(object):
         name: Optional[str] = None,
         callbacks: Optional[List[BaseRoute]] = None,
         openapi_extra: Optional[Dict[str, Any]] = None,
+        cache: bool = False,
+        mutating: bool = False,
+        max_concurrency: Optional[int] = None,
+        max_queue: Optional[int] = None,
+        timeout: Optional[float] = None,
+        executor: Optional[str] = None,
+        query_budget: Optional[int] = None,
     ):
         return Action(
             path,
@@ -181,6 +271,13 @@ class Action(object):
             name=name,
             callbacks=callbacks,
             openapi_extra=openapi_extra,
+            cache=cache,
+            mutating=mutating,
+            max_concurrency=max_concurrency,
+            max_queue=max_queue,
+            timeout=timeout,
+            executor=executor,
+            query_budget=query_budget,
         )
 
     @staticmethod
@@ -208,6 +305,13 @@ class Action(object):
         name: Optional[str] = None,
         callbacks: Optional[List[BaseRoute]] = None,
         openapi_extra: Optional[Dict[str, Any]] = None,
+        cache: bool = False,
+        mutating: bool = False,
+        max_concurrency: Optional[int] = None,
+        max_queue: Optional[int] = None,
+        timeout: Optional[float] = None,
+        executor: Optional[str] = None,
+        query_budget: Optional[int] = None,
     ):
         return Action(
             path,
@@ -233,6 +337,13 @@ class Action(object):
             name=name,
             callbacks=callbacks,
             openapi_extra=openapi_extra,
+            cache=cache,
+            mutating=mutating,
+            max_concurrency=max_concurrency,
+            max_queue=max_queue,
+            timeout=timeout,
+            executor=executor,
+            query_budget=query_budget,
         )
 
     @staticmethod
@@ -260,6 +371,13 @@ class Action(object):
         name: Optional[str] = None,
         callbacks: Optional[List[BaseRoute]] = None,
         openapi_extra: Optional[Dict[str, Any]] = None,
+        cache: bool = False,
+        mutating: bool = False,
+        max_concurrency: Optional[int] = None,
+        max_queue: Optional[int] = None,
+        timeout: Optional[float] = None,
+        executor: Optional[str] = None,
+        query_budget: Optional[int] = None,
     ):
         return Action(
             path,
@@ -285,6 +403,13 @@ class Action(object):
             name=name,
             callbacks=callbacks,
             openapi_extra=openapi_extra,
+            cache=cache,
+            mutating=mutating,
+            max_concurrency=max_concurrency,
+            max_queue=max_queue,
+            timeout=timeout,
+            executor=executor,
+            query_budget=query_budget,
         )
 
     @staticmethod
@@ -312,6 +437,13 @@ class Action(object):
         name: Optional[str] = None,
         callbacks: Optional[List[BaseRoute]] = None,
         openapi_extra: Optional[Dict[str, Any]] = None,
+        cache: bool = False,
+        mutating: bool = False,
+        max_concurrency: Optional[int] = None,
+        max_queue: Optional[int] = None,
+        timeout: Optional[float] = None,
+        executor: Optional[str] = None,
+        query_budget: Optional[int] = None,
     ):
         return Action(
             path,
@@ -337,4 +469,11 @@ class Action(object):
             name=name,
             callbacks=callbacks,
             openapi_extra=openapi_extra,
+            cache=cache,
+            mutating=mutating,
+            max_concurrency=max_concurrency,
+            max_queue=max_queue,
+            timeout=timeout,
+            executor=executor,
+            query_budget=query_budget,
         )
@@ -0,0 +1,732 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/17 14:35
+# @Author  : Tuffy
+# @Description :
+import asyncio
+import hashlib
+import math
+import time
+from collections import deque
+from datetime import datetime, timezone
+from decimal import Decimal
+from email.utils import format_datetime, parsedate_to_datetime
+from functools import update_wrapper
+from inspect import Parameter, Signature
+from types import MethodType
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, Sequence, Tuple
+
+import orjson
+from fastapi import HTTPException, status
+from fastapi.datastructures import DefaultPlaceholder
+from fastapi.dependencies.utils import get_typed_signature
+from fastapi.routing import serialize_response
+from fastapi.types import DecoratedCallable
+from fastapi.utils import create_cloned_field, create_response_field, is_body_allowed_for_status_code
+from pydantic import BaseModel
+from starlette.requests import ClientDisconnect, Request
+from starlette.responses import Response
+
+from .cache import BaseCacheBackend
+from .db import PRIMARY_COOKIE, use_primary
+from .executors import ViewExecutor
+from .metrics import BaseMetricsSink, ViewTimings, current_timings
+from .queries import QueryRecorder, budget_listeners, current_recorder
+from .lifecycle import BaseInstanceProvider, PerRequestProvider, SingletonProvider
+
+# (请求, FastAPI注入的Response, 视图参数)，视图设置的状态码、响应头与cookie在注入的Response中
+ViewCall = Callable[[Request, Response, Dict[str, Any]], Awaitable[Any]]
+ViewLayer = Callable[[ViewCall], ViewCall]
+# 将视图返回值渲染为响应 (请求, 注入的Response, 返回值)
+ViewRenderer = Callable[[Request, Response, Any], Awaitable[Response]]
+# 根据请求参数获取数据的版本(etag, 最后修改时间)，无法获取时返回None
+ViewValidator = Callable[[Dict[str, Any]], Awaitable[Optional[Tuple[str, Optional[datetime]]]]]
+REQUEST_PARAM_NAME = "fast_cbv_request"
+RESPONSE_PARAM_NAME = "fast_cbv_response"
+_UNCACHED_HEADERS = frozenset({b"content-length", b"set-cookie"})
+_DISCONNECTED_DETAIL = {"error": "client_disconnected", "message": "The client disconnected before the view finished"}
+
+
+def view_signature(view_func: DecoratedCallable) -> Signature:
+    """
+    获取视图函数去掉self后的签名，字符串形式的注解在视图函数所在模块中解析
+    """
+    sig_ = get_typed_signature(view_func)
+    return sig_.replace(parameters=list(sig_.parameters.values())[1:])
+
+
+def params_key(view_kwargs: Dict[str, Any]) -> Optional[str]:
+    """
+    根据视图收到的参数生成稳定的摘要，用于缓存等需要按请求参数区分的场景；视图声明的Request、Response参数不计入。
+    参数包含orjson不能直接编码的对象(例如依赖注入的用户对象)时无法按值区分请求，返回None，调用方不应缓存或合并
+    """
+    params_ = {name_: value_ for name_, value_ in view_kwargs.items() if not isinstance(value_, (Request, Response))}
+    try:
+        dumped_ = orjson.dumps(params_, default=_key_default, option=orjson.OPT_SORT_KEYS)
+    except TypeError:
+        return None
+    return hashlib.blake2b(dumped_, digest_size=16).hexdigest()
+
+
+def _key_default(value: Any) -> Any:
+    """
+    按值编码查询参数中常见的非JSON原生类型，其它对象不编码
+    """
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, BaseModel):
+        return value.dict()
+    raise TypeError
+
+
+def create_renderer(fast_view: Dict, view_name: str) -> ViewRenderer:
+    """
+    创建视图返回值的渲染方法，与FastAPI处理视图返回值的方式一致：Response原样返回，
+    其它返回值按response_model校验、编码后以路由的response_class构造响应，
+    并合并视图或依赖通过注入的Response设置的状态码、响应头与cookie
+    Args:
+        fast_view: 视图的路由参数
+        view_name: 视图名称
+
+    Returns:
+        ViewRenderer: 渲染响应的协程方法
+    """
+    field_ = None
+    if fast_view["response_model"] is not None:
+        field_ = create_cloned_field(create_response_field(name=f"Response_{view_name}", type_=fast_view["response_model"]))
+    status_code_ = fast_view["status_code"]
+
+    async def render(request: Request, response: Response, result: Any) -> Response:
+        if isinstance(result, Response):
+            return result
+        content_ = await serialize_response(
+            field=field_,
+            response_content=result,
+            include=fast_view["response_model_include"],
+            exclude=fast_view["response_model_exclude"],
+            by_alias=fast_view["response_model_by_alias"],
+            exclude_unset=fast_view["response_model_exclude_unset"],
+            exclude_defaults=fast_view["response_model_exclude_defaults"],
+            exclude_none=fast_view["response_model_exclude_none"],
+        )
+        # 注册到路由后路由的response_class已合并路由器的default_response_class
+        response_class_ = getattr(request.scope.get("route"), "response_class", fast_view["response_class"])
+        if isinstance(response_class_, DefaultPlaceholder):
+            response_class_ = response_class_.value
+        current_status_code_ = response.status_code or status_code_
+        if current_status_code_ is None:
+            response_ = response_class_(content_)
+        else:
+            response_ = response_class_(content_, status_code=current_status_code_)
+        if not is_body_allowed_for_status_code(response_.status_code):
+            response_.body = b""
+        response_.headers.raw.extend(response.headers.raw)
+        return response_
+
+    return render
+
+
+def cache_layer(backend: BaseCacheBackend, prefix: str, ttl: Optional[float], render: ViewRenderer) -> ViewLayer:
+    """
+    缓存视图渲染后的完整响应，包括状态码与响应头(Content-Type等)，命中时原样重放；
+    只缓存有body的2xx响应，流式输出不缓存；Set-Cookie不缓存，命中时只合并本次请求的依赖设置的cookie
+    Args:
+        backend: 缓存后端
+        prefix: 缓存键前缀
+        ttl: 缓存秒数
+        render: 视图返回值的渲染方法
+
+    Returns:
+        ViewLayer: 视图调用的包装
+    """
+
+    def layer(call: ViewCall) -> ViewCall:
+        async def cached_call(request: Request, response: Response, view_kwargs: Dict[str, Any]) -> Any:
+            params_ = params_key(view_kwargs)
+            if params_ is None:
+                return await call(request, response, view_kwargs)
+            # read_your_writes期间读主库，不能使用其它请求从副本读到的缓存
+            key_ = f"{prefix}{int(use_primary.get())}:{params_}"
+            cached_ = await backend.get(key_)
+            if cached_ is not None:
+                return _copy_cookies(_unpack_response(cached_), response)
+            response_ = await render(request, response, await call(request, response, view_kwargs))
+            if 200 <= response_.status_code < 300 and hasattr(response_, "body"):
+                await backend.set(key_, _pack_response(response_), ttl)
+            return response_
+
+        return cached_call
+
+    return layer
+
+
+def _pack_response(response: Response) -> bytes:
+    """
+    将响应打包为缓存内容：第一行为JSON格式的 [状态码, 响应头]，之后为body；Content-Length在读取时重新计算，Set-Cookie不缓存
+    """
+    headers_ = [
+        [key_.decode("latin-1"), value_.decode("latin-1")]
+        for key_, value_ in response.raw_headers
+        if key_ not in _UNCACHED_HEADERS
+    ]
+    return orjson.dumps([response.status_code, headers_]) + b"\n" + response.body
+
+
+def _unpack_response(cached: bytes) -> Response:
+    meta_, body_ = cached.split(b"\n", 1)
+    status_code_, headers_ = orjson.loads(meta_)
+    response_ = Response(body_, status_code=status_code_)
+    response_.raw_headers.extend((key_.encode("latin-1"), value_.encode("latin-1")) for key_, value_ in headers_)
+    return response_
+
+
+def _copy_cookies(response: Response, source: Response) -> Response:
+    """
+    将source的Set-Cookie添加到response，不执行视图而直接返回的响应(缓存命中、304)保留本次请求设置的cookie
+    """
+    response.raw_headers.extend(header_ for header_ in source.headers.raw if header_[0] == b"set-cookie")
+    return response
+
+
+def invalidate_layer(backend: BaseCacheBackend, prefix: str) -> ViewLayer:
+    """
+    视图执行成功后删除指定前缀的缓存
+    Args:
+        backend: 缓存后端
+        prefix: 缓存键前缀
+
+    Returns:
+        ViewLayer: 视图调用的包装
+    """
+
+    def layer(call: ViewCall) -> ViewCall:
+        async def invalidating_call(request: Request, response: Response, view_kwargs: Dict[str, Any]) -> Any:
+            result_ = await call(request, response, view_kwargs)
+            if not isinstance(result_, Response) or result_.status_code < 400:
+                await backend.delete_prefix(prefix)
+            return result_
+
+        return invalidating_call
+
+    return layer
+
+
+def deadline_layer(timeout: Optional[float], cancel_on_disconnect: bool = True) -> ViewLayer:
+    """
+    限制视图的执行时间：超过timeout秒或客户端断开连接时取消视图，正在执行的查询随之取消并归还连接，返回504。
+    视图直接返回流式响应时只限制创建响应的时间
+    Args:
+        timeout: 执行的最大秒数，为None时不限制
+        cancel_on_disconnect: 客户端断开连接时是否取消视图
+
+    Returns:
+        ViewLayer: 视图调用的包装
+    """
+
+    def layer(call: ViewCall) -> ViewCall:
+        async def deadline_call(request: Request, response: Response, view_kwargs: Dict[str, Any]) -> Any:
+            if cancel_on_disconnect and not request._stream_consumed:
+                # 先读取并缓存请求体，视图读取请求体时不会与监听断开连接冲突；
+                # FastAPI已读取请求体时不再读取，Form、File参数的请求体以流的方式读取，不会缓存，再次读取会抛出异常
+                try:
+                    await request.body()
+                except ClientDisconnect:
+                    raise HTTPException(status_code=status.HTTP_504_GATEWAY_TIMEOUT, detail=_DISCONNECTED_DETAIL)
+            view_ = asyncio.ensure_future(call(request, response, view_kwargs))
+            tasks_ = {view_}
+            if cancel_on_disconnect:
+                tasks_.add(asyncio.ensure_future(_wait_disconnect(request)))
+            try:
+                done_, _ = await asyncio.wait(tasks_, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+            finally:
+                for task_ in tasks_:
+                    if task_ is not view_:
+                        task_.cancel()
+                if not view_.done():
+                    view_.cancel()
+                    # 等待视图处理取消，连接归还后再返回
+                    await asyncio.wait({view_})
+            if view_ in done_:
+                return view_.result()
+            if done_:
+                raise HTTPException(status_code=status.HTTP_504_GATEWAY_TIMEOUT, detail=_DISCONNECTED_DETAIL)
+            raise HTTPException(status_code=status.HTTP_504_GATEWAY_TIMEOUT, detail={
+                "error": "timeout", "message": f"The view did not finish within {timeout} seconds", "timeout": timeout,
+            })
+
+        return deadline_call
+
+    return layer
+
+
+async def _wait_disconnect(request: Request) -> None:
+    """
+    等待客户端断开连接，请求体已被读取(或已被FastAPI以流的方式读取)，之后收到的消息只有断开连接
+    """
+    while (await request.receive())["type"] != "http.disconnect":
+        pass
+
+
+def admission_layer(max_concurrency: int, max_queue: int, retry_after: int) -> ViewLayer:
+    """
+    限制视图同时执行的数量：超过max_concurrency的请求按到达顺序等待，
+    等待的请求已达max_queue时立即返回503与Retry-After，避免慢视图占满数据库连接池拖垮其它视图
+    Args:
+        max_concurrency: 同时执行的最大数量
+        max_queue: 等待执行的最大数量
+        retry_after: 响应头Retry-After的秒数
+
+    Returns:
+        ViewLayer: 视图调用的包装
+    """
+
+    def layer(call: ViewCall) -> ViewCall:
+        active_ = 0
+        waiters_: Deque["asyncio.Future[None]"] = deque()
+
+        def release() -> None:
+            nonlocal active_
+            # 直接将执行名额交给下一个等待的请求
+            while waiters_:
+                waiter_ = waiters_.popleft()
+                if not waiter_.done():
+                    waiter_.set_result(None)
+                    return
+            active_ -= 1
+
+        async def admitted_call(request: Request, response: Response, view_kwargs: Dict[str, Any]) -> Any:
+            nonlocal active_
+            if active_ < max_concurrency:
+                active_ += 1
+            elif len(waiters_) < max_queue:
+                waiter_ = asyncio.get_running_loop().create_future()
+                waiters_.append(waiter_)
+                try:
+                    await waiter_
+                except asyncio.CancelledError:
+                    if waiter_.cancelled():
+                        waiters_.remove(waiter_)
+                    else:
+                        # 已获得名额后被取消，交给下一个请求
+                        release()
+                    raise
+            else:
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Too many concurrent requests, please retry later",
+                    headers={"Retry-After": str(retry_after)},
+                )
+
+            try:
+                return await call(request, response, view_kwargs)
+            finally:
+                release()
+
+        return admitted_call
+
+    return layer
+
+
+def single_flight_layer(render: ViewRenderer) -> ViewLayer:
+    """
+    合并参数相同的并发请求：同一时刻只有第一个请求执行视图，其余请求等待并共享它渲染后的响应(不包括Set-Cookie)；
+    不缓存结果，视图执行完成后的请求重新执行。只适用于结果只由参数决定的只读视图，参数无法按值区分时不合并
+    Args:
+        render: 视图返回值的渲染方法
+
+    Returns:
+        ViewLayer: 视图调用的包装
+    """
+
+    def layer(call: ViewCall) -> ViewCall:
+        # 响应打包后共享，流式响应只能发送一次，为None
+        in_flight_: Dict[str, "asyncio.Future[Optional[bytes]]"] = {}
+
+        async def coalesced_call(request: Request, response: Response, view_kwargs: Dict[str, Any]) -> Any:
+            params_ = params_key(view_kwargs)
+            if params_ is None:
+                return await call(request, response, view_kwargs)
+            # 读主库与读副本的请求结果可能不同，不能合并
+            key_ = f"{int(use_primary.get())}:{params_}"
+            future_ = in_flight_.get(key_)
+            if future_ is not None:
+                try:
+                    shared_ = await asyncio.shield(future_)
+                except asyncio.CancelledError:
+                    # 第一个请求被取消时自行执行，自身被取消时继续抛出
+                    if not future_.cancelled():
+                        raise
+                    return await call(request, response, view_kwargs)
+                if shared_ is None:
+                    return await call(request, response, view_kwargs)
+                return _copy_cookies(_unpack_response(shared_), response)
+
+            future_ = in_flight_[key_] = asyncio.get_running_loop().create_future()
+            try:
+                response_ = await render(request, response, await call(request, response, view_kwargs))
+                future_.set_result(_pack_response(response_) if hasattr(response_, "body") else None)
+                return response_
+            except asyncio.CancelledError:
+                future_.cancel()
+                raise
+            except BaseException as e:
+                future_.set_exception(e)
+                # 没有等待的请求时避免 "exception was never retrieved"
+                future_.exception()
+                raise
+            finally:
+                del in_flight_[key_]
+
+        return coalesced_call
+
+    return layer
+
+
+def read_your_writes_layer(window: float, mutating: bool) -> ViewLayer:
+    """
+    读写分离时保证客户端读到自己的写入：修改类视图执行成功后以cookie记录window秒的期限，
+    期限内该客户端的读视图使用主库，避免读到只读副本中尚未同步的数据。
+    cookie设置在注入的Response上由FastAPI合并，不改变视图的响应
+    Args:
+        window: 写入后读主库的秒数
+        mutating: 视图是否修改数据
+
+    Returns:
+        ViewLayer: 视图调用的包装
+    """
+
+    def layer(call: ViewCall) -> ViewCall:
+        if mutating:
+            async def pinning_call(request: Request, response: Response, view_kwargs: Dict[str, Any]) -> Any:
+                result_ = await call(request, response, view_kwargs)
+                target_ = result_ if isinstance(result_, Response) else response
+                if (target_.status_code or status.HTTP_200_OK) < 400:
+                    target_.set_cookie(
+                        PRIMARY_COOKIE, f"{time.time() + window:.3f}", max_age=math.ceil(window), httponly=True, samesite="lax"
+                    )
+                return result_
+
+            return pinning_call
+
+        async def pinned_call(request: Request, response: Response, view_kwargs: Dict[str, Any]) -> Any:
+            try:
+                pinned_ = float(request.cookies.get(PRIMARY_COOKIE, 0)) > time.time()
+            except ValueError:
+                pinned_ = False
+            if not pinned_:
+                return await call(request, response, view_kwargs)
+            token_ = use_primary.set(True)
+            try:
+                return await call(request, response, view_kwargs)
+            finally:
+                use_primary.reset(token_)
+
+        return pinned_call
+
+    return layer
+
+
+def conditional_layer(render: ViewRenderer, validator: Optional[ViewValidator] = None) -> ViewLayer:
+    """
+    条件请求：200响应添加ETag/Last-Modified，与请求的If-None-Match/If-Modified-Since一致时返回304。
+    有validator时在执行视图前通过廉价查询判断，数据未变化时不查询也不序列化，但每次请求都多一次该查询；
+    否则以响应内容的摘要作为ETag，只节省传输
+    Args:
+        render: 视图返回值的渲染方法
+        validator: 获取数据版本的方法
+
+    Returns:
+        ViewLayer: 视图调用的包装
+    """
+
+    def layer(call: ViewCall) -> ViewCall:
+        async def conditional_call(request: Request, response: Response, view_kwargs: Dict[str, Any]) -> Any:
+            version_ = None if validator is None else await validator(view_kwargs)
+            if version_ is not None and _not_modified(request, *version_):
+                return _copy_cookies(Response(status_code=304, headers=_validator_headers(*version_)), response)
+
+            response_ = await render(request, response, await call(request, response, view_kwargs))
+            if response_.status_code != status.HTTP_200_OK:
+                return response_
+            if version_ is None:
+                # 流式响应等没有body的响应无法计算摘要
+                if not hasattr(response_, "body"):
+                    return response_
+                version_ = (f'"{hashlib.blake2b(response_.body, digest_size=16).hexdigest()}"', None)
+                if _not_modified(request, *version_):
+                    return _copy_cookies(Response(status_code=304, headers=_validator_headers(*version_)), response_)
+            response_.headers.update(_validator_headers(*version_))
+            return response_
+
+        return conditional_call
+
+    return layer
+
+
+def metrics_layer(sink: BaseMetricsSink, viewset: str, action: str, render: ViewRenderer) -> ViewLayer:
+    """
+    统计视图各阶段的耗时并记录到sink，需要在最外层；视图返回值在此层以计时的渲染方法渲染，以统计序列化的耗时，
+    渲染方式与FastAPI一致，不改变响应。
+    视图函数的耗时由最内层的view_timing_layer统计，查询与构造Pydantic对象的耗时由生成视图中的计时累计
+    Args:
+        sink: 耗时的接收端
+        viewset: 视图集类名称
+        action: 视图名称
+        render: 计时的渲染方法，与其它层共用
+
+    Returns:
+        ViewLayer: 视图调用的包装
+    """
+
+    def layer(call: ViewCall) -> ViewCall:
+        async def measured_call(request: Request, response: Response, view_kwargs: Dict[str, Any]) -> Any:
+            timings_ = ViewTimings()
+            token_ = current_timings.set(timings_)
+            start_ = time.perf_counter()
+            try:
+                return await render(request, response, await call(request, response, view_kwargs))
+            finally:
+                total_ = time.perf_counter() - start_
+                current_timings.reset(token_)
+                sink.record(viewset, action, {
+                    "total": total_,
+                    "dispatch": max(0.0, total_ - timings_.view - timings_.serialize),
+                    "view": timings_.view,
+                    "db": timings_.db,
+                    "model": timings_.model,
+                    "serialize": timings_.serialize,
+                }, timings_.rows)
+
+        return measured_call
+
+    return layer
+
+
+def view_timing_layer(call: ViewCall) -> ViewCall:
+    """
+    统计视图函数的耗时，需要在最内层，与metrics_layer一起使用
+    """
+
+    async def timed_call(request: Request, response: Response, view_kwargs: Dict[str, Any]) -> Any:
+        timings_ = current_timings.get()
+        if timings_ is None:
+            return await call(request, response, view_kwargs)
+        start_ = time.perf_counter()
+        try:
+            return await call(request, response, view_kwargs)
+        finally:
+            timings_.view += time.perf_counter() - start_
+
+    return timed_call
+
+
+def query_recorder_layer(
+    viewset: str,
+    action: str,
+    headers: bool,
+    budget: Optional[int],
+    repeat_threshold: int,
+) -> ViewLayer:
+    """
+    记录每个请求执行的SQL，需要在最外层，其它层(缓存、条件请求等)执行的查询也会计入。
+    同一形状的SQL执行repeat_threshold次以上时日志警告可能的N+1查询，超出预算时日志警告并通知budget_listeners；
+    流式响应在返回后才执行的查询不会计入。需要先调用install_query_recorder
+    Args:
+        viewset: 视图集类名称
+        action: 视图名称
+        headers: 是否以响应头X-Query-Count、X-Query-Time(毫秒)返回SQL数量与数据库耗时，
+            视图返回值不是Response时设置在注入的Response上由FastAPI合并
+        budget: 允许执行的最大SQL数量，为None时不限制
+        repeat_threshold: 同一形状的SQL警告的执行次数
+
+    Returns:
+        ViewLayer: 视图调用的包装
+    """
+
+    def layer(call: ViewCall) -> ViewCall:
+        async def recorded_call(request: Request, response: Response, view_kwargs: Dict[str, Any]) -> Any:
+            recorder_ = QueryRecorder()
+            token_ = current_recorder.set(recorder_)
+            try:
+                result_ = await call(request, response, view_kwargs)
+                if headers:
+                    target_ = result_ if isinstance(result_, Response) else response
+                    target_.headers["X-Query-Count"] = str(recorder_.count)
+                    target_.headers["X-Query-Time"] = f"{recorder_.seconds * 1000:.3f}"
+                return result_
+            finally:
+                current_recorder.reset(token_)
+                _report_queries(viewset, action, recorder_, budget, repeat_threshold)
+
+        return recorded_call
+
+    return layer
+
+
+def _report_queries(viewset: str, action: str, recorder: QueryRecorder, budget: Optional[int], repeat_threshold: int) -> None:
+    from loguru import logger
+
+    for shape_, count_ in recorder.repeated(repeat_threshold):
+        logger.warning(f"{viewset}.{action} executed the same statement {count_} times, possible N+1 query: {shape_}")
+    if budget is not None and recorder.count > budget:
+        logger.warning(f"{viewset}.{action} executed {recorder.count} statements, exceeding its query budget of {budget}.")
+        for listener_ in list(budget_listeners):
+            listener_(viewset, action, budget, recorder)
+
+
+def _validator_headers(etag: str, last_modified: Optional[datetime]) -> Dict[str, str]:
+    headers_ = {"ETag": etag}
+    if last_modified is not None and last_modified.tzinfo is not None:
+        headers_["Last-Modified"] = format_datetime(last_modified.astimezone(timezone.utc), usegmt=True)
+    return headers_
+
+
+def _opaque_tag(etag: str) -> str:
+    return etag[2:] if etag.startswith("W/") else etag
+
+
+def _not_modified(request: Request, etag: str, last_modified: Optional[datetime]) -> bool:
+    """
+    判断请求的条件是否满足304，If-None-Match存在时忽略If-Modified-Since
+    """
+    if_none_match_ = request.headers.get("if-none-match")
+    if if_none_match_ is not None:
+        if if_none_match_.strip() == "*":
+            return True
+        # 弱比较，忽略W/前缀
+        tags_ = {_opaque_tag(tag_.strip()) for tag_ in if_none_match_.split(",")}
+        return _opaque_tag(etag) in tags_
+
+    if_modified_since_ = request.headers.get("if-modified-since")
+    if if_modified_since_ is None or last_modified is None or last_modified.tzinfo is None:
+        return False
+    try:
+        since_ = parsedate_to_datetime(if_modified_since_)
+    except (TypeError, ValueError):
+        return False
+    return since_.tzinfo is not None and last_modified.replace(microsecond=0) <= since_
+
+
+def direct_call(
+    view_func: DecoratedCallable,
+    provider: BaseInstanceProvider,
+    executor: Optional[ViewExecutor] = None,
+) -> Callable[..., Awaitable[Any]]:
+    """
+    按provider的类型展开调用视图的方法：单例直接使用绑定方法，其它只多一层获取实例的调用
+    Args:
+        view_func: 视图集的视图函数
+        provider: 提供调用视图时的self
+        executor: 执行视图的线程池或进程池，为None时在事件循环中执行
+
+    Returns:
+        Callable: 以视图参数(去掉self)调用视图的协程方法
+    """
+    if executor is None:
+        if isinstance(provider, SingletonProvider):
+            return MethodType(view_func, provider.instance)
+        invoke_ = view_func
+    else:
+        run_view_ = executor.run_view
+
+        async def invoke_(instance: Any, **view_kwargs) -> Any:
+            return await run_view_(view_func, instance, view_kwargs)
+
+    if isinstance(provider, SingletonProvider):
+        instance_ = provider.instance
+
+        async def call(**view_kwargs) -> Any:
+            return await invoke_(instance_, **view_kwargs)
+
+        return call
+
+    if isinstance(provider, PerRequestProvider):
+        factory_ = provider.factory
+
+        async def call(**view_kwargs) -> Any:
+            return await invoke_(factory_(), **view_kwargs)
+
+        return call
+
+    acquire_, release_ = provider.acquire, provider.release
+
+    async def call(**view_kwargs) -> Any:
+        instance_ = acquire_()
+        try:
+            return await invoke_(instance_, **view_kwargs)
+        finally:
+            release_(instance_)
+
+    return call
+
+
+def create_endpoint(
+    view_func: DecoratedCallable,
+    provider: BaseInstanceProvider,
+    layers: Sequence[ViewLayer],
+    executor: Optional[ViewExecutor] = None,
+) -> DecoratedCallable:
+    """
+    创建注册到FastAPI的视图函数，依次经过layers的包装后调用视图集的视图；
+    没有layers时FastAPI直接调用视图，不注入Request、Response也不重新打包参数
+    Args:
+        view_func: 视图集的视图函数
+        provider: 提供调用视图时的self
+        layers: 视图调用的包装，排在前面的在外层
+        executor: 执行视图的线程池或进程池，为None时在事件循环中执行
+
+    Returns:
+        DecoratedCallable: 与视图函数(去掉self)签名相同的协程方法
+    """
+    direct_ = direct_call(view_func, provider, executor)
+    if not layers:
+        if isinstance(direct_, MethodType):
+            return direct_
+        return _with_view_meta(direct_, view_func, view_signature(view_func))
+
+    async def call_view(request: Request, response: Response, view_kwargs: Dict[str, Any]) -> Any:
+        return await direct_(**view_kwargs)
+
+    call_ = call_view
+    for layer_ in reversed(layers):
+        call_ = layer_(call_)
+
+    # 额外注入Request与Response供转发时使用，不会传递给视图；FastAPI只向最后一个同类型的参数注入，视图自身声明时共用
+    sig_ = view_signature(view_func)
+    request_name_ = _injected_param(sig_, Request)
+    response_name_ = _injected_param(sig_, Response)
+    extra_params_ = []
+    if request_name_ is None:
+        extra_params_.append(Parameter(REQUEST_PARAM_NAME, Parameter.KEYWORD_ONLY, annotation=Request))
+    if response_name_ is None:
+        extra_params_.append(Parameter(RESPONSE_PARAM_NAME, Parameter.KEYWORD_ONLY, annotation=Response))
+
+    if request_name_ is None and response_name_ is None:
+        async def endpoint(**view_kwargs) -> Any:
+            return await call_(view_kwargs.pop(REQUEST_PARAM_NAME), view_kwargs.pop(RESPONSE_PARAM_NAME), view_kwargs)
+    else:
+        async def endpoint(**view_kwargs) -> Any:
+            request_ = view_kwargs.pop(REQUEST_PARAM_NAME) if request_name_ is None else view_kwargs[request_name_]
+            response_ = view_kwargs.pop(RESPONSE_PARAM_NAME) if response_name_ is None else view_kwargs[response_name_]
+            return await call_(request_, response_, view_kwargs)
+
+    return _with_view_meta(endpoint, view_func, sig_.replace(parameters=[*sig_.parameters.values(), *extra_params_]))
+
+
+def _injected_param(sig: Signature, param_type: type) -> Optional[str]:
+    """
+    视图中由FastAPI注入param_type(Request或Response)的参数名称，没有时返回None
+    """
+    for param_ in sig.parameters.values():
+        if isinstance(param_.annotation, type) and issubclass(param_.annotation, param_type):
+            return param_.name
+    return None
+
+
+def _with_view_meta(endpoint: Callable, view_func: DecoratedCallable, sig: Signature) -> Callable:
+    """
+    复制视图的名称、文档等属性，并设置预先计算的签名供FastAPI解析参数
+    """
+    update_wrapper(endpoint, view_func)
+    del endpoint.__wrapped__
+    endpoint.__signature__ = sig
+    return endpoint
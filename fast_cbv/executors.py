@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/17 22:40
+# @Author  : Tuffy
+# @Description :
+import asyncio
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from contextvars import copy_context
+from functools import partial
+from inspect import isawaitable
+from typing import Any, Callable, Dict, Optional
+
+EXECUTORS = {"thread", "process"}
+
+
+class ViewExecutor(object):
+    """
+    在线程池或进程池中执行视图，避免同步或CPU密集的视图阻塞事件循环；池在第一次使用时创建。
+    "thread" 在线程中以视图集实例调用视图，上下文变量会传递到线程中；
+    "process" 在子进程中创建新的视图集实例调用视图，视图集类、视图函数、参数与返回值都需要可以pickle，
+    即视图集需要定义在模块顶层。异步视图在线程或子进程中以新的事件循环执行
+    """
+
+    def __init__(self, kind: str, max_workers: int, viewset: Optional[type] = None):
+        """
+        Args:
+            kind: "thread" 线程池；"process" 进程池
+            max_workers: 池的大小
+            viewset: "process" 时在子进程中实例化的视图集类
+        """
+        self.kind = kind
+        self.max_workers = max(1, max_workers)
+        self.viewset = viewset
+        self.__pool: Optional[Executor] = None
+        self.in_flight = 0  # 已提交未完成的数量，超过max_workers的部分在排队
+        self.peak_in_flight = 0
+        self.completed = 0
+        self.failed = 0
+
+    def __get_pool(self) -> Executor:
+        if self.__pool is None:
+            if self.kind == "process":
+                self.__pool = ProcessPoolExecutor(max_workers=self.max_workers)
+            else:
+                self.__pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="fast_cbv")
+        return self.__pool
+
+    async def run(self, func: Callable, *args: Any, **kwargs: Any) -> Any:
+        """
+        在池中执行 func(*args, **kwargs) 并等待结果；取消等待不会中断已在执行的函数
+        """
+        if self.kind == "process":
+            call_ = partial(_run_sync, func, *args, **kwargs)
+        else:
+            call_ = partial(copy_context().run, _run_sync, func, *args, **kwargs)
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            result_ = await asyncio.get_running_loop().run_in_executor(self.__get_pool(), call_)
+        except BaseException:
+            self.failed += 1
+            raise
+        else:
+            self.completed += 1
+            return result_
+        finally:
+            self.in_flight -= 1
+
+    async def run_view(self, view_func: Callable, instance: Any, view_kwargs: Dict[str, Any]) -> Any:
+        """
+        在池中调用视图，"process" 时视图集实例在子进程中创建
+        """
+        if self.kind == "process":
+            return await self.run(_call_view, self.viewset, view_func, view_kwargs)
+        return await self.run(view_func, instance, **view_kwargs)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        池的使用情况，saturation为已提交未完成的数量与池大小之比，大于1表示有任务在排队
+        """
+        return {
+            "kind": self.kind,
+            "max_workers": self.max_workers,
+            "in_flight": self.in_flight,
+            "queued": max(0, self.in_flight - self.max_workers),
+            "peak_in_flight": self.peak_in_flight,
+            "completed": self.completed,
+            "failed": self.failed,
+            "saturation": self.in_flight / self.max_workers,
+        }
+
+    def shutdown(self, wait: bool = True) -> None:
+        if self.__pool is not None:
+            self.__pool.shutdown(wait=wait)
+            self.__pool = None
+
+
+def _run_sync(func: Callable, *args: Any, **kwargs: Any) -> Any:
+    result_ = func(*args, **kwargs)
+    if isawaitable(result_):
+        return asyncio.run(_await(result_))
+    return result_
+
+
+async def _await(awaitable: Any) -> Any:
+    return await awaitable
+
+
+def _call_view(viewset: type, view_func: Callable, view_kwargs: Dict[str, Any]) -> Any:
+    return _run_sync(view_func, viewset(), **view_kwargs)
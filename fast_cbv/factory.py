@@ -2,79 +2,428 @@
 # @Time    : 2021/12/16 9:14
 # @Author  : Tuffy
 # @Description :
-from inspect import Parameter, signature
-from typing import Dict, List, Tuple, Type
-
+import sqlite3
+from datetime import datetime
+from inspect import Parameter, Signature, signature
+from typing import Any, Awaitable, Callable, Dict, FrozenSet, Iterable, List, Optional, Tuple, Type, Union
+
+from fastapi import HTTPException, Query, status
+from loguru import logger
+from tortoise import timezone
 from tortoise.contrib.fastapi import HTTPNotFoundError
 from tortoise.contrib.pydantic import PydanticModel
+from tortoise.exceptions import DoesNotExist
 from tortoise.expressions import Q
+from tortoise.functions import Count, Max
 from tortoise.models import MODEL
+from tortoise.queryset import DeleteQuery, QuerySet, UpdateQuery
+from tortoise.transactions import in_transaction
 
+from .batching import CreateBatcher
+from .cache import MemoryCacheBackend
 from .decorators import Action
-
-
-def generate_all(model: Type[MODEL], schema: Type[PydanticModel]):
+from .db import ConnectionRouter
+from .dispatch import ViewValidator, params_key
+from .filters import FilterSet
+from .metrics import timed_build, timed_query
+from .pagination import CursorPagination, page_schema
+from .pydantics import CountPydantic, ExistsPydantic
+from .relations import RelationLoader, fetch_fields
+from .responses import ValuesJSONResponse
+from .streaming import STREAM_MEDIA_TYPES, QuerySetStreamingResponse
+
+TOTAL_COUNT_HEADER = "X-Total-Count"
+# 分页与返回字段参数，不影响匹配数据的总数
+_PAGE_PARAMS = frozenset({"limit", "after", "fields"})
+TotalCounter = Callable[[QuerySet, Dict], Awaitable[int]]
+UPDATE_STRATEGIES = {"save", "update_fields", "direct"}
+# 支持 UPDATE/DELETE ... RETURNING 的数据库，sqlite需要3.35以上
+_RETURNING_DIALECTS = frozenset({"postgres", "sqlite"})
+
+
+def generate_views(name: str, attrs: Dict[str, Any], get_attr: Callable[[str], Any]):
+    """
+    根据视图集的配置生成views中的基础方法，添加到attrs中；类中已定义的同名方法不会被覆盖
+    Args:
+        name: 视图集类名称
+        attrs: 视图集的类属性，已通过合法性检查
+        get_attr: 获取类属性的方法，类自身未定义时从父类中查找
+    """
+    # 配置了page_size则开启游标分页
+    pagination_ = None
+    page_size_ = get_attr("page_size")
+    if page_size_:
+        # 游标字段需要是非空的数据库列，可为空的列在游标条件中会丢失NULL的行
+        cursor_field_ = get_attr("cursor_field")
+        if cursor_field_ is not None:
+            column_ = cursor_field_.lstrip("-")
+            if column_ not in attrs["model"]._meta.fields_db_projection or attrs["model"]._meta.fields_map[column_].null:
+                logger.warning(f"The \"cursor_field\" in {name} is invalid, it should be a non-null column.")
+                cursor_field_ = None
+        pagination_ = CursorPagination(
+            attrs["model"],
+            page_size_,
+            cursor_field=cursor_field_,
+            max_page_size=get_attr("max_page_size"),
+        )
+
+    # 配置了stream_format则all、filter视图流式输出
+    stream_format_ = get_attr("stream_format")
+    stream_batch_size_ = get_attr("stream_batch_size")
+    if stream_format_ is not None and stream_format_ not in STREAM_MEDIA_TYPES:
+        logger.warning(f"The \"stream_format\" in {name} is invalid.")
+        stream_format_ = None
+
+    # 条件请求使用的auto_now字段，未配置时自动查找
+    last_modified_field_ = get_attr("last_modified_field")
+    if last_modified_field_ is None:
+        last_modified_field_ = next(
+            (f for f, field in attrs["model"]._meta.fields_map.items() if getattr(field, "auto_now", False)), None
+        )
+
+    # 查询参数fields允许的字段：schema中对应数据库列的字段，计算字段与关联字段无法下推到SQL
+    allowed_fields_ = None
+    if get_attr("sparse_fields"):
+        allowed_fields_ = frozenset(attrs["schema"].__fields__) & frozenset(attrs["model"]._meta.fields_db_projection)
+
+    # raw_response只支持字段全部对应数据库列的schema
+    raw_fields_ = None
+    if get_attr("raw_response"):
+        schema_fields_ = attrs["schema"].__fields__
+        if all(
+            key_ in attrs["model"]._meta.fields_db_projection and field_.alias == key_
+            for key_, field_ in schema_fields_.items()
+        ):
+            raw_fields_ = tuple(schema_fields_)
+        else:
+            logger.warning(f"The \"schema\" in {name} has computed or relational fields, \"raw_response\" is ignored.")
+
+    # 分页时返回匹配数据的总数
+    total_count_ttl_ = None
+    if pagination_ is not None and get_attr("total_count"):
+        total_count_ttl_ = get_attr("total_count_ttl")
+
+    update_strategy_ = get_attr("update_strategy")
+    if update_strategy_ not in UPDATE_STRATEGIES:
+        logger.warning(f"The \"update_strategy\" in {name} is invalid.")
+        update_strategy_ = "save"
+
+    # 读视图使用read_connection(只读副本)，写视图使用write_connection(主库)
+    db_ = ConnectionRouter(get_attr("read_connection"), get_attr("write_connection"))
+
+    # 配置了create_batch_window则create视图合并并发请求批量插入
+    batcher_ = None
+    create_batch_window_ = get_attr("create_batch_window")
+    if create_batch_window_ is not None:
+        if isinstance(create_batch_window_, (int, float)) and create_batch_window_ > 0:
+            batcher_ = CreateBatcher(attrs["model"], create_batch_window_, get_attr("create_batch_size") or 1, db_)
+        else:
+            logger.warning(f"The \"create_batch_window\" in {name} is invalid.")
+
+    # 声明了select_related、prefetch_related时get、all、filter视图按声明查询关联数据
+    relations_ = None
+    select_related_ = tuple(get_attr("select_related") or ())
+    prefetch_related_ = tuple(get_attr("prefetch_related") or ())
+    if select_related_ or prefetch_related_:
+        invalid_ = RelationLoader.invalid_select_related(attrs["model"], select_related_)
+        if invalid_:
+            logger.warning(f"The \"select_related\" in {name} is invalid: {', '.join(invalid_)} are ignored.")
+            select_related_ = tuple(f for f in select_related_ if f not in invalid_)
+        relations_ = RelationLoader(attrs["schema"], select_related_, prefetch_related_)
+
+    # filter视图的查询参数只解析一次，count、exists、批量修改、删除使用相同的查询参数
+    filter_set_ = None
+    if attrs["views"].keys() & {"filter", "count", "exists", "bulk_update", "bulk_delete"}:
+        try:
+            filter_set_ = FilterSet(
+                attrs["model"],
+                attrs["views"].get("filter") or {},
+                require_index=get_attr("filter_require_index"),
+            )
+        except ValueError as e:
+            raise ValueError(f"The \"views\" in {name} is invalid: {e}") from e
+        if filter_set_.unindexed:
+            logger.warning(f"The filters of {name} cannot use an index: {', '.join(filter_set_.unindexed)}")
+
+    # 生成基础方法
+    if "all" in attrs["views"] and "all" not in attrs:
+        attrs["all"] = generate_all(
+            attrs["model"],
+            attrs["schema"],
+            pagination=pagination_,
+            stream_format=stream_format_,
+            stream_batch_size=stream_batch_size_,
+            last_modified_field=last_modified_field_,
+            allowed_fields=allowed_fields_,
+            raw_fields=raw_fields_,
+            total_count_ttl=total_count_ttl_,
+            relations=relations_,
+            db=db_,
+        )
+
+    if "create" in attrs["views"] and "create" not in attrs:
+        attrs["create"] = generate_create(attrs["model"], attrs["schema"], attrs["views"]["create"], db=db_, batcher=batcher_)
+
+    if "bulk_create" in attrs["views"] and "bulk_create" not in attrs:
+        attrs["bulk_create"] = generate_bulk_create(
+            attrs["model"],
+            attrs["schema"],
+            attrs["pk_type"],
+            attrs["views"]["bulk_create"],
+            get_attr("bulk_batch_size"),
+            get_attr("bulk_create_return"),
+            db=db_,
+        )
+
+    if "get" in attrs["views"] and "get" not in attrs:
+        attrs["get"] = generate_get(
+            attrs["model"],
+            attrs["schema"],
+            attrs["pk_type"],
+            last_modified_field=last_modified_field_,
+            allowed_fields=allowed_fields_,
+            raw_fields=raw_fields_,
+            relations=relations_,
+            db=db_,
+        )
+
+    if "update" in attrs["views"] and "update" not in attrs:
+        attrs["update"] = generate_update(
+            attrs["model"], attrs["schema"], attrs["pk_type"], attrs["views"]["update"], update_strategy_, db=db_
+        )
+
+    if "delete" in attrs["views"] and "delete" not in attrs:
+        attrs["delete"] = generate_delete(attrs["model"], attrs["schema"], attrs["pk_type"], update_strategy_, db=db_)
+
+    if "bulk_update" in attrs["views"] and "bulk_update" not in attrs:
+        attrs["bulk_update"] = generate_bulk_update(
+            attrs["model"], attrs["pk_type"], attrs["views"]["bulk_update"], filter_set_, db=db_
+        )
+
+    if "bulk_delete" in attrs["views"] and "bulk_delete" not in attrs:
+        attrs["bulk_delete"] = generate_bulk_delete(attrs["model"], attrs["pk_type"], filter_set_, db=db_)
+
+    if "filter" in attrs["views"] and "filter" not in attrs:
+        attrs["filter"] = generate_filter(
+            attrs["model"],
+            attrs["schema"],
+            filter_set_,
+            pagination=pagination_,
+            stream_format=stream_format_,
+            stream_batch_size=stream_batch_size_,
+            last_modified_field=last_modified_field_,
+            allowed_fields=allowed_fields_,
+            raw_fields=raw_fields_,
+            total_count_ttl=total_count_ttl_,
+            relations=relations_,
+            db=db_,
+        )
+
+    if "count" in attrs["views"] and "count" not in attrs:
+        attrs["count"] = generate_count(attrs["model"], filter_set_, db=db_)
+
+    if "exists" in attrs["views"] and "exists" not in attrs:
+        attrs["exists"] = generate_exists(attrs["model"], filter_set_, db=db_)
+
+
+def generate_all(
+    model: Type[MODEL],
+    schema: Type[PydanticModel],
+    pagination: Optional[CursorPagination] = None,
+    stream_format: Optional[str] = None,
+    stream_batch_size: int = 1000,
+    last_modified_field: Optional[str] = None,
+    allowed_fields: Optional[FrozenSet[str]] = None,
+    raw_fields: Optional[Tuple[str, ...]] = None,
+    total_count_ttl: Optional[float] = None,
+    relations: Optional[RelationLoader] = None,
+    db: Optional[ConnectionRouter] = None,
+):
     """
     生成视图集的all方法
     Args:
         model: 视图集的orm模型
         schema: 视图输出的序列化
+        pagination: 游标分页，为None时返回全部数据
+        stream_format: 流式输出格式 "ndjson" 或 "json"，开启后忽略分页
+        stream_batch_size: 流式输出时每批查询的数量
+        last_modified_field: auto_now的字段，用于条件请求时判断数据是否变化
+        allowed_fields: 查询参数fields允许的字段，为None时不支持fields参数
+        raw_fields: 不经过schema直接以 values() 查询并序列化的字段，为None时通过schema序列化
+        total_count_ttl: 分页时响应头X-Total-Count返回匹配数据总数，总数缓存的秒数；为None时不返回总数
+        relations: 关联数据的查询方式，默认预取schema需要的关联字段
+        db: 读写操作使用的数据库连接，默认使用模型默认的连接
 
     Returns:
         CoroutineType: 由 async def 创建的协程方法
     """
 
-    @Action.get("/all", response_model=List[schema])
-    async def all(self):
-        return await schema.from_queryset(model.all())
+    if stream_format is not None:
+        pagination = None
+    total_counter_ = _total_counter(pagination, total_count_ttl)
+    relations = relations or RelationLoader(schema)
+    db = db or ConnectionRouter()
+
+    @Action.get("/all", response_model=List[schema] if pagination is None else page_schema(schema), cache=True)
+    async def all(self, **kwargs):
+        return await _query_list(
+            schema, model.all().using_db(db.read()), kwargs, pagination, stream_format, stream_batch_size,
+            allowed_fields, raw_fields, total_counter_, relations,
+        )
 
+    all.__signature__ = _filter_signature(all, [], _list_params(pagination, allowed_fields))
     all.__doc__ = f"Query all {model.__name__}"
+    _set_validator(all, _list_validator(model, schema, last_modified_field, lambda view_kwargs: Q(), db))
 
     return all
 
 
-def generate_create(model: Type[MODEL], schema: Type[PydanticModel], input_schema: Type[PydanticModel]):
+def generate_create(
+    model: Type[MODEL],
+    schema: Type[PydanticModel],
+    input_schema: Type[PydanticModel],
+    db: Optional[ConnectionRouter] = None,
+    batcher: Optional[CreateBatcher] = None,
+):
     """
     生成视图集的create方法
     Args:
         model: 视图集的orm模型
         schema: 视图输出序列化
         input_schema: http视图输入的body序列化对象
+        db: 读写操作使用的数据库连接，默认使用模型默认的连接
+        batcher: 合并并发请求批量插入，为None时每个请求单独插入
 
     Returns:
         CoroutineType: 由 async def 创建的协程方法
     """
-
-    @Action.post("", response_model=schema)
-    async def create(self, body: input_schema):
-        return await schema.from_tortoise_orm(await model.create(**body.dict()))
+    db = db or ConnectionRouter()
+
+    if batcher is None:
+        @Action.post("", response_model=schema, mutating=True)
+        async def create(self, body: input_schema):
+            using_db_ = db.write()
+            return await _from_obj(schema, await timed_query(model.create(using_db=using_db_, **body.dict())), using_db_)
+    else:
+        @Action.post("", response_model=schema, mutating=True)
+        async def create(self, body: input_schema):
+            return await _from_obj(schema, await timed_query(batcher.create(model(**body.dict()))), db.write())
 
     create.__doc__ = f"Create {model.__name__}"
     return create
 
 
-def generate_get(model: Type[MODEL], schema: Type[PydanticModel], pk_type: Type):
+def generate_bulk_create(
+    model: Type[MODEL],
+    schema: Type[PydanticModel],
+    pk_type: Type,
+    input_schema: Type[PydanticModel],
+    batch_size: Optional[int] = None,
+    returning: str = "rows",
+    db: Optional[ConnectionRouter] = None,
+):
+    """
+    生成视图集的bulk_create方法，在一个事务中按batch_size分批插入。
+    bulk_create不会回填数据库生成的主键，主键由数据库生成且需要返回 "rows"、"ids" 时改为在同一事务中逐条插入，
+    只有一次提交但每条数据一条INSERT；只需要数量时使用 "count" 保持批量插入
+    Args:
+        model: 视图集的orm模型
+        schema: 视图输出序列化
+        pk_type: 主键类型，"ids" 返回的主键转换为此类型
+        input_schema: http视图输入的body序列化对象
+        batch_size: 每条INSERT语句插入的数量，为None时一次插入全部
+        returning: 返回内容 "rows" 创建的数据；"ids" 创建数据的主键；"count" 创建的数量
+        db: 读写操作使用的数据库连接，默认使用模型默认的连接
+
+    Returns:
+        CoroutineType: 由 async def 创建的协程方法
+    """
+    response_model_ = {"rows": List[schema], "ids": List[pk_type]}.get(returning, CountPydantic)
+    # 需要返回主键时数据库生成的主键需要逐条插入才能回填
+    save_each_ = returning in ("rows", "ids") and model._meta.pk.generated
+    db = db or ConnectionRouter()
+
+    @Action.post("/bulk", response_model=response_model_, mutating=True)
+    async def bulk_create(self, body: List[input_schema]):
+        objs_ = [model(**item_.dict()) for item_ in body]
+        async with in_transaction(db.write_connection or model._meta.default_connection) as conn_:
+            if save_each_:
+                for obj_ in objs_:
+                    await timed_query(obj_.save(using_db=conn_))
+            else:
+                await timed_query(model.bulk_create(objs_, batch_size=batch_size, using_db=conn_))
+        if returning == "ids":
+            return [_as_pk_type(pk_type, obj_.pk) for obj_ in objs_]
+        if returning == "rows":
+            fetch_fields_ = fetch_fields(schema)
+            if fetch_fields_:
+                await timed_query(model.fetch_for_list(objs_, *fetch_fields_, using_db=db.write()))
+            return timed_build(lambda: [schema.from_orm(obj_) for obj_ in objs_])
+        return CountPydantic(count=len(objs_))
+
+    bulk_create.__doc__ = f"Create {model.__name__} in bulk"
+    return bulk_create
+
+
+def generate_get(
+    model: Type[MODEL],
+    schema: Type[PydanticModel],
+    pk_type: Type,
+    last_modified_field: Optional[str] = None,
+    allowed_fields: Optional[FrozenSet[str]] = None,
+    raw_fields: Optional[Tuple[str, ...]] = None,
+    relations: Optional[RelationLoader] = None,
+    db: Optional[ConnectionRouter] = None,
+):
     """
     生成视图集的get方法
     Args:
         model: 视图集的orm模型
         schema: 视图输出序列化
         pk_type: 主键类型
+        last_modified_field: auto_now的字段，用于条件请求时判断数据是否变化
+        allowed_fields: 查询参数fields允许的字段，为None时不支持fields参数
+        raw_fields: 不经过schema直接以 values() 查询并序列化的字段，为None时通过schema序列化
+        relations: 关联数据的查询方式，默认预取schema需要的关联字段
+        db: 读写操作使用的数据库连接，默认使用模型默认的连接
 
     Returns:
         CoroutineType: 由 async def 创建的协程方法
     """
-
-    @Action.get(f"/{{pk}}", response_model=schema, responses={404: {"model": HTTPNotFoundError}})
-    async def get(self, pk: pk_type):
-        return await schema.from_queryset_single(model.get(pk=pk))
+    relations = relations or RelationLoader(schema)
+    db = db or ConnectionRouter()
+
+    if allowed_fields is None and raw_fields is None:
+        @Action.get(f"/{{pk}}", response_model=schema, responses={404: {"model": HTTPNotFoundError}}, cache=True)
+        async def get(self, pk: pk_type):
+            return await _fetch_one(schema, relations.apply(model.filter(pk=pk).using_db(db.read())).get())
+    else:
+        @Action.get(f"/{{pk}}", response_model=schema, responses={404: {"model": HTTPNotFoundError}}, cache=True)
+        async def get(self, pk, **kwargs):
+            fields_ = _parse_fields(kwargs.get("fields"), allowed_fields) or raw_fields
+            if fields_ is None:
+                return await _fetch_one(schema, relations.apply(model.filter(pk=pk).using_db(db.read())).get())
+            return ValuesJSONResponse(await timed_query(model.get(pk=pk, using_db=db.read()).values(*fields_)))
+
+        get.__signature__ = _filter_signature(get, [], [
+            Parameter("pk", Parameter.POSITIONAL_OR_KEYWORD, annotation=pk_type),
+            *_list_params(None, allowed_fields),
+        ])
 
     get.__doc__ = f"Get {model.__name__} by primary key"
+    _set_validator(get, _single_validator(model, schema, last_modified_field, db))
 
     return get
 
 
-def generate_update(model: Type[MODEL], schema: Type[PydanticModel], pk_type: Type, input_schema: Type[PydanticModel]):
+def generate_update(
+    model: Type[MODEL],
+    schema: Type[PydanticModel],
+    pk_type: Type,
+    input_schema: Type[PydanticModel],
+    strategy: str = "save",
+    db: Optional[ConnectionRouter] = None,
+):
     """
     生成视图集的update方法
     Args:
@@ -82,77 +431,557 @@ def generate_update(model: Type[MODEL], schema: Type[PydanticModel], pk_type: Ty
         schema: 视图输出序列化
         pk_type: 主键类型
         input_schema: http视图的body序列化
+        strategy: 修改方式
+            "save" 查询后全字段保存；
+            "update_fields" 查询后只保存请求中设置的字段；
+            "direct" 不查询直接 UPDATE ... WHERE pk RETURNING，一次往返修改并得到修改后的数据，数据不存在时404；
+                数据库不支持RETURNING(MySQL)时修改后再查询一次
+        db: 读写操作使用的数据库连接，默认使用模型默认的连接
 
     Returns:
         CoroutineType: 由 async def 创建的协程方法
     """
-
-    @Action.patch(f"/{{pk}}", response_model=schema, responses={404: {"model": HTTPNotFoundError}})
-    async def update(self, pk: pk_type, body: input_schema):
-        obj: MODEL = await model.get(pk=pk)
-        obj.update_from_dict(body.dict(exclude_unset=True))
-        await obj.save()
-        return await schema.from_tortoise_orm(obj)
+    # save(update_fields=...) 与 QuerySet.update 不会自动刷新auto_now字段
+    auto_now_fields_ = _auto_now_fields(model)
+    db = db or ConnectionRouter()
+
+    if strategy == "direct":
+        @Action.patch(f"/{{pk}}", response_model=schema, responses={404: {"model": HTTPNotFoundError}}, mutating=True)
+        async def update(self, pk: pk_type, body: input_schema):
+            using_db_ = db.write()
+            update_dict_ = _column_dict(model, body.dict(exclude_unset=True))
+            if update_dict_:
+                now_ = timezone.now()
+                update_dict_.update({name: now_ for name in auto_now_fields_})
+                query_ = model.filter(pk=pk).using_db(using_db_).update(**update_dict_)
+                rows_ = await timed_query(_returning(query_))
+                if rows_ is not None:
+                    if not rows_:
+                        raise DoesNotExist("Object does not exist")
+                    return await _from_obj(schema, model._init_from_db(**rows_[0]), using_db_)
+                # MySQL只返回值有变化的行数，影响0行不代表数据不存在，由下面的查询判断是否404
+                await timed_query(query_)
+            return await _from_obj(schema, await timed_query(model.get(pk=pk, using_db=using_db_)), using_db_)
+    elif strategy == "update_fields":
+        @Action.patch(f"/{{pk}}", response_model=schema, responses={404: {"model": HTTPNotFoundError}}, mutating=True)
+        async def update(self, pk: pk_type, body: input_schema):
+            using_db_ = db.write()
+            obj: MODEL = await timed_query(model.get(pk=pk, using_db=using_db_))
+            update_dict_ = _column_dict(model, body.dict(exclude_unset=True))
+            if update_dict_:
+                obj.update_from_dict(update_dict_)
+                await timed_query(obj.save(update_fields=[*_update_fields(model, update_dict_), *auto_now_fields_], using_db=using_db_))
+            return await _from_obj(schema, obj, using_db_)
+    else:
+        @Action.patch(f"/{{pk}}", response_model=schema, responses={404: {"model": HTTPNotFoundError}}, mutating=True)
+        async def update(self, pk: pk_type, body: input_schema):
+            using_db_ = db.write()
+            obj: MODEL = await timed_query(model.get(pk=pk, using_db=using_db_))
+            obj.update_from_dict(body.dict(exclude_unset=True))
+            await timed_query(obj.save(using_db=using_db_))
+            return await _from_obj(schema, obj, using_db_)
 
     update.__doc__ = f"Update {model.__name__} by primary key"
 
     return update
 
 
-def generate_delete(model: Type[MODEL], schema: Type[PydanticModel], pk_type: Type):
+def generate_delete(
+    model: Type[MODEL],
+    schema: Type[PydanticModel],
+    pk_type: Type,
+    strategy: str = "save",
+    db: Optional[ConnectionRouter] = None,
+):
     """
     生成视图集的delete方法
     Args:
         model: 视图集的orm模型
         schema: 视图输出序列化
         pk_type: 主键类型
+        strategy: 删除方式，都返回删除的数据
+            "direct" 不查询直接 DELETE ... WHERE pk RETURNING，一次往返；数据库不支持RETURNING(MySQL)时与其它方式相同；
+            其它 查询后删除
+        db: 读写操作使用的数据库连接，默认使用模型默认的连接
 
     Returns:
         CoroutineType: 由 async def 创建的协程方法
     """
+    db = db or ConnectionRouter()
 
-    @Action.delete(f"/{{pk}}", response_model=schema, responses={404: {"model": HTTPNotFoundError}})
+    @Action.delete(f"/{{pk}}", response_model=schema, responses={404: {"model": HTTPNotFoundError}}, mutating=True)
     async def delete(self, pk: pk_type):
-        obj = await model.get(pk=pk)
-        deleted_count_ = await obj.delete()
-        return await schema.from_tortoise_orm(obj)
+        using_db_ = db.write()
+        if strategy == "direct":
+            rows_ = await timed_query(_returning(model.filter(pk=pk).using_db(using_db_).delete()))
+            if rows_ is not None:
+                if not rows_:
+                    raise DoesNotExist("Object does not exist")
+                return await _from_obj(schema, model._init_from_db(**rows_[0]), using_db_)
+        obj = await timed_query(model.get(pk=pk, using_db=using_db_))
+        await timed_query(obj.delete(using_db=using_db_))
+        return await _from_obj(schema, obj, using_db_)
 
     delete.__doc__ = f"Delete {model.__name__} by primary key"
 
     return delete
 
 
-def generate_filter(model: Type[MODEL], schema: Type[PydanticModel], query_params: Dict[str, Tuple]):
+def generate_filter(
+    model: Type[MODEL],
+    schema: Type[PydanticModel],
+    query_params: Union[Dict[str, Tuple], FilterSet],
+    pagination: Optional[CursorPagination] = None,
+    stream_format: Optional[str] = None,
+    stream_batch_size: int = 1000,
+    last_modified_field: Optional[str] = None,
+    allowed_fields: Optional[FrozenSet[str]] = None,
+    raw_fields: Optional[Tuple[str, ...]] = None,
+    total_count_ttl: Optional[float] = None,
+    relations: Optional[RelationLoader] = None,
+    db: Optional[ConnectionRouter] = None,
+):
     """
     生成视图集的filter方法
     Args:
         model: 视图集的orm模型
         schema: 视图输出序列化
         query_params: 查询参数
-            {name: (default_value, default_type)} 例如 {"type": (None, str), "age": (18, int)}
-            作为key的name为作为查询条件的字段名。
-            作为value的default_value默认值和default_type默认值类型
+            {name: (default_value, default_type)} 例如 {"type": (None, str), "age__gte": (18, int)}
+            作为key的name为作为查询条件的字段名[__查询方式]。
+            作为value的default_value默认值和default_type默认值类型，详见FilterSet；
+            也可以直接传入已解析的FilterSet
+        pagination: 游标分页，为None时返回全部匹配的数据；分页与流式输出按游标排序，不支持ordering参数
+        stream_format: 流式输出格式 "ndjson" 或 "json"，开启后忽略分页
+        stream_batch_size: 流式输出时每批查询的数量
+        last_modified_field: auto_now的字段，用于条件请求时判断数据是否变化
+        allowed_fields: 查询参数fields允许的字段，为None时不支持fields参数
+        raw_fields: 不经过schema直接以 values() 查询并序列化的字段，为None时通过schema序列化
+        total_count_ttl: 分页时响应头X-Total-Count返回匹配数据总数，总数缓存的秒数；为None时不返回总数
+        relations: 关联数据的查询方式，默认预取schema需要的关联字段
+        db: 读写操作使用的数据库连接，默认使用模型默认的连接
 
     Returns:
         CoroutineType: 由 async def 创建的协程方法
     """
 
-    @Action.get("/filter", response_model=List[schema])
+    if stream_format is not None:
+        pagination = None
+    total_counter_ = _total_counter(pagination, total_count_ttl)
+    relations = relations or RelationLoader(schema)
+    if not isinstance(query_params, FilterSet):
+        query_params = FilterSet(model, query_params)
+    filter_set_ = query_params
+    orderable_ = pagination is None and stream_format is None
+    db = db or ConnectionRouter()
+
+    @Action.get("/filter", response_model=List[schema] if pagination is None else page_schema(schema), cache=True)
     async def filter(self, **kwargs):
-        q_filter = Q()
-        for name, v_ in query_params.items():
-            if name in kwargs and kwargs[name] is not None:
-                q_filter &= Q(**{name: kwargs[name]})
-        return await schema.from_queryset(model.filter(q_filter))
-
-    sig_params = [
-        Parameter(name, Parameter.KEYWORD_ONLY, default=v_[0], annotation=v_[1])
-        for name, v_ in query_params.items()
-    ]
-    sig_ = signature(filter)
-    sig_params.insert(0, sig_.parameters["self"])
-    sig_ = sig_.replace(parameters=sig_params)
-
-    filter.__signature__ = sig_
+        queryset_ = model.filter(filter_set_.build_q(kwargs)).using_db(db.read())
+        if orderable_:
+            ordering_ = filter_set_.ordering(kwargs)
+            if ordering_:
+                queryset_ = queryset_.order_by(*ordering_)
+        return await _query_list(
+            schema, queryset_, kwargs, pagination, stream_format, stream_batch_size,
+            allowed_fields, raw_fields, total_counter_, relations,
+        )
+
+    filter.__signature__ = _filter_signature(
+        filter,
+        filter_set_.parameters(ordering=orderable_),
+        _list_params(pagination, allowed_fields),
+    )
     filter.__doc__ = f"Filter {model.__name__} that match the query"
+    _set_validator(filter, _list_validator(model, schema, last_modified_field, filter_set_.build_q, db))
     return filter
+
+
+def generate_count(
+    model: Type[MODEL],
+    query_params: Union[Dict[str, Tuple], FilterSet],
+    db: Optional[ConnectionRouter] = None,
+):
+    """
+    生成视图集的count方法，以 COUNT(*) 查询匹配的数量，查询参数与filter视图相同
+    Args:
+        model: 视图集的orm模型
+        query_params: 查询参数，与generate_filter的query_params格式相同
+        db: 读写操作使用的数据库连接，默认使用模型默认的连接
+
+    Returns:
+        CoroutineType: 由 async def 创建的协程方法
+    """
+    if not isinstance(query_params, FilterSet):
+        query_params = FilterSet(model, query_params)
+    filter_set_ = query_params
+    db = db or ConnectionRouter()
+
+    @Action.get("/count", response_model=CountPydantic, cache=True)
+    async def count(self, **kwargs):
+        return CountPydantic(count=await timed_query(model.filter(filter_set_.build_q(kwargs)).using_db(db.read()).count()))
+
+    count.__signature__ = _filter_signature(count, filter_set_.parameters(ordering=False), [])
+    count.__doc__ = f"Count {model.__name__} that match the query"
+    return count
+
+
+def generate_exists(
+    model: Type[MODEL],
+    query_params: Union[Dict[str, Tuple], FilterSet],
+    db: Optional[ConnectionRouter] = None,
+):
+    """
+    生成视图集的exists方法，以 SELECT 1 ... LIMIT 1 查询是否存在匹配的数据，查询参数与filter视图相同
+    Args:
+        model: 视图集的orm模型
+        query_params: 查询参数，与generate_filter的query_params格式相同
+        db: 读写操作使用的数据库连接，默认使用模型默认的连接
+
+    Returns:
+        CoroutineType: 由 async def 创建的协程方法
+    """
+    if not isinstance(query_params, FilterSet):
+        query_params = FilterSet(model, query_params)
+    filter_set_ = query_params
+    db = db or ConnectionRouter()
+
+    @Action.get("/exists", response_model=ExistsPydantic, cache=True)
+    async def exists(self, **kwargs):
+        return ExistsPydantic(exists=await timed_query(model.filter(filter_set_.build_q(kwargs)).using_db(db.read()).exists()))
+
+    exists.__signature__ = _filter_signature(exists, filter_set_.parameters(ordering=False), [])
+    exists.__doc__ = f"Check whether any {model.__name__} matches the query"
+    return exists
+
+
+def generate_bulk_update(
+    model: Type[MODEL],
+    pk_type: Type,
+    input_schema: Type[PydanticModel],
+    query_params: Union[Dict[str, Tuple], FilterSet],
+    db: Optional[ConnectionRouter] = None,
+):
+    """
+    生成视图集的bulk_update方法，以一条 UPDATE ... WHERE 语句修改主键列表或查询条件匹配的数据
+    Args:
+        model: 视图集的orm模型
+        pk_type: 主键类型
+        input_schema: http视图的body序列化
+        query_params: 查询参数，与generate_filter的query_params格式相同
+        db: 读写操作使用的数据库连接，默认使用模型默认的连接
+
+    Returns:
+        CoroutineType: 由 async def 创建的协程方法
+    """
+
+    auto_now_fields_ = _auto_now_fields(model)
+    if not isinstance(query_params, FilterSet):
+        query_params = FilterSet(model, query_params)
+    filter_set_ = query_params
+    db = db or ConnectionRouter()
+
+    @Action.patch("/bulk", response_model=CountPydantic, mutating=True)
+    async def bulk_update(self, body, pks, **kwargs):
+        update_dict_ = _column_dict(model, body.dict(exclude_unset=True))
+        q_filter = _build_bulk_q(model, pks, filter_set_, kwargs)
+        if not update_dict_:
+            return CountPydantic(count=0)
+        now_ = timezone.now()
+        update_dict_.update({name: now_ for name in auto_now_fields_})
+        return CountPydantic(count=await timed_query(model.filter(q_filter).using_db(db.write()).update(**update_dict_)))
+
+    bulk_update.__signature__ = _filter_signature(bulk_update, filter_set_.parameters(ordering=False), [
+        Parameter("body", Parameter.KEYWORD_ONLY, annotation=input_schema),
+        Parameter("pks", Parameter.KEYWORD_ONLY, default=Query(None), annotation=Optional[List[pk_type]]),
+    ])
+    bulk_update.__doc__ = f"Update {model.__name__} in bulk by primary keys or query"
+    return bulk_update
+
+
+def generate_bulk_delete(
+    model: Type[MODEL],
+    pk_type: Type,
+    query_params: Union[Dict[str, Tuple], FilterSet],
+    db: Optional[ConnectionRouter] = None,
+):
+    """
+    生成视图集的bulk_delete方法，以一条 DELETE ... WHERE 语句删除主键列表或查询条件匹配的数据
+    Args:
+        model: 视图集的orm模型
+        pk_type: 主键类型
+        query_params: 查询参数，与generate_filter的query_params格式相同
+        db: 读写操作使用的数据库连接，默认使用模型默认的连接
+
+    Returns:
+        CoroutineType: 由 async def 创建的协程方法
+    """
+
+    if not isinstance(query_params, FilterSet):
+        query_params = FilterSet(model, query_params)
+    filter_set_ = query_params
+    db = db or ConnectionRouter()
+
+    @Action.delete("/bulk", response_model=CountPydantic, mutating=True)
+    async def bulk_delete(self, pks, **kwargs):
+        q_filter = _build_bulk_q(model, pks, filter_set_, kwargs)
+        return CountPydantic(count=await timed_query(model.filter(q_filter).using_db(db.write()).delete()))
+
+    bulk_delete.__signature__ = _filter_signature(bulk_delete, filter_set_.parameters(ordering=False), [
+        Parameter("pks", Parameter.KEYWORD_ONLY, default=Query(None), annotation=Optional[List[pk_type]]),
+    ])
+    bulk_delete.__doc__ = f"Delete {model.__name__} in bulk by primary keys or query"
+    return bulk_delete
+
+
+async def _query_list(
+    schema: Type[PydanticModel],
+    queryset: QuerySet,
+    kwargs: Dict,
+    pagination: Optional[CursorPagination],
+    stream_format: Optional[str],
+    stream_batch_size: int,
+    allowed_fields: Optional[FrozenSet[str]],
+    raw_fields: Optional[Tuple[str, ...]],
+    total_counter: Optional[TotalCounter] = None,
+    relations: Optional[RelationLoader] = None,
+):
+    """
+    all、filter视图的查询，根据配置返回全部数据、一页数据或流式响应。
+    请求指定了fields或配置了raw_fields时以 values() 查询并直接序列化；
+    有total_counter时分页响应头返回匹配数据的总数；relations为关联数据的查询方式
+    """
+    relations = relations or RelationLoader(schema)
+    fields_ = _parse_fields(kwargs.get("fields"), allowed_fields) or raw_fields
+    if stream_format is not None:
+        return QuerySetStreamingResponse(
+            schema, queryset, stream_format=stream_format, batch_size=stream_batch_size, fields=fields_, relations=relations
+        )
+    if pagination is not None:
+        page_ = await pagination.paginate(schema, queryset, kwargs["limit"], kwargs["after"], fields_, relations)
+        if total_counter is None:
+            return page_ if fields_ is None else ValuesJSONResponse(page_)
+        if fields_ is None:
+            page_["items"] = [item_.dict(by_alias=True) for item_ in page_["items"]]
+        return ValuesJSONResponse(page_, headers={TOTAL_COUNT_HEADER: str(await total_counter(queryset, kwargs))})
+    if fields_ is None:
+        objs_ = await timed_query(relations.apply(queryset))
+        return timed_build(lambda: [schema.from_orm(obj_) for obj_ in objs_])
+    return ValuesJSONResponse(await timed_query(queryset.values(*fields_)))
+
+
+async def _from_obj(schema: Type[PydanticModel], obj: MODEL, using_db: Any) -> PydanticModel:
+    """
+    序列化写视图修改后的数据，schema需要的关联数据与写入使用同一个连接查询，避免从副本读到未同步的数据
+    """
+    fetch_fields_ = fetch_fields(schema)
+    if fetch_fields_:
+        await timed_query(obj.fetch_related(*fetch_fields_, using_db=using_db))
+    return timed_build(lambda: schema.from_orm(obj))
+
+
+async def _fetch_one(schema: Type[PydanticModel], query: Awaitable[MODEL]) -> PydanticModel:
+    """
+    查询单条数据并序列化，分别计入查询与构造的耗时
+    """
+    obj_ = await timed_query(query)
+    return timed_build(lambda: schema.from_orm(obj_))
+
+
+def _total_counter(pagination: Optional[CursorPagination], ttl: Optional[float]) -> Optional[TotalCounter]:
+    """
+    生成分页列表总数的查询方法，总数按查询条件缓存ttl秒，避免大表每翻一页都执行 COUNT(*)；
+    缓存不会因数据修改而失效，ttl应尽量短
+    """
+    if pagination is None or ttl is None:
+        return None
+    memo_ = MemoryCacheBackend(maxsize=256)
+
+    async def total_counter(queryset: QuerySet, kwargs: Dict) -> int:
+        key_ = params_key({k: v for k, v in kwargs.items() if k not in _PAGE_PARAMS})
+        if key_ is None:
+            return await timed_query(queryset.count())
+        count_ = await memo_.get(key_)
+        if count_ is None:
+            count_ = str(await timed_query(queryset.count())).encode()
+            await memo_.set(key_, count_, ttl)
+        return int(count_)
+
+    return total_counter
+
+
+def _list_params(pagination: Optional[CursorPagination], allowed_fields: Optional[FrozenSet[str]]) -> List[Parameter]:
+    """
+    all、filter视图除查询条件外的参数
+    """
+    params_ = []
+    if pagination is not None:
+        params_.extend([
+            Parameter("limit", Parameter.KEYWORD_ONLY, default=pagination.limit_query(), annotation=Optional[int]),
+            Parameter("after", Parameter.KEYWORD_ONLY, default=None, annotation=Optional[str]),
+        ])
+    if allowed_fields is not None:
+        params_.append(Parameter("fields", Parameter.KEYWORD_ONLY, default=_fields_query(allowed_fields), annotation=Optional[str]))
+    return params_
+
+
+def _fields_query(allowed_fields: FrozenSet[str]) -> Any:
+    """
+    查询参数fields
+    """
+    return Query(None, description=f"Comma separated fields to return, allowed: {', '.join(sorted(allowed_fields))}")
+
+
+def _parse_fields(fields: Optional[str], allowed_fields: Optional[FrozenSet[str]]) -> Optional[Tuple[str, ...]]:
+    """
+    解析查询参数fields，包含不允许的字段时返回400
+    Args:
+        fields: 逗号分隔的字段
+        allowed_fields: 允许的字段
+
+    Returns:
+        Optional[Tuple[str, ...]]: 去重后的字段，未指定时返回None
+    """
+    if not fields or allowed_fields is None:
+        return None
+    fields_ = tuple(dict.fromkeys(f.strip() for f in fields.split(",") if f.strip()))
+    invalid_ = [f for f in fields_ if f not in allowed_fields]
+    if invalid_:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Invalid fields: {', '.join(invalid_)}")
+    return fields_ or None
+
+
+def _auto_now_fields(model: Type[MODEL]) -> List[str]:
+    """
+    获取模型中auto_now的字段
+    """
+    return [name for name, field in model._meta.fields_map.items() if getattr(field, "auto_now", False)]
+
+
+async def _returning(query: Union[UpdateQuery, DeleteQuery]) -> Optional[List[Dict]]:
+    """
+    以 ... RETURNING * 执行修改或删除，一次往返得到受影响的行；数据库不支持RETURNING时不执行，返回None
+    """
+    if query._db is None:
+        query._db = query._choose_db(True)
+    dialect_ = query._db.capabilities.dialect
+    if dialect_ not in _RETURNING_DIALECTS or (dialect_ == "sqlite" and sqlite3.sqlite_version_info < (3, 35)):
+        return None
+    query._make_query()
+    return await query._db.execute_query_dict(f"{query.query} RETURNING *", getattr(query, "values", None))
+
+
+def _as_pk_type(pk_type: Type, pk: Any) -> Any:
+    """
+    将主键转换为视图集声明的pk_type，例如UUID主键声明为str时返回字符串
+    """
+    if not isinstance(pk_type, type) or isinstance(pk, pk_type):
+        return pk
+    return pk_type(pk)
+
+
+def _column_dict(model: Type[MODEL], data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    只保留对应数据库列的字段(包括外键、一对一字段名)，输入序列化中的非数据库字段(例如确认密码)不会传给UPDATE
+    """
+    meta_ = model._meta
+    return {
+        key_: value_ for key_, value_ in data.items()
+        if key_ in meta_.fields_db_projection or key_ in meta_.fk_fields or key_ in meta_.o2o_fields
+    }
+
+
+def _update_fields(model: Type[MODEL], keys: Iterable[str]) -> List[str]:
+    """
+    save(update_fields=...) 的字段，外键、一对一字段名转换为对应的 *_id 字段
+    """
+    meta_ = model._meta
+    return [
+        meta_.fields_map[key_].source_field if key_ in meta_.fk_fields or key_ in meta_.o2o_fields else key_
+        for key_ in keys
+    ]
+
+
+def _set_validator(view_func: Callable, validator: Optional[ViewValidator]):
+    """
+    为视图添加条件请求时使用的数据版本获取方法
+    """
+    if validator is not None:
+        view_func.__dict__["__fast_validator__"] = validator
+
+
+def _single_validator(
+    model: Type[MODEL],
+    schema: Type[PydanticModel],
+    last_modified_field: Optional[str],
+    db: ConnectionRouter,
+) -> Optional[ViewValidator]:
+    """
+    生成单条数据的版本获取方法，只查询主键对应行的last_modified_field。
+    schema包含关联数据时关联数据的修改无法反映到此字段，返回None
+    """
+    if last_modified_field is None or fetch_fields(schema):
+        return None
+
+    async def validator(view_kwargs: Dict) -> Optional[Tuple[str, Optional[datetime]]]:
+        values_ = await model.filter(pk=view_kwargs["pk"]).using_db(db.read()).values_list(last_modified_field, flat=True)
+        if not values_:
+            return None
+        key_ = params_key({"kwargs": view_kwargs, "last_modified": values_[0]})
+        return None if key_ is None else (f'W/"{key_}"', values_[0])
+
+    return validator
+
+
+def _list_validator(
+    model: Type[MODEL],
+    schema: Type[PydanticModel],
+    last_modified_field: Optional[str],
+    build_q: Callable[[Dict], Q],
+    db: ConnectionRouter,
+) -> Optional[ViewValidator]:
+    """
+    生成列表数据的版本获取方法，以一条聚合查询获取匹配数据的 MAX(last_modified_field) 与 COUNT(*)。
+    schema包含关联数据时关联数据的修改无法反映到此字段，返回None
+    """
+    if last_modified_field is None or fetch_fields(schema):
+        return None
+
+    async def validator(view_kwargs: Dict) -> Optional[Tuple[str, Optional[datetime]]]:
+        row_ = (await model.filter(build_q(view_kwargs)).using_db(db.read()).annotate(
+            fast_cbv_last_modified=Max(last_modified_field),
+            fast_cbv_count=Count(model._meta.pk_attr),
+        ).values("fast_cbv_last_modified", "fast_cbv_count"))[0]
+        last_modified_ = row_["fast_cbv_last_modified"]
+        version_ = {"kwargs": view_kwargs, "last_modified": last_modified_, "count": row_["fast_cbv_count"]}
+        key_ = params_key(version_)
+        return None if key_ is None else (f'W/"{key_}"', last_modified_)
+
+    return validator
+
+
+def _build_bulk_q(model: Type[MODEL], pks: Optional[List], filter_set: FilterSet, kwargs: Dict) -> Q:
+    """
+    构建批量操作的查询条件，主键列表与查询参数都为空时拒绝请求，避免误操作全表
+    """
+    q_filter = filter_set.build_q(kwargs)
+    if pks:
+        q_filter &= Q(**{f"{model._meta.pk_attr}__in": pks})
+    elif not q_filter.filters and not q_filter.children:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Primary keys or query params are required")
+    return q_filter
+
+
+def _filter_signature(func: Callable, query_params: List[Parameter], extra_params: List[Parameter]) -> Signature:
+    """
+    根据查询参数生成视图的函数签名，供FastAPI解析请求参数
+    Args:
+        func: 视图函数
+        query_params: 查询参数，由FilterSet.parameters生成
+        extra_params: 查询参数之前的额外参数
+
+    Returns:
+        Signature: 函数签名
+    """
+    sig_ = signature(func)
+    return sig_.replace(parameters=[sig_.parameters["self"], *extra_params, *query_params])
@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/17 16:30
+# @Author  : Tuffy
+# @Description :
+from inspect import Parameter
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Type
+
+from fastapi import HTTPException, Query, status
+from tortoise.expressions import Q
+from tortoise.fields import Field
+from tortoise.models import MODEL
+
+# Tortoise支持的查询方式，参数名最后一段为其中之一时作为查询方式，否则整个参数名为字段(例如 company__name)
+LOOKUPS = {
+    "not", "gt", "gte", "lt", "lte", "range", "in", "not_in", "isnull", "not_isnull",
+    "contains", "icontains", "startswith", "istartswith", "endswith", "iendswith", "iexact", "search",
+    "year", "quarter", "month", "week", "day", "hour", "minute", "second", "microsecond",
+    "contained_by", "filter",
+}
+# 可以使用字段索引的查询方式，contains、endswith、year 等需要扫描全部行
+INDEXED_LOOKUPS = {"", "not", "gt", "gte", "lt", "lte", "range", "in", "not_in", "isnull", "not_isnull", "startswith", "istartswith"}
+LIST_LOOKUPS = {"in", "not_in", "range"}
+ORDERING_PARAM = "ordering"
+
+
+class FilterSet(object):
+    """
+    filter视图的查询参数，在创建视图集时解析一次，请求时直接映射为查询条件
+
+        {
+            "acronym": (None, str),  # acronym = ?
+            "name__istartswith": (None, str),  # 前缀匹配
+            "id__gte": (None, int), "id__lte": (None, int),  # 范围
+            "id__in": (None, List[int]),  # 列表，?id__in=1&id__in=2
+            "higher_id__isnull": (None, bool),
+            "name__icontains": (None, str),  # 其它Tortoise查询方式，无法使用索引
+            "company__name": (None, str),  # 跨关联查询
+            "ordering": ("-id", ("id", "name")),  # 排序，第二项为允许排序的字段
+        }
+    """
+
+    def __init__(self, model: Type[MODEL], query_params: Dict[str, Tuple], require_index: bool = False):
+        """
+        Args:
+            model: 视图集的orm模型
+            query_params: 查询参数 {name: (default_value, default_type)}，name为 字段名[__查询方式]；
+                "ordering" 为排序参数 (default_value, 允许排序的字段)
+            require_index: 是否要求查询与排序都能使用索引，为False时无法使用索引的参数记录在unindexed中
+
+        Raises:
+            ValueError: 查询参数配置不合法，或require_index时查询、排序无法使用索引
+        """
+        self.model = model
+        self.__names: List[str] = []
+        self.__parameters: List[Parameter] = []
+        self.orderable: Optional[frozenset] = None
+        self.default_ordering: Optional[str] = None
+        self.unindexed: List[str] = []
+
+        for name, (default_, type_) in query_params.items():
+            if name == ORDERING_PARAM:
+                self.orderable = frozenset(type_)
+                self.default_ordering = default_
+                for field_ in sorted(self.orderable):
+                    self.__check_field(field_, "", require_index)
+                continue
+
+            field_, _, lookup_ = name.rpartition("__")
+            if lookup_ not in LOOKUPS:
+                field_, lookup_ = name, ""
+            self.__check_field(field_, lookup_, require_index)
+
+            if lookup_ in LIST_LOOKUPS:
+                if getattr(type_, "__origin__", None) not in (list, List):
+                    type_ = List[type_]
+                # 列表参数需要声明为Query，否则会被当作body
+                default_ = Query(default_)
+            self.__names.append(name)
+            self.__parameters.append(Parameter(name, Parameter.KEYWORD_ONLY, default=default_, annotation=type_))
+
+    def __check_field(self, name: str, lookup: str, require_index: bool):
+        # 跨关联的查询(例如 company__name)只检查关联字段是否存在，无法确认关联表的索引
+        relation_, _, related_ = name.partition("__")
+        field_ = self.__resolve_field(relation_)
+        if field_ is None or (related_ and relation_ not in self.model._meta.fetch_fields):
+            raise ValueError(f"{self.model.__name__} has no field \"{name}\"")
+        if related_ or lookup not in INDEXED_LOOKUPS or not self.__is_indexed(name, field_):
+            param_ = f"{name}__{lookup}" if lookup else name
+            if require_index:
+                raise ValueError(f"The filter \"{param_}\" of {self.model.__name__} cannot use an index")
+            self.unindexed.append(param_)
+
+    def __resolve_field(self, name: str) -> Optional[Field]:
+        """
+        获取字段，外键的 xxx_id 字段在Tortoise初始化前不存在，使用外键字段代替
+        """
+        meta_ = self.model._meta
+        if name in meta_.fields_map:
+            return meta_.fields_map[name]
+        if name.endswith("_id") and name[:-3] in (meta_.fk_fields | meta_.o2o_fields):
+            return meta_.fields_map[name[:-3]]
+        return None
+
+    def __is_indexed(self, name: str, field: Field) -> bool:
+        """
+        字段是否有索引：主键、唯一、index=True，或为联合索引的第一个字段
+        """
+        if field.pk or field.unique or field.index:
+            return True
+        meta_ = self.model._meta
+        names_ = {name, field.model_field_name, getattr(field, "source_field", None)}
+        for index_ in (*meta_.indexes, *meta_.unique_together):
+            fields_ = getattr(index_, "fields", index_)
+            if fields_ and fields_[0] in names_:
+                return True
+        return False
+
+    def parameters(self, ordering: bool = True) -> List[Parameter]:
+        """
+        视图签名中的查询参数
+        Args:
+            ordering: 是否包含排序参数
+
+        Returns:
+            List[Parameter]: 查询参数
+        """
+        if not ordering or self.orderable is None:
+            return list(self.__parameters)
+        return [*self.__parameters, Parameter(
+            ORDERING_PARAM,
+            Parameter.KEYWORD_ONLY,
+            default=Query(self.default_ordering, description=f"Comma separated, allowed: {', '.join(sorted(self.orderable))}"),
+            annotation=Optional[str],
+        )]
+
+    def build_q(self, kwargs: Dict[str, Any]) -> Q:
+        """
+        根据请求的查询参数构建查询条件
+        """
+        return Q(**{name_: kwargs[name_] for name_ in self.__names if kwargs.get(name_) is not None})
+
+    def ordering(self, kwargs: Dict[str, Any]) -> Sequence[str]:
+        """
+        解析请求的排序参数，包含不允许的字段时返回400
+        """
+        ordering_ = kwargs.get(ORDERING_PARAM)
+        if self.orderable is None or not ordering_:
+            return ()
+        fields_ = tuple(f.strip() for f in ordering_.split(",") if f.strip())
+        invalid_ = [f for f in fields_ if f.lstrip("-") not in self.orderable]
+        if invalid_:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Invalid ordering: {', '.join(invalid_)}")
+        return fields_
@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/17 20:05
+# @Author  : Tuffy
+# @Description :
+from collections import deque
+from typing import Any, Callable, Deque
+
+
+class BaseInstanceProvider(object):
+    """
+    提供调用视图时的self，请求开始时acquire，视图返回后release
+    """
+
+    def acquire(self) -> Any:
+        raise NotImplementedError
+
+    def release(self, instance: Any) -> None:
+        pass
+
+
+class SingletonProvider(BaseInstanceProvider):
+    """
+    注册时创建一个实例，所有请求共用；实例上的状态会被并发的请求共享
+    """
+
+    def __init__(self, factory: Callable[[], Any]):
+        self.instance = factory()
+
+    def acquire(self) -> Any:
+        return self.instance
+
+
+class PerRequestProvider(BaseInstanceProvider):
+    """
+    每个请求创建一个实例
+    """
+
+    def __init__(self, factory: Callable[[], Any]):
+        self.factory = factory
+
+    def acquire(self) -> Any:
+        return self.factory()
+
+
+class PooledProvider(BaseInstanceProvider):
+    """
+    实例池，每个实例同一时间只被一个请求使用，视图返回后归还复用；
+    池中没有空闲实例时创建新实例，归还时超过pool_size的实例被丢弃
+    """
+
+    def __init__(self, factory: Callable[[], Any], pool_size: int):
+        self.factory = factory
+        self.pool_size = pool_size
+        self.__idle: Deque[Any] = deque()
+
+    def acquire(self) -> Any:
+        return self.__idle.pop() if self.__idle else self.factory()
+
+    def release(self, instance: Any) -> None:
+        if len(self.__idle) < self.pool_size:
+            self.__idle.append(instance)
+
+
+LIFECYCLES = {"singleton", "per_request", "pooled"}
+
+
+def create_provider(lifecycle: str, factory: Callable[[], Any], pool_size: int) -> BaseInstanceProvider:
+    """
+    根据生命周期创建实例提供者
+    Args:
+        lifecycle: "singleton"、"per_request"、"pooled"
+        factory: 创建实例的方法
+        pool_size: "pooled" 时池中保留的空闲实例数量
+
+    Returns:
+        BaseInstanceProvider: 实例提供者
+    """
+    if lifecycle == "per_request":
+        return PerRequestProvider(factory)
+    if lifecycle == "pooled":
+        return PooledProvider(factory, pool_size)
+    return SingletonProvider(factory)
@@ -0,0 +1,224 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/17 23:10
+# @Author  : Tuffy
+# @Description :
+from bisect import bisect_left
+from contextvars import ContextVar
+from time import perf_counter
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Sequence, Tuple, TypeVar
+
+from starlette.responses import Response
+
+T = TypeVar("T")
+PROMETHEUS_MEDIA_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+DEFAULT_SECONDS_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+DEFAULT_ROWS_BUCKETS = (0, 1, 10, 100, 1000, 10000, 100000)
+
+
+class ViewTimings(object):
+    """
+    一次请求中累计的耗时
+    """
+    __slots__ = ("view", "db", "model", "serialize", "rows")
+
+    def __init__(self):
+        self.view = 0.0
+        self.db = 0.0
+        self.model = 0.0
+        self.serialize = 0.0
+        self.rows: Optional[int] = None
+
+    def add_rows(self, rows: int) -> None:
+        self.rows = rows if self.rows is None else self.rows + rows
+
+
+# 当前请求的耗时，未开启统计时为None；此时生成视图中的计时只多一次ContextVar读取，开销预算为每次查询、构造不超过1微秒(benchmarks/metrics_overhead.py)
+current_timings: ContextVar[Optional[ViewTimings]] = ContextVar("fast_cbv_timings", default=None)
+
+
+async def timed_query(query: Awaitable[T]) -> T:
+    """
+    执行查询并计入当前请求的db耗时，查询结果为对象或对象列表时计入返回的行数
+    """
+    timings_ = current_timings.get()
+    if timings_ is None:
+        return await query
+    start_ = perf_counter()
+    try:
+        result_ = await query
+    finally:
+        timings_.db += perf_counter() - start_
+    if isinstance(result_, list):
+        timings_.add_rows(len(result_))
+    elif result_ is not None and not isinstance(result_, (int, bool)):
+        timings_.add_rows(1)
+    return result_
+
+
+def timed_build(build: Callable[[], T]) -> T:
+    """
+    构造Pydantic对象并计入当前请求的model耗时
+    """
+    timings_ = current_timings.get()
+    if timings_ is None:
+        return build()
+    start_ = perf_counter()
+    try:
+        return build()
+    finally:
+        timings_.model += perf_counter() - start_
+
+
+def timed_renderer(render: Callable[..., Awaitable[Response]]) -> Callable[..., Awaitable[Response]]:
+    """
+    包装视图返回值的渲染方法，校验、编码与构造响应的耗时计入当前请求的serialize耗时
+    """
+
+    async def timed_render(*args: Any) -> Response:
+        timings_ = current_timings.get()
+        if timings_ is None:
+            return await render(*args)
+        start_ = perf_counter()
+        try:
+            return await render(*args)
+        finally:
+            timings_.serialize += perf_counter() - start_
+
+    return timed_render
+
+
+class BaseMetricsSink(object):
+    """
+    视图耗时的接收端，对接其它监控系统时继承此类实现record。记录的阶段：
+        total      转发层收到请求到得到响应的总耗时
+        dispatch   转发层自身的耗时(等待并发名额、缓存、条件请求等)，即 total - view - serialize
+        view       视图函数的耗时，包括db与model
+        db         生成视图中数据库查询的耗时
+        model      生成视图中构造Pydantic对象的耗时
+        serialize  视图返回值校验、编码为响应的耗时
+    """
+
+    def record(self, viewset: str, action: str, timings: Dict[str, float], rows: Optional[int]) -> None:
+        """
+        记录一次请求
+        Args:
+            viewset: 视图集类名称
+            action: 视图名称
+            timings: 各阶段耗时的秒数 {"total": ..., "dispatch": ..., "view": ..., "db": ..., "model": ..., "serialize": ...}
+            rows: 返回的行数，视图未查询数据时为None
+        """
+        raise NotImplementedError
+
+
+class _Histogram(object):
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        index_ = bisect_left(self.buckets, value)
+        if index_ < len(self.counts):
+            self.counts[index_] += 1
+        self.sum += value
+        self.count += 1
+
+    def samples(self) -> Iterable[Tuple[str, float]]:
+        cumulative_ = 0
+        for bound_, count_ in zip(self.buckets, self.counts):
+            cumulative_ += count_
+            yield _format_value(bound_), cumulative_
+        yield "+Inf", self.count
+
+
+class HistogramMetricsSink(BaseMetricsSink):
+    """
+    进程内的直方图统计，按(视图集, 视图, 阶段)统计耗时，按(视图集, 视图)统计返回行数；
+    prometheus_text 生成Prometheus文本格式
+
+        sink = HistogramMetricsSink()
+        class CompanyViewSet(BaseViewSet):
+            metrics_sink = sink
+        app.add_api_route("/metrics", prometheus_endpoint(sink), include_in_schema=False)
+    """
+
+    def __init__(
+        self,
+        seconds_buckets: Sequence[float] = DEFAULT_SECONDS_BUCKETS,
+        rows_buckets: Sequence[float] = DEFAULT_ROWS_BUCKETS,
+        prefix: str = "fast_cbv",
+    ):
+        """
+        Args:
+            seconds_buckets: 耗时直方图的上界
+            rows_buckets: 行数直方图的上界
+            prefix: 指标名称前缀
+        """
+        self.seconds_buckets = tuple(sorted(seconds_buckets))
+        self.rows_buckets = tuple(sorted(rows_buckets))
+        self.prefix = prefix
+        self.__seconds: Dict[Tuple[str, str, str], _Histogram] = {}
+        self.__rows: Dict[Tuple[str, str], _Histogram] = {}
+
+    def record(self, viewset: str, action: str, timings: Dict[str, float], rows: Optional[int]) -> None:
+        for phase_, seconds_ in timings.items():
+            key_ = (viewset, action, phase_)
+            histogram_ = self.__seconds.get(key_)
+            if histogram_ is None:
+                histogram_ = self.__seconds[key_] = _Histogram(self.seconds_buckets)
+            histogram_.observe(seconds_)
+        if rows is not None:
+            histogram_ = self.__rows.get((viewset, action))
+            if histogram_ is None:
+                histogram_ = self.__rows[(viewset, action)] = _Histogram(self.rows_buckets)
+            histogram_.observe(rows)
+
+    def prometheus_text(self) -> str:
+        """
+        生成Prometheus文本格式(0.0.4)的指标
+        """
+        lines_: List[str] = []
+        seconds_name_ = f"{self.prefix}_view_duration_seconds"
+        lines_.append(f"# HELP {seconds_name_} Time spent in each phase of a viewset action.")
+        lines_.append(f"# TYPE {seconds_name_} histogram")
+        for (viewset_, action_, phase_), histogram_ in sorted(self.__seconds.items()):
+            _histogram_lines(lines_, seconds_name_, f'viewset="{_escape(viewset_)}",action="{_escape(action_)}",phase="{phase_}"', histogram_)
+        rows_name_ = f"{self.prefix}_view_rows"
+        lines_.append(f"# HELP {rows_name_} Rows returned by a viewset action.")
+        lines_.append(f"# TYPE {rows_name_} histogram")
+        for (viewset_, action_), histogram_ in sorted(self.__rows.items()):
+            _histogram_lines(lines_, rows_name_, f'viewset="{_escape(viewset_)}",action="{_escape(action_)}"', histogram_)
+        return "\n".join(lines_) + "\n"
+
+    def clear(self) -> None:
+        self.__seconds.clear()
+        self.__rows.clear()
+
+
+def prometheus_endpoint(sink: HistogramMetricsSink) -> Callable[[], Awaitable[Response]]:
+    """
+    生成输出sink指标的FastAPI视图函数，例如 app.add_api_route("/metrics", prometheus_endpoint(sink))
+    """
+
+    async def metrics() -> Response:
+        return Response(sink.prometheus_text(), media_type=PROMETHEUS_MEDIA_TYPE)
+
+    return metrics
+
+
+def _histogram_lines(lines: List[str], name: str, labels: str, histogram: _Histogram) -> None:
+    for bound_, cumulative_ in histogram.samples():
+        lines.append(f'{name}_bucket{{{labels},le="{bound_}"}} {cumulative_}')
+    lines.append(f"{name}_sum{{{labels}}} {_format_value(histogram.sum)}")
+    lines.append(f"{name}_count{{{labels}}} {histogram.count}")
+
+
+def _format_value(value: Any) -> str:
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/17 10:02
+# @Author  : Tuffy
+# @Description :
+import base64
+import binascii
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Type, Union
+
+import orjson
+from fastapi import HTTPException, Query, status
+from pydantic import create_model
+from tortoise.contrib.pydantic import PydanticModel
+from tortoise.expressions import Q
+from tortoise.models import MODEL
+from tortoise.queryset import QuerySet
+
+from .metrics import timed_build, timed_query
+from .relations import RelationLoader
+
+
+@lru_cache(maxsize=None)
+def page_schema(schema: Type[PydanticModel]) -> Type[PydanticModel]:
+    """
+    生成分页响应的序列化，同一个schema只生成一次，避免openapi中出现重名模型
+    Args:
+        schema: 视图输出的序列化
+
+    Returns:
+        Type[PydanticModel]: {"items": [...], "next": "游标"}
+    """
+    return create_model(
+        f"{schema.__name__}Page",
+        items=(List[schema], ...),
+        next=(Optional[str], None),
+    )
+
+
+class CursorPagination(object):
+    """
+    基于游标(keyset)的分页，按 cursor_field(可用"-"前缀表示倒序) 与主键排序，
+    每页以上一页最后一行的值作为条件，翻页成本不随页数增加
+    """
+
+    def __init__(self, model: Type[MODEL], page_size: int, cursor_field: Optional[str] = None, max_page_size: Optional[int] = None):
+        self.model = model
+        self.page_size = page_size
+        self.max_page_size = max(max_page_size or page_size, page_size)
+
+        pk_ = model._meta.pk_attr
+        cursor_field = cursor_field or pk_
+        self.descending = cursor_field.startswith("-")
+        cursor_field = cursor_field.lstrip("-")
+        # 非主键字段可能重复，追加主键保证排序唯一
+        self.fields: Tuple[str, ...] = (cursor_field,) if cursor_field == pk_ else (cursor_field, pk_)
+        self.ordering: Tuple[str, ...] = tuple(f"-{f}" if self.descending else f for f in self.fields)
+        self.__lookup = "lt" if self.descending else "gt"
+
+    def limit_query(self) -> Any:
+        """
+        每页数量的查询参数
+        """
+        return Query(None, ge=1, le=self.max_page_size, description=f"Page size, default {self.page_size}")
+
+    def values_of(self, obj: Union[MODEL, Dict[str, Any]]) -> List[Any]:
+        """
+        获取一行数据(模型对象或 values() 的结果)的游标字段值
+        """
+        if isinstance(obj, dict):
+            return [obj[f] for f in self.fields]
+        return [getattr(obj, f) for f in self.fields]
+
+    def encode(self, obj: Union[MODEL, Dict[str, Any]]) -> str:
+        """
+        根据一行数据生成不透明的游标
+        """
+        return base64.urlsafe_b64encode(orjson.dumps(self.values_of(obj), default=str)).rstrip(b"=").decode()
+
+    def decode(self, cursor: str) -> List[Any]:
+        """
+        解析游标，非法游标返回400
+        """
+        try:
+            values_ = orjson.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+            if not isinstance(values_, list) or len(values_) != len(self.fields):
+                raise ValueError(cursor)
+            fields_map_ = self.model._meta.fields_map
+            return [fields_map_[f].to_python_value(v) for f, v in zip(self.fields, values_)]
+        except (binascii.Error, ValueError, TypeError):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+    def apply(self, queryset: QuerySet, after: Optional[str]) -> QuerySet:
+        """
+        对查询集添加排序与游标条件
+        """
+        if after is None:
+            return queryset.order_by(*self.ordering)
+        return self.seek(queryset, self.decode(after))
+
+    def seek(self, queryset: QuerySet, values: Optional[List[Any]]) -> QuerySet:
+        """
+        对查询集添加排序，并定位到游标字段值之后
+        Args:
+            queryset: 查询集
+            values: 游标字段值，为None时从头开始
+
+        Returns:
+            QuerySet: 查询集
+        """
+        queryset = queryset.order_by(*self.ordering)
+        if values is None:
+            return queryset
+        q_after = Q()
+        # (a, b) > (x, y) 展开为 a > x OR (a = x AND b > y)
+        for idx_, field_ in enumerate(self.fields):
+            q_ = Q(**{f"{field_}__{self.__lookup}": values[idx_]}, **{f: v for f, v in zip(self.fields[:idx_], values)})
+            q_after = q_ if idx_ == 0 else q_after | q_
+        return queryset.filter(q_after)
+
+    async def paginate(
+        self,
+        schema: Type[PydanticModel],
+        queryset: QuerySet,
+        limit: Optional[int],
+        after: Optional[str],
+        fields: Optional[Sequence[str]] = None,
+        relations: Optional[RelationLoader] = None,
+    ) -> Dict:
+        """
+        查询一页数据
+        Args:
+            schema: 视图输出的序列化
+            queryset: 查询集
+            limit: 每页数量
+            after: 上一页返回的游标
+            fields: 只查询并返回的字段，此时items为字典列表；为None时items为schema列表
+            relations: 关联数据的查询方式，默认预取schema需要的关联字段
+
+        Returns:
+            Dict: {"items": [...], "next": "游标"}
+        """
+        limit = limit or self.page_size
+        queryset = self.apply(queryset, after).limit(limit + 1)
+        if fields is None:
+            objs_ = await timed_query((relations or RelationLoader(schema)).apply(queryset))
+            items_ = timed_build(lambda: [schema.from_orm(obj_) for obj_ in objs_[:limit]])
+        else:
+            # 游标字段未被请求时也需要查询，用于生成下一页的游标
+            objs_ = await timed_query(queryset.values(*fields, *(f for f in self.fields if f not in fields)))
+            items_ = [{f: obj_[f] for f in fields} for obj_ in objs_[:limit]]
+        next_ = self.encode(objs_[limit - 1]) if len(objs_) > limit else None
+        return {"items": items_, "next": next_}
@@ -0,0 +1,14 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/17 13:05
+# @Author  : Tuffy
+# @Description :
+
+from pydantic import BaseModel, Field
+
+
+class CountPydantic(BaseModel):
+    count: int = Field(..., description="Number of matched or affected rows")
+
+
+class ExistsPydantic(BaseModel):
+    exists: bool = Field(..., description="Whether any row matches")
@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/17 23:40
+# @Author  : Tuffy
+# @Description :
+import re
+from collections import Counter
+from contextvars import ContextVar
+from functools import wraps
+from time import perf_counter
+from typing import Any, Callable, List, Optional, Set, Tuple
+
+# 记录的数据库客户端方法，execute_script 只用于建表等脚本，不计入
+_EXECUTE_METHODS = ("execute_query", "execute_query_dict", "execute_insert", "execute_many")
+_STRING_REGEX = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_REGEX = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?(?:e[+-]?\d+)?\b", re.IGNORECASE)
+_PLACEHOLDER_REGEX = re.compile(r"\$\d+|%s|\?")
+_IN_LIST_REGEX = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_SPACE_REGEX = re.compile(r"\s+")
+
+
+def statement_shape(sql: str) -> str:
+    """
+    去掉SQL中的字面量与参数占位符，只有参数不同的语句得到相同的形状，例如
+    SELECT ... WHERE "id"=1 与 SELECT ... WHERE "id"=2 都为 SELECT ... WHERE "id"=?
+    """
+    shape_ = _STRING_REGEX.sub("?", sql)
+    shape_ = _NUMBER_REGEX.sub("?", shape_)
+    shape_ = _PLACEHOLDER_REGEX.sub("?", shape_)
+    shape_ = _IN_LIST_REGEX.sub("(...)", shape_)
+    return _SPACE_REGEX.sub(" ", shape_).strip()
+
+
+class QueryRecorder(object):
+    """
+    一次请求中执行的SQL与各自的耗时
+    """
+    __slots__ = ("statements",)
+
+    def __init__(self):
+        self.statements: List[Tuple[str, float]] = []
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    @property
+    def seconds(self) -> float:
+        return sum(seconds_ for _, seconds_ in self.statements)
+
+    def repeated(self, threshold: int = 2) -> List[Tuple[str, int]]:
+        """
+        执行次数不少于threshold的语句形状，按次数倒序；同一形状在一次请求中重复执行通常是N+1查询
+        Args:
+            threshold: 最少执行次数
+
+        Returns:
+            List[Tuple[str, int]]: [(形状, 次数), ...]
+        """
+        counter_ = Counter(statement_shape(sql_) for sql_, _ in self.statements)
+        return [(shape_, count_) for shape_, count_ in counter_.most_common() if count_ >= threshold]
+
+
+# 当前请求的记录，未开启记录时为None；此时数据库客户端的方法只多一次ContextVar读取
+current_recorder: ContextVar[Optional[QueryRecorder]] = ContextVar("fast_cbv_query_recorder", default=None)
+# 不区分上下文接收每条SQL的回调 (SQL, 秒数)，testing.capture_queries 以此记录在其它线程中处理的请求
+query_listeners: List[Callable[[str, float], None]] = []
+# 正在记录的语句，客户端方法之间互相调用时只记录最外层的一次
+_recording: ContextVar[bool] = ContextVar("fast_cbv_query_recording", default=False)
+_instrumented: Set[type] = set()
+_installed = False
+# 超出查询预算时的回调 (视图集, 视图, 预算, 记录)，testing.enforce_query_budgets 以此收集
+budget_listeners: List[Callable[[str, str, int, QueryRecorder], None]] = []
+
+
+def _record(method: Callable) -> Callable:
+    @wraps(method)
+    async def recorded(self: Any, query: str, *args: Any, **kwargs: Any) -> Any:
+        recorder_ = current_recorder.get()
+        if (recorder_ is None and not query_listeners) or _recording.get():
+            return await method(self, query, *args, **kwargs)
+        token_ = _recording.set(True)
+        start_ = perf_counter()
+        try:
+            return await method(self, query, *args, **kwargs)
+        finally:
+            seconds_ = perf_counter() - start_
+            _recording.reset(token_)
+            if recorder_ is not None:
+                recorder_.statements.append((query, seconds_))
+            for listener_ in list(query_listeners):
+                listener_(query, seconds_)
+
+    recorded.__fast_recorded__ = True
+    return recorded
+
+
+def _instrument(client_class: type) -> None:
+    if client_class in _instrumented:
+        return
+    _instrumented.add(client_class)
+    for name_ in _EXECUTE_METHODS:
+        method_ = client_class.__dict__.get(name_)
+        if method_ is not None and not getattr(method_, "__fast_recorded__", False):
+            setattr(client_class, name_, _record(method_))
+
+
+def install_query_recorder() -> None:
+    """
+    包装Tortoise数据库客户端(包括事务)执行SQL的方法，使current_recorder与query_listeners生效；
+    只在第一次调用时遍历已导入的客户端类，之后导入的客户端类(Tortoise.init时按配置导入)在定义时包装。
+    注册记录查询的视图时调用，请求时不再调用
+    """
+    global _installed
+    if _installed:
+        return
+    _installed = True
+    from tortoise.backends.base.client import BaseDBAsyncClient
+
+    classes_ = [BaseDBAsyncClient]
+    while classes_:
+        class_ = classes_.pop()
+        classes_.extend(class_.__subclasses__())
+        _instrument(class_)
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super(BaseDBAsyncClient, cls).__init_subclass__(**kwargs)
+        _instrument(cls)
+
+    BaseDBAsyncClient.__init_subclass__ = classmethod(__init_subclass__)
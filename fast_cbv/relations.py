@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/17 20:40
+# @Author  : Tuffy
+# @Description :
+from typing import List, Sequence, Type, Union
+
+from tortoise.contrib.pydantic import PydanticModel
+from tortoise.contrib.pydantic.base import _get_fetch_fields
+from tortoise.models import MODEL
+from tortoise.query_utils import Prefetch
+from tortoise.queryset import QuerySet
+
+
+def fetch_fields(schema: Type[PydanticModel]) -> List[str]:
+    """
+    获取序列化所需预取的关联字段，与 from_queryset 的预取行为保持一致
+    Args:
+        schema: 视图输出的序列化
+
+    Returns:
+        List[str]: 需要 prefetch_related 的字段
+    """
+    return _get_fetch_fields(schema, getattr(schema.__config__, "orig_model"))
+
+
+class RelationLoader(object):
+    """
+    生成视图查询关联数据的方式：select_related 的字段与主表JOIN在同一条SQL中查询，
+    schema需要的其余关联字段以 prefetch_related 每个关联一条SQL查询，查询次数与数据量无关
+
+        RelationLoader(PositionPydantic, select_related=("company", "higher__company"))
+    """
+
+    def __init__(
+        self,
+        schema: Type[PydanticModel],
+        select_related: Sequence[str] = (),
+        prefetch_related: Sequence[Union[str, Prefetch]] = (),
+    ):
+        """
+        Args:
+            schema: 视图输出的序列化
+            select_related: JOIN查询的外键、一对一字段，可以用 "__" 跨多级
+            prefetch_related: 除schema需要的关联字段外额外预取的字段或Prefetch
+        """
+        self.select_related = tuple(select_related)
+        # 已被JOIN查询的关联字段不再预取
+        self.prefetch_related = (
+            *(
+                field_ for field_ in fetch_fields(schema)
+                if not any(s_ == field_ or s_.startswith(f"{field_}__") for s_ in self.select_related)
+            ),
+            *prefetch_related,
+        )
+
+    def apply(self, queryset: QuerySet) -> QuerySet:
+        """
+        为查询集添加关联数据的查询
+        """
+        if self.select_related:
+            queryset = queryset.select_related(*self.select_related)
+        if self.prefetch_related:
+            queryset = queryset.prefetch_related(*self.prefetch_related)
+        return queryset
+
+    @staticmethod
+    def invalid_select_related(model: Type[MODEL], select_related: Sequence[str]) -> List[str]:
+        """
+        获取不能JOIN查询的字段，只有外键与一对一字段可以 select_related；
+        Tortoise初始化前关联模型未解析，跨多级的字段只检查第一级
+        """
+        meta_ = model._meta
+        return [path_ for path_ in select_related if path_.split("__")[0] not in meta_.fk_fields | meta_.o2o_fields]
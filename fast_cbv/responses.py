@@ -0,0 +1,27 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/17 15:40
+# @Author  : Tuffy
+# @Description :
+from decimal import Decimal
+from typing import Any
+
+import orjson
+from starlette.responses import JSONResponse
+
+
+def orjson_default(obj: Any) -> Any:
+    """
+    orjson 不支持的类型的序列化，与 jsonable_encoder 的结果保持一致
+    """
+    if isinstance(obj, Decimal):
+        return float(obj)
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+class ValuesJSONResponse(JSONResponse):
+    """
+    直接序列化 QuerySet.values() 查询结果的响应，不经过 Pydantic 校验与 jsonable_encoder
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=orjson_default, option=orjson.OPT_NON_STR_KEYS)
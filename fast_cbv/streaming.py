@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/17 11:20
+# @Author  : Tuffy
+# @Description :
+from typing import AsyncIterator, Optional, Sequence, Type
+
+import orjson
+from starlette.responses import StreamingResponse
+from tortoise.contrib.pydantic import PydanticModel
+from tortoise.queryset import QuerySet
+
+from .pagination import CursorPagination
+from .relations import RelationLoader
+from .responses import orjson_default
+
+STREAM_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "json": "application/json",
+}
+
+
+async def iter_queryset(
+    schema: Type[PydanticModel],
+    queryset: QuerySet,
+    batch_size: int,
+    fields: Optional[Sequence[str]] = None,
+    relations: Optional[RelationLoader] = None,
+) -> AsyncIterator[bytes]:
+    """
+    按主键分批遍历查询集，每批序列化为一段NDJSON；查询集的limit作为输出的总数上限
+    Args:
+        schema: 视图输出的序列化
+        queryset: 查询集，不能有排序与offset
+        batch_size: 每批查询的数量
+        fields: 只查询并输出的字段，为None时按schema输出
+        relations: 关联数据的查询方式，默认预取schema需要的关联字段
+
+    Returns:
+        AsyncIterator[bytes]: 每批数据序列化后的字节
+    """
+    _check_queryset(queryset)
+    keyset_ = CursorPagination(queryset.model, batch_size)
+    relations = relations or RelationLoader(schema)
+    remaining_ = queryset._limit
+    values_ = None
+    while True:
+        size_ = batch_size if remaining_ is None else min(batch_size, remaining_)
+        if size_ <= 0:
+            return
+        batch_ = keyset_.seek(queryset, values_).limit(size_)
+        if fields is None:
+            objs_ = await relations.apply(batch_)
+            rows_ = [schema.from_orm(obj_).dict(by_alias=True) for obj_ in objs_]
+        else:
+            objs_ = await batch_.values(*fields, *(f for f in keyset_.fields if f not in fields))
+            rows_ = [{f: obj_[f] for f in fields} for obj_ in objs_]
+        if not objs_:
+            return
+        yield b"".join(orjson.dumps(row_, default=orjson_default, option=orjson.OPT_APPEND_NEWLINE) for row_ in rows_)
+        if len(objs_) < size_:
+            return
+        if remaining_ is not None:
+            remaining_ -= len(objs_)
+        values_ = keyset_.values_of(objs_[-1])
+
+
+def _check_queryset(queryset: QuerySet) -> None:
+    """
+    分批遍历按主键排序并以主键定位，已有的排序与offset无法保留，直接拒绝而不是输出顺序不同的数据
+    """
+    if queryset._orderings or queryset._offset:
+        raise ValueError("Streaming queryset must not be ordered or offset, it is iterated in primary key order")
+
+
+async def iter_json_array(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """
+    将NDJSON分批数据转换为逐步输出的JSON数组
+    """
+    first_ = True
+    async for chunk_ in chunks:
+        yield (b"[" if first_ else b",") + chunk_.rstrip(b"\n").replace(b"\n", b",")
+        first_ = False
+    yield b"[]" if first_ else b"]"
+
+
+class QuerySetStreamingResponse(StreamingResponse):
+    """
+    流式输出查询集，内存占用只与batch_size相关；查询集按主键顺序输出，limit为输出的总数上限，
+    有排序或offset的查询集会抛出ValueError。自定义的Action可直接返回此响应
+
+        @Action.get("/export", response_model=List[UserPydantic])
+        async def export(self):
+            return QuerySetStreamingResponse(UserPydantic, User.all())
+    """
+
+    def __init__(
+        self,
+        schema: Type[PydanticModel],
+        queryset: QuerySet,
+        *,
+        stream_format: str = "ndjson",
+        batch_size: int = 1000,
+        fields: Optional[Sequence[str]] = None,
+        relations: Optional[RelationLoader] = None,
+        **kwargs,
+    ):
+        # 在开始响应前检查，避免响应头发送后才出错
+        _check_queryset(queryset)
+        content_ = iter_queryset(schema, queryset, batch_size, fields, relations)
+        if stream_format == "json":
+            content_ = iter_json_array(content_)
+        kwargs.setdefault("media_type", STREAM_MEDIA_TYPES[stream_format])
+        super().__init__(content_, **kwargs)
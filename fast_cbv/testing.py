@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/17 20:55
+# @Author  : Tuffy
+# @Description :
+from contextlib import contextmanager
+from typing import Iterator, List, Tuple
+
+from .queries import QueryRecorder, budget_listeners, install_query_recorder, query_listeners
+
+
+@contextmanager
+def capture_queries() -> Iterator[List[str]]:
+    """
+    记录上下文中执行的SQL，与视图集的record_queries、query_budget使用同一记录方式；
+    不区分上下文，TestClient在其它线程中处理的请求也会记录。需要在 Tortoise.init 之后使用
+
+        with capture_queries() as queries:
+            client.get("/position/all")
+        print(len(queries))
+    """
+    install_query_recorder()
+    queries_: List[str] = []
+
+    def listener(sql: str, seconds: float) -> None:
+        queries_.append(sql)
+
+    query_listeners.append(listener)
+    try:
+        yield queries_
+    finally:
+        query_listeners.remove(listener)
+
+
+@contextmanager
+def assert_max_queries(max_queries: int) -> Iterator[List[str]]:
+    """
+    断言上下文中执行的SQL不超过max_queries条。在不同数据量下对同一个列表视图使用相同的上限，
+    即可确认查询次数与数据量无关(没有N+1查询)
+
+        for rows in (10, 1000):
+            await create_positions(rows)
+            with assert_max_queries(3):
+                client.get("/position/all")
+    """
+    with capture_queries() as queries_:
+        yield queries_
+    if len(queries_) > max_queries:
+        raise AssertionError(
+            f"Expected at most {max_queries} queries, {len(queries_)} were executed:\n" + "\n".join(queries_)
+        )
+
+
+@contextmanager
+def enforce_query_budgets() -> Iterator[List[Tuple[str, str, int, List[str]]]]:
+    """
+    断言上下文中请求的视图执行的SQL都不超过声明的预算(视图集的query_budget或Action的query_budget)，
+    超出时列出每个视图执行的SQL；可在pytest的fixture中使用，使所有测试都检查预算
+
+        @pytest.fixture(autouse=True)
+        def query_budgets():
+            with enforce_query_budgets():
+                yield
+    """
+    violations_: List[Tuple[str, str, int, List[str]]] = []
+
+    def listener(viewset: str, action: str, budget: int, recorder: QueryRecorder) -> None:
+        violations_.append((viewset, action, budget, [sql_ for sql_, _ in recorder.statements]))
+
+    budget_listeners.append(listener)
+    try:
+        yield violations_
+    finally:
+        budget_listeners.remove(listener)
+    if violations_:
+        raise AssertionError("\n".join(
+            f"{viewset_}.{action_} executed {len(queries_)} queries, exceeding its budget of {budget_}:\n" + "\n".join(queries_)
+            for viewset_, action_, budget_, queries_ in violations_
+        ))
@@ -3,17 +3,22 @@
 # @Author  : Tuffy
 # @Description :
 import re
-from functools import wraps
-from types import MethodType
-from typing import Optional, Callable, Tuple, Dict, List, Any, Iterator
+from inspect import iscoroutinefunction
+from typing import Optional, Tuple, Dict, Any, Callable, Iterable, Sequence, Type
 
-from fastapi import APIRouter, Response
+from fastapi import APIRouter
 from fastapi.types import DecoratedCallable
-from loguru import logger
-from tortoise import Model
-from tortoise.contrib.pydantic import PydanticModel
 
-from .factory import generate_all, generate_create, generate_filter, generate_get, generate_update, generate_delete
+from .cache import BaseCacheBackend
+from .decorators import ViewSpec
+from .dispatch import (
+    admission_layer, cache_layer, conditional_layer, create_endpoint, create_renderer, deadline_layer,
+    invalidate_layer, metrics_layer, query_recorder_layer, read_your_writes_layer, single_flight_layer,
+    view_timing_layer,
+)
+from .executors import EXECUTORS, ViewExecutor
+from .lifecycle import LIFECYCLES, BaseInstanceProvider, create_provider
+from .metrics import BaseMetricsSink, timed_renderer
 
 
 class CBVTransponder(object):
@@ -22,39 +27,67 @@ class CBVTransponder(object):
 
 class ViewSetMetaClass(type):
     _essential_attribute_sets = {"model", "schema", "pk_type", "views"}
-    _all_view_name = {"all", "get", "create", "update", "delete"}
-    _inputable_view_name = {"create", "update"}
+    _all_view_name = {
+        "all", "get", "create", "bulk_create", "update", "bulk_update", "delete", "bulk_delete", "count", "exists",
+    }
+    _inputable_view_name = {"create", "bulk_create", "update", "bulk_update"}
 
     def __new__(mcs, name, bases, attrs):
         if name == "BaseViewSet":
-            return super().__new__(mcs, name, bases, attrs)
+            return mcs._collect_views(super().__new__(mcs, name, bases, attrs))
         # 如何此类继承了CBVTransponder，则直接实例化返回
         if CBVTransponder in bases:
             return super().__new__(mcs, name, bases, attrs)
 
         # 检查是否包含生成基础的方法所需的属性
         if not mcs._check_attrs(attrs, name):
-            return super().__new__(mcs, name, bases, attrs)
-        # 生成基础方法
-        if "all" in attrs["views"] and "all" not in attrs:
-            attrs["all"] = generate_all(attrs["model"], attrs["schema"])
+            return mcs._collect_views(super().__new__(mcs, name, bases, attrs))
+        # 只有需要生成基础方法的视图集才导入orm相关的模块，只使用Action的视图集不会导入tortoise、loguru
+        from .factory import generate_views
 
-        if "create" in attrs["views"] and "create" not in attrs:
-            attrs["create"] = generate_create(attrs["model"], attrs["schema"], attrs["views"]["create"])
+        generate_views(name, attrs, lambda key: mcs._get_attr(attrs, bases, key))
+        return mcs._collect_views(super().__new__(mcs, name, bases, attrs))
 
-        if "get" in attrs["views"] and "get" not in attrs:
-            attrs["get"] = generate_get(attrs["model"], attrs["schema"], attrs["pk_type"])
-
-        if "update" in attrs["views"] and "update" not in attrs:
-            attrs["update"] = generate_update(attrs["model"], attrs["schema"], attrs["pk_type"], attrs["views"]["update"])
+    @staticmethod
+    def _collect_views(cls: type) -> type:
+        """
+        收集类(包括父类)中的视图并按路由排序，保存到 cls.__fast_views__，注册时不再遍历类属性
+        Args:
+            cls: 新创建的视图集类
 
-        if "delete" in attrs["views"] and "delete" not in attrs:
-            attrs["delete"] = generate_delete(attrs["model"], attrs["schema"], attrs["pk_type"])
+        Returns:
+            type: cls
+        """
+        views_: Dict[str, DecoratedCallable] = {}
+        # 按MRO从基类到子类覆盖，与getattr的查找结果一致
+        for klass_ in reversed(cls.__mro__):
+            for attr_name, attr_ in vars(klass_).items():
+                if hasattr(attr_, "__fast_view__"):
+                    views_[attr_name] = attr_
+                else:
+                    views_.pop(attr_name, None)
+        cls.__fast_views__ = tuple(sorted(views_.items(), key=lambda x: x[1].__fast_view__.path))
+        return cls
 
-        if "filter" in attrs["views"] and "filter" not in attrs:
-            attrs["filter"] = generate_filter(attrs["model"], attrs["schema"], attrs["views"]["filter"])
+    @staticmethod
+    def _get_attr(attrs: Dict, bases: Tuple[type, ...], key: str, default: Any = None) -> Any:
+        """
+        获取类属性，类自身未定义时从父类中查找
+        Args:
+            attrs: 所有的类属性
+            bases: 父类
+            key: 属性名称
+            default: 默认值
 
-        return super().__new__(mcs, name, bases, attrs)
+        Returns:
+            Any: 属性值
+        """
+        if key in attrs:
+            return attrs[key]
+        for base_ in bases:
+            if hasattr(base_, key):
+                return getattr(base_, key)
+        return default
 
     # def __call__(cls, *args, **kwargs):
     #     # _instance = super().__call__(*args, **kwargs)
@@ -73,8 +106,15 @@ class ViewSetMetaClass(type):
         """
         check_iterable_ = (key not in attrs for key in ViewSetMetaClass._essential_attribute_sets)
         if any(key not in attrs for key in ViewSetMetaClass._essential_attribute_sets):
-            not all(check_iterable_) and logger.warning(f"Class<{name}> lacks {ViewSetMetaClass._essential_attribute_sets}")
+            if not all(check_iterable_):
+                from loguru import logger
+                logger.warning(f"Class<{name}> lacks {ViewSetMetaClass._essential_attribute_sets}")
             return False
+
+        from loguru import logger
+        from tortoise import Model
+        from tortoise.contrib.pydantic import PydanticModel
+
         if not issubclass(attrs["model"], Model):
             logger.warning(f"The \"model\" in {name} is invalid.")
             return False
@@ -98,6 +138,9 @@ class ViewSetMetaClass(type):
         Returns:
             bool: True 合法；False 不合法
         """
+        from loguru import logger
+        from tortoise.contrib.pydantic import PydanticModel
+
         if not isinstance(views, dict):
             logger.warning(f"The \"views\" in {name} is invalid.")
             return False
@@ -109,32 +152,131 @@ class ViewSetMetaClass(type):
         return True
 
 
+def register_many(router: APIRouter, viewsets: Iterable[Type["BaseViewSet"]]):
+    """
+    将多个视图集注册到同一个路由，重复的视图集只注册一次
+    Args:
+        router: 路由
+        viewsets: 视图集类
+    """
+    for viewset_ in dict.fromkeys(viewsets):
+        viewset_.register(router)
+
+
 class BaseViewSet(metaclass=ViewSetMetaClass):
     __path_regex = re.compile("ViewSets?$", re.IGNORECASE)
     __pascal_regex = re.compile(r"(?P<key>[A-Z][a-z]+)")
     __pascal_again_regex = re.compile(r"(?P<key>[A-Z]{2,})")
 
-    __transponder: Optional[CBVTransponder] = None
+    # 以下三项保存在每个视图集类自身的__dict__中，不从父类继承
+    __provider: Optional[BaseInstanceProvider] = None  # 视图集实例的提供者
+    __routes: Optional[Tuple[Tuple[DecoratedCallable, Dict], ...]] = None  # 已解析的(视图函数, 路由参数)
+    __executors: Optional[Dict[str, ViewExecutor]] = None  # 执行同步或CPU密集视图的线程池、进程池
 
     auto_view_path: bool = True  # 是否自动添加路由前缀
+    lifecycle: str = "singleton"  # 视图集实例的生命周期："singleton" 共用一个实例；"per_request" 每个请求创建；"pooled" 实例池
+    pool_size: int = 16  # "pooled" 时池中保留的空闲实例数量
+    max_concurrency: Optional[int] = None  # 每个视图同时执行的最大数量，为None时不限制；Action中配置的优先
+    max_queue: int = 64  # 达到max_concurrency后每个视图等待执行的最大数量，超过时返回503；Action中配置的优先
+    retry_after: int = 1  # 拒绝请求时响应头Retry-After的秒数
+    timeout: Optional[float] = None  # 每个视图执行的最大秒数，超时取消并返回504，为None时不限制；Action中配置的优先
+    cancel_on_disconnect: bool = False  # 客户端断开连接时是否取消正在执行的视图
+    thread_pool_size: int = 8  # 同步视图与executor="thread"的视图使用的线程池大小
+    process_pool_size: int = 2  # executor="process"的视图使用的进程池大小
+
+    page_size: Optional[int] = None  # 生成的all、filter视图每页数量，为None时不分页
+    max_page_size: Optional[int] = None  # 请求参数limit允许的最大值，默认为page_size
+    cursor_field: Optional[str] = None  # 游标分页的排序字段，默认为主键，"-"前缀表示倒序
+    total_count: bool = False  # 分页时是否以响应头X-Total-Count返回匹配数据的总数
+    total_count_ttl: float = 5  # 总数缓存的秒数，避免每翻一页都执行 COUNT(*)
+    stream_format: Optional[str] = None  # 生成的all、filter视图流式输出的格式："ndjson"、"json"
+    stream_batch_size: int = 1000  # 流式输出时每批查询的数量
+    sparse_fields: bool = False  # 生成的get、all、filter视图是否支持查询参数fields，只查询并返回指定的字段
+    raw_response: bool = False  # 生成的get、all、filter视图不经过Pydantic，以 values() 查询后直接序列化
+    select_related: Sequence[str] = ()  # 生成的get、all、filter视图以JOIN查询的外键、一对一字段，例如 ("company", "higher__company")
+    prefetch_related: Sequence[Any] = ()  # 生成的get、all、filter视图额外预取的关联字段或Prefetch，schema需要的关联字段总会被预取
+    filter_require_index: bool = False  # filter视图的查询与排序是否必须能使用索引，否则创建视图集时抛出ValueError；为False时日志警告
+    bulk_batch_size: Optional[int] = 500  # 批量视图每条SQL处理的数量
+    bulk_create_return: str = "rows"  # 生成的bulk_create视图返回内容："rows"、"ids"、"count"；数据库生成主键时前两者逐条插入
+    create_batch_window: Optional[float] = None  # 生成的create视图合并此秒数内的并发请求在一个事务中插入，例如0.002；为None时逐条插入
+    create_batch_size: int = 100  # 合并插入时每批的最大数量，达到后立即插入
+    update_strategy: str = "save"  # 生成的update、delete视图的执行方式："save"、"update_fields"、"direct"
+
+    read_connection: Optional[str] = None  # 生成的读视图使用的Tortoise连接名称，例如只读副本，默认为模型默认的连接
+    write_connection: Optional[str] = None  # 生成的写视图使用的Tortoise连接名称，默认为模型默认的连接
+    read_your_writes: Optional[float] = None  # 客户端写入后多少秒内读视图使用write_connection，为None时不限制
+
+    cache_backend: Optional[BaseCacheBackend] = None  # 响应缓存后端，为None时不缓存
+    cache_ttl: Optional[float] = 60  # 响应缓存秒数
+    cache_namespace: Optional[str] = None  # 缓存命名空间，默认为orm模型，修改类视图执行后使命名空间内的缓存失效
+    single_flight: bool = False  # 参数相同的并发请求只执行一次，适用于生成的读视图与cache=True的视图
+
+    # GET视图是否支持ETag/Last-Modified条件请求；生成的读视图每次请求多一次聚合查询判断数据是否变化，开启缓存时改用响应摘要
+    etag: bool = False
+    last_modified_field: Optional[str] = None  # 条件请求判断数据变化的字段，默认为模型中auto_now的字段
+
+    metrics_sink: Optional[BaseMetricsSink] = None  # 记录每个视图各阶段耗时与返回行数，为None时不统计
+    record_queries: bool = False  # 记录每个请求执行的SQL，以响应头X-Query-Count、X-Query-Time(毫秒)返回数量与数据库耗时
+    query_budget: Optional[int] = None  # 每个请求允许执行的最大SQL数量，超过时日志警告，为None时不限制；Action中配置的优先
+    query_repeat_threshold: int = 3  # 记录SQL时同一形状的语句在一个请求中执行此次数以上，日志警告可能的N+1查询
+
+    __fast_views__: Tuple[Tuple[str, DecoratedCallable], ...] = ()  # 按路由排序的视图，由元类在创建类时收集
+
+    @classmethod
+    def read_db(cls) -> Any:
+        """
+        自定义视图读操作使用的连接，与生成的读视图一致：read_your_writes期间为write_connection，
+        例如 await Model.filter(...).using_db(self.read_db())；为None时使用模型默认的连接
+        """
+        from .db import ConnectionRouter
+        return ConnectionRouter(cls.read_connection, cls.write_connection).read()
+
+    @classmethod
+    def write_db(cls) -> Any:
+        """
+        自定义视图写操作使用的连接，例如 await obj.save(using_db=self.write_db())；为None时使用模型默认的连接
+        """
+        from .db import ConnectionRouter
+        return ConnectionRouter(cls.read_connection, cls.write_connection).write()
 
     @classmethod
-    def __get_views(cls) -> Iterator[Tuple[str, DecoratedCallable]]:
-        all_views_: List[Tuple[str, DecoratedCallable]] = []
-        for attr_name in dir(cls):
-            view = getattr(cls, attr_name)
-            if hasattr(view, "__fast_view__"):
-                all_views_.append((attr_name, view))
+    async def run_in_executor(cls, func: Callable, *args: Any, executor: str = "thread", **kwargs: Any) -> Any:
+        """
+        在视图集的线程池或进程池中执行CPU密集的函数，例如 await self.run_in_executor(make_password, password)；
+        "process" 时func与参数需要可以pickle
+        """
+        if executor not in EXECUTORS:
+            raise ValueError(f"Invalid executor: {executor}")
+        return await cls.__executor(executor).run(func, *args, **kwargs)
 
-        # 根据路由排序
-        all_views_.sort(key=lambda x: x[1].__fast_view__["path"])
-        return all_views_
+    @classmethod
+    def executor_stats(cls) -> Dict[str, Dict[str, Any]]:
+        """
+        视图集线程池、进程池的使用情况，详见 ViewExecutor.stats
+        """
+        return {kind_: executor_.stats() for kind_, executor_ in (cls.__dict__.get("_BaseViewSet__executors") or {}).items()}
 
     @classmethod
     def register(cls, router: APIRouter):
+        """
+        将视图集注册到路由，可以注册到多个路由，共用同一个视图集实例的提供者与已解析的视图函数
+        """
         # cls是CBVTransponder的子类，则不需要注册
-        if cls.__transponder is not None or issubclass(cls, CBVTransponder):
+        if issubclass(cls, CBVTransponder):
             return
+        routes_ = cls.__dict__.get("_BaseViewSet__routes")
+        if routes_ is None:
+            routes_ = cls.__routes = cls.__resolve_routes()
+
+        for fast_route, fast_view in routes_:
+            # 注册视图函数，tags等可变参数每次注册时复制
+            router.add_api_route(endpoint=fast_route, **{**fast_view, "tags": list(fast_view["tags"])})
+
+    @classmethod
+    def __resolve_routes(cls) -> Tuple[Tuple[DecoratedCallable, Dict], ...]:
+        """
+        创建视图集实例的提供者，并解析所有视图的路由参数与注册到FastAPI的视图函数
+        """
         # 创建继承CBVTransponder与cls的新类
         cbv_transponder_class_ = type(
             f"{cls.__name__}Transponder",
@@ -142,45 +284,163 @@ class BaseViewSet(metaclass=ViewSetMetaClass):
             {"__doc__": f"{cls.__name__} CBVTransponder"},
         )
 
-        # 实例化视图函数转发器
-        # cls.__transponder = CBVTransponder()
-        cls.__transponder = cbv_transponder_class_()
-
-        for view_name, view_func in cls.__get_views():
+        # 视图函数转发器的实例由provider根据生命周期提供
+        lifecycle_ = cls.lifecycle
+        if lifecycle_ not in LIFECYCLES:
+            from loguru import logger
+            logger.warning(f"The \"lifecycle\" in {cls.__name__} is invalid.")
+            lifecycle_ = "singleton"
+        cls.__provider = create_provider(lifecycle_, cbv_transponder_class_, cls.pool_size)
+
+        routes_ = []
+        path_prefix_ = cls.__path_prefix() if cls.auto_view_path else ""
+        for view_name, view_func in cls.__fast_views__:
+            fast_view_ = cls.__build_fast_view_params(view_func.__fast_view__, view_func, path_prefix_)
             # 创建视图函数
-            fast_route = cls.__create_fast_route(view_func, view_name, cls)
-            # 转发器动态添加视图函数路由
-            # setattr(cls.__transponder, f"transponder_{view_name}", MethodType(fast_route, cls.__transponder))
-            setattr(cbv_transponder_class_, f"transponder_{view_name}", fast_route)
-            # 注册视图函数
-            # router.api_route(**cls.__build_fast_view_params(view_func.__fast_view__, view_func))(getattr(cls.__transponder, view_name))
-            router.add_api_route(endpoint=getattr(cls.__transponder, view_name), **cls.__build_fast_view_params(view_func.__fast_view__, view_func))
+            routes_.append((cls.__create_fast_route(view_func, view_name, fast_view_), fast_view_))
+        return tuple(routes_)
 
     @classmethod
-    def __build_fast_view_params(cls, fast_view: Dict, view_func: DecoratedCallable) -> Dict:
+    def __build_fast_view_params(cls, spec: ViewSpec, view_func: DecoratedCallable, path_prefix: str) -> Dict:
+        """
+        根据视图的路由参数生成此视图集注册时的参数，不修改spec
+        """
+        fast_view_ = spec.route_params()
         # 修改描述
-        if fast_view["summary"] is None:
-            fast_view["summary"] = view_func.__name__.replace("_", " ").strip().title()
+        if fast_view_["summary"] is None:
+            fast_view_["summary"] = view_func.__name__.replace("_", " ").strip().title()
         # 修改标签
-        if fast_view["tags"] is None:
-            fast_view["tags"] = [cls.__name__]
-        elif isinstance(fast_view["tags"], List):
-            fast_view["tags"].append(cls.__name__)
+        fast_view_["tags"] = [*(fast_view_["tags"] or ()), cls.__name__]
 
         # 修改路由
-        if cls.auto_view_path:
-            pre_ = cls.__path_regex.sub("", cls.__name__)  # 先替换ViewSets
-            pre_ = cls.__pascal_regex.sub(r"_\g<key>", pre_)  # 再替换驼峰
-            pre_ = cls.__pascal_again_regex.sub(r"_\g<key>", pre_).lower().strip('_')  # 再替换驼峰
-            fast_view["path"] = f"/{pre_}{fast_view['path']}"
+        fast_view_["path"] = f"{path_prefix}{fast_view_['path']}"
 
-        return fast_view
+        return fast_view_
 
-    @staticmethod
-    def __create_fast_route(view_func: DecoratedCallable, view_name: str, call_cls: Callable) -> DecoratedCallable:
-        @wraps(view_func)
-        async def fast_route(self, *view_args, **view_kwargs) -> Response:
-            # return await getattr(call_cls(), view_name)(*view_args, **view_kwargs)
-            return await view_func(call_cls(), *view_args, **view_kwargs)
+    @classmethod
+    def __path_prefix(cls) -> str:
+        """
+        根据类名生成路由前缀，例如 CompanyUserViewSet -> /company_user
+        """
+        pre_ = cls.__path_regex.sub("", cls.__name__)  # 先替换ViewSets
+        pre_ = cls.__pascal_regex.sub(r"_\g<key>", pre_)  # 再替换驼峰
+        pre_ = cls.__pascal_again_regex.sub(r"_\g<key>", pre_).lower().strip('_')  # 再替换驼峰
+        return f"/{pre_}"
+
+    @classmethod
+    def __create_fast_route(cls, view_func: DecoratedCallable, view_name: str, fast_view: Dict) -> DecoratedCallable:
+        """
+        创建注册到FastAPI的视图函数，没有需要在转发时处理的选项时FastAPI直接调用视图
+        Args:
+            view_func: 视图集的视图函数
+            view_name: 视图名称
+            fast_view: 视图的路由参数
+
+        Returns:
+            DecoratedCallable: 视图函数
+        """
+        spec_: ViewSpec = view_func.__fast_view__
+        layers_ = []
+        render_ = None
+        if cls.metrics_sink is not None:
+            # 各层共用计时的渲染方法
+            render_ = timed_renderer(create_renderer(fast_view, view_name))
+
+        # 执行时间包括等待并发名额的时间
+        timeout_ = cls.timeout if spec_.timeout is None else spec_.timeout
+        if timeout_ or cls.cancel_on_disconnect:
+            layers_.append(deadline_layer(timeout_ or None, cls.cancel_on_disconnect))
+
+        # 超出并发限制时不执行任何查询
+        max_concurrency_ = cls.max_concurrency if spec_.max_concurrency is None else spec_.max_concurrency
+        if max_concurrency_:
+            max_queue_ = cls.max_queue if spec_.max_queue is None else spec_.max_queue
+            layers_.append(admission_layer(max_concurrency_, max_queue_, cls.retry_after))
+
+        if cls.etag and "GET" in (fast_view["methods"] or ()):
+            # 缓存的视图以响应摘要作为ETag，命中缓存时不再执行validator的查询
+            validator_ = None if cls.cache_backend is not None and spec_.cache else getattr(view_func, "__fast_validator__", None)
+            render_ = render_ or create_renderer(fast_view, view_name)
+            layers_.append(conditional_layer(render_, validator_))
+
+        # 在缓存之外合并，缓存未命中时并发的相同请求只查询、序列化一次
+        if cls.single_flight and spec_.cache:
+            render_ = render_ or create_renderer(fast_view, view_name)
+            layers_.append(single_flight_layer(render_))
+
+        if cls.cache_backend is not None:
+            cache_prefix_ = f"{cls.__cache_namespace()}:"
+            if spec_.cache:
+                # 同一命名空间的视图集schema可能不同，缓存键区分视图集，失效仍按命名空间
+                layers_.append(cache_layer(
+                    cls.cache_backend,
+                    f"{cache_prefix_}{cls.__module__}.{cls.__qualname__}:{view_name}:",
+                    cls.cache_ttl,
+                    render_ or create_renderer(fast_view, view_name),
+                ))
+            if spec_.mutating:
+                layers_.append(invalidate_layer(cls.cache_backend, cache_prefix_))
+
+        # 在并发限制之外判断是否读主库，缓存、条件请求的查询也使用同一连接
+        if cls.read_your_writes:
+            layers_.insert(0, read_your_writes_layer(cls.read_your_writes, spec_.mutating))
+
+        # 总耗时在最外层统计，视图函数的耗时在最内层统计
+        if cls.metrics_sink is not None:
+            layers_.insert(0, metrics_layer(cls.metrics_sink, cls.__name__, view_name, render_))
+            layers_.append(view_timing_layer)
+
+        # 在最外层记录，包括其它层执行的查询
+        query_budget_ = cls.query_budget if spec_.query_budget is None else spec_.query_budget
+        if cls.record_queries or query_budget_ is not None:
+            # 注册时包装一次数据库客户端，请求时不再遍历
+            from .queries import install_query_recorder
+            install_query_recorder()
+            layers_.insert(0, query_recorder_layer(
+                cls.__name__, view_name, cls.record_queries, query_budget_, cls.query_repeat_threshold
+            ))
+
+        return create_endpoint(view_func, cls.__provider, layers_, cls.__view_executor(spec_, view_func, view_name))
+
+    @classmethod
+    def __view_executor(cls, spec: ViewSpec, view_func: DecoratedCallable, view_name: str) -> Optional[ViewExecutor]:
+        """
+        视图使用的池，未指定executor时同步视图使用线程池，异步视图在事件循环中执行
+        """
+        kind_ = spec.executor
+        if kind_ is not None and kind_ not in EXECUTORS:
+            from loguru import logger
+            logger.warning(f"The \"executor\" of {cls.__name__}.{view_name} is invalid.")
+            kind_ = None
+        if kind_ is None:
+            if iscoroutinefunction(view_func):
+                return None
+            kind_ = "thread"
+        return cls.__executor(kind_)
+
+    @classmethod
+    def __executor(cls, kind: str) -> ViewExecutor:
+        """
+        获取视图集的线程池或进程池，每个视图集类各自创建；视图中通过self调用时cls为转发器类，使用其对应的视图集类
+        """
+        owner_ = cls.__bases__[1] if CBVTransponder in cls.__bases__ else cls
+        executors_ = owner_.__dict__.get("_BaseViewSet__executors")
+        if executors_ is None:
+            executors_ = owner_.__executors = {}
+        if kind not in executors_:
+            executors_[kind] = ViewExecutor(
+                kind, owner_.process_pool_size if kind == "process" else owner_.thread_pool_size, owner_
+            )
+        return executors_[kind]
 
-        return fast_route
+    @classmethod
+    def __cache_namespace(cls) -> str:
+        """
+        缓存的命名空间，默认使用orm模型，同一模型的视图集共享缓存失效
+        """
+        if cls.cache_namespace is not None:
+            return cls.cache_namespace
+        model_ = getattr(cls, "model", None)
+        if isinstance(model_, type):
+            return f"{model_.__module__}.{model_.__name__}"
+        return f"{cls.__module__}.{cls.__name__}"
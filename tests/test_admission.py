@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/18 14:30
+# @Author  : Tuffy
+# @Description : 并发限制：超过max_concurrency的请求排队，队列已满时返回503与Retry-After
+import asyncio
+from typing import Dict
+
+import httpx
+import pytest
+from fastapi import APIRouter, FastAPI, HTTPException, Response
+from starlette.requests import Request
+
+from fast_cbv import Action, BaseViewSet
+from fast_cbv.dispatch import admission_layer
+
+state = {"active": 0, "peak": 0, "gate": None}
+
+
+class GatedViewSet(BaseViewSet):
+    retry_after = 7
+
+    @Action.get("/work", max_concurrency=1, max_queue=1)
+    async def work(self, n: int):
+        state["active"] += 1
+        state["peak"] = max(state["peak"], state["active"])
+        try:
+            await state["gate"].wait()
+        finally:
+            state["active"] -= 1
+        return {"n": n}
+
+
+def _app() -> FastAPI:
+    router_ = APIRouter()
+    GatedViewSet.register(router_)
+    app_ = FastAPI()
+    app_.include_router(router_)
+    return app_
+
+
+async def _until(predicate) -> None:
+    for _ in range(200):
+        if predicate():
+            return
+        await asyncio.sleep(0.005)
+    raise AssertionError("condition not reached")
+
+
+def test_admission_queue_and_reject():
+    async def run():
+        state.update(active=0, peak=0, gate=asyncio.Event())
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=_app()), base_url="http://test") as client_:
+            first_ = asyncio.ensure_future(client_.get("/gated/work", params={"n": 1}))
+            await _until(lambda: state["active"] == 1)
+            # 第二个请求等待执行名额
+            second_ = asyncio.ensure_future(client_.get("/gated/work", params={"n": 2}))
+            await asyncio.sleep(0.02)
+            assert not second_.done()
+            # 队列已满，立即拒绝
+            rejected_ = await client_.get("/gated/work", params={"n": 3})
+            state["gate"].set()
+            return rejected_, await first_, await second_
+
+    rejected_, first_, second_ = asyncio.run(run())
+    assert rejected_.status_code == 503 and rejected_.headers["retry-after"] == "7"
+    assert first_.json() == {"n": 1} and second_.json() == {"n": 2}
+    assert state["peak"] == 1
+
+
+def test_admission_cancelled_waiter():
+    async def view(request: Request, response: Response, view_kwargs: Dict) -> int:
+        await view_kwargs["gate"].wait()
+        return view_kwargs["n"]
+
+    async def run():
+        call_ = admission_layer(1, 2, 1)(view)
+        gate_ = asyncio.Event()
+        first_ = asyncio.ensure_future(call_(None, Response(), {"gate": gate_, "n": 1}))
+        waiting_ = asyncio.ensure_future(call_(None, Response(), {"gate": gate_, "n": 2}))
+        third_ = asyncio.ensure_future(call_(None, Response(), {"gate": gate_, "n": 3}))
+        await asyncio.sleep(0.01)
+        # 等待中被取消的请求不占用名额，之后的请求依次执行
+        waiting_.cancel()
+        gate_.set()
+        assert await first_ == 1 and await third_ == 3
+        assert waiting_.cancelled()
+        # 名额全部归还
+        return await call_(None, Response(), {"gate": gate_, "n": 4})
+
+    assert asyncio.run(run()) == 4
+
+
+def test_admission_rejects_without_queue():
+    async def view(request: Request, response: Response, view_kwargs: Dict) -> None:
+        await asyncio.sleep(0.05)
+
+    async def run():
+        call_ = admission_layer(1, 0, 3)(view)
+        running_ = asyncio.ensure_future(call_(None, Response(), {}))
+        await asyncio.sleep(0)
+        with pytest.raises(HTTPException) as e:
+            await call_(None, Response(), {})
+        await running_
+        return e.value
+
+    error_ = asyncio.run(run())
+    assert error_.status_code == 503 and error_.headers == {"Retry-After": "3"}
@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/18 15:00
+# @Author  : Tuffy
+# @Description : CreateBatcher合并并发的创建，整批失败时逐条插入
+import asyncio
+from contextlib import asynccontextmanager
+
+import pytest
+from tortoise import Tortoise, fields, models
+from tortoise.exceptions import IntegrityError
+
+from fast_cbv.batching import CreateBatcher
+from fast_cbv.testing import capture_queries
+
+
+class Coupon(models.Model):
+    code = fields.CharField(max_length=16, pk=True)
+    label = fields.CharField(max_length=32)
+
+    class Meta:
+        app = "models"
+
+
+class Seat(models.Model):
+    name = fields.CharField(max_length=32, unique=True)
+
+    class Meta:
+        app = "models"
+
+
+@asynccontextmanager
+async def _db():
+    await Tortoise.init(db_url="sqlite://:memory:", modules={"models": [__name__]})
+    try:
+        await Tortoise.generate_schemas()
+        yield
+    finally:
+        await Tortoise.close_connections()
+
+
+def test_batcher_bulk_inserts_within_window():
+    async def run():
+        async with _db():
+            batcher_ = CreateBatcher(Coupon, window=0.01)
+            with capture_queries() as queries_:
+                saved_ = await asyncio.gather(*(batcher_.create(Coupon(code=f"c{idx_}", label="x")) for idx_ in range(5)))
+            inserts_ = [sql_ for sql_ in queries_ if sql_.startswith("INSERT")]
+            return [obj_.code for obj_ in saved_], len(inserts_), await Coupon.all().count()
+
+    codes_, inserts_, count_ = asyncio.run(run())
+    assert codes_ == [f"c{idx_}" for idx_ in range(5)]
+    assert inserts_ == 1 and count_ == 5
+
+
+def test_batcher_flushes_at_max_size():
+    async def run():
+        async with _db():
+            # window远大于等待时间，达到max_size后立即插入
+            batcher_ = CreateBatcher(Coupon, window=60, max_size=2)
+            saved_ = await asyncio.wait_for(
+                asyncio.gather(batcher_.create(Coupon(code="a", label="x")), batcher_.create(Coupon(code="b", label="x"))),
+                timeout=5,
+            )
+            return [obj_.code for obj_ in saved_], await Coupon.all().count()
+
+    assert asyncio.run(run()) == (["a", "b"], 2)
+
+
+def test_batcher_generated_pk():
+    async def run():
+        async with _db():
+            batcher_ = CreateBatcher(Seat, window=0.01)
+            saved_ = await asyncio.gather(*(batcher_.create(Seat(name=f"s{idx_}")) for idx_ in range(3)))
+            return [obj_.pk for obj_ in saved_], sorted(await Seat.all().values_list("id", flat=True))
+
+    pks_, stored_ = asyncio.run(run())
+    assert None not in pks_ and sorted(pks_) == stored_
+
+
+def test_batcher_falls_back_per_row():
+    async def run():
+        async with _db():
+            await Seat.create(name="taken")
+            batcher_ = CreateBatcher(Seat, window=0.01)
+            results_ = await asyncio.gather(
+                batcher_.create(Seat(name="a")),
+                batcher_.create(Seat(name="taken")),
+                batcher_.create(Seat(name="b")),
+                return_exceptions=True,
+            )
+            return results_, sorted(await Seat.all().values_list("name", flat=True))
+
+    results_, names_ = asyncio.run(run())
+    assert isinstance(results_[1], IntegrityError)
+    assert results_[0].name == "a" and results_[2].name == "b"
+    assert names_ == ["a", "b", "taken"]
+
+
+def test_batcher_skips_cancelled():
+    async def run():
+        async with _db():
+            batcher_ = CreateBatcher(Coupon, window=0.02)
+            cancelled_ = asyncio.ensure_future(batcher_.create(Coupon(code="gone", label="x")))
+            kept_ = asyncio.ensure_future(batcher_.create(Coupon(code="kept", label="x")))
+            await asyncio.sleep(0)
+            cancelled_.cancel()
+            await kept_
+            with pytest.raises(asyncio.CancelledError):
+                await cancelled_
+            return await Coupon.all().values_list("code", flat=True)
+
+    assert asyncio.run(run()) == ["kept"]
@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/18 15:40
+# @Author  : Tuffy
+# @Description : bulk_create的 rows、ids、count 返回方式，包括数据库生成的主键与UUID主键
+import asyncio
+import uuid
+from contextlib import asynccontextmanager
+
+import httpx
+from fastapi import APIRouter, FastAPI
+from tortoise import Tortoise, fields, models
+from tortoise.contrib.pydantic import pydantic_model_creator
+
+from fast_cbv import BaseViewSet
+from fast_cbv.testing import capture_queries
+
+
+class Label(models.Model):
+    name = fields.CharField(max_length=32)
+
+    class Meta:
+        app = "models"
+
+
+class Sticker(models.Model):
+    id = fields.UUIDField(pk=True, default=uuid.uuid4)
+    name = fields.CharField(max_length=32)
+
+    class Meta:
+        app = "models"
+
+
+LabelPydantic = pydantic_model_creator(Label, name="LabelPydantic")
+LabelIn = pydantic_model_creator(Label, name="LabelIn", exclude_readonly=True)
+StickerPydantic = pydantic_model_creator(Sticker, name="StickerPydantic")
+StickerIn = pydantic_model_creator(Sticker, name="StickerIn", exclude=("id",))
+
+
+def _viewset(name: str, model, schema, schema_in, pk_type, returning: str) -> type:
+    return type(name, (BaseViewSet,), dict(
+        model=model, schema=schema, pk_type=pk_type, bulk_create_return=returning, views={"bulk_create": schema_in},
+    ))
+
+
+VIEWSETS = (
+    _viewset("LabelRowsViewSet", Label, LabelPydantic, LabelIn, int, "rows"),
+    _viewset("LabelIdsViewSet", Label, LabelPydantic, LabelIn, int, "ids"),
+    _viewset("LabelCountViewSet", Label, LabelPydantic, LabelIn, int, "count"),
+    _viewset("StickerIdsViewSet", Sticker, StickerPydantic, StickerIn, str, "ids"),
+)
+
+
+def _app() -> FastAPI:
+    router_ = APIRouter()
+    for viewset_ in VIEWSETS:
+        viewset_.register(router_)
+    app_ = FastAPI()
+    app_.include_router(router_)
+    return app_
+
+
+@asynccontextmanager
+async def _client():
+    await Tortoise.init(db_url="sqlite://:memory:", modules={"models": [__name__]})
+    try:
+        await Tortoise.generate_schemas()
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=_app()), base_url="http://test") as client_:
+            yield client_
+    finally:
+        await Tortoise.close_connections()
+
+
+def test_bulk_create_generated_pk():
+    async def run():
+        async with _client() as client_:
+            body_ = [{"name": "a"}, {"name": "b"}]
+            rows_ = await client_.post("/label_rows/bulk", json=body_)
+            ids_ = await client_.post("/label_ids/bulk", json=body_)
+            with capture_queries() as queries_:
+                count_ = await client_.post("/label_count/bulk", json=body_)
+            inserts_ = [sql_ for sql_ in queries_ if sql_.startswith("INSERT")]
+            return rows_, ids_, count_, len(inserts_), await Label.all().values_list("id", flat=True)
+
+    rows_, ids_, count_, inserts_, stored_ = asyncio.run(run())
+    assert rows_.status_code == 200 and [row_["name"] for row_ in rows_.json()] == ["a", "b"]
+    assert [row_["id"] for row_ in rows_.json()] == [1, 2]
+    assert ids_.status_code == 200 and ids_.json() == [3, 4]
+    # 只返回数量时仍以一条INSERT批量插入
+    assert count_.json() == {"count": 2} and inserts_ == 1
+    assert stored_ == [1, 2, 3, 4, 5, 6]
+
+
+def test_bulk_create_ids_as_pk_type():
+    async def run():
+        async with _client() as client_:
+            response_ = await client_.post("/sticker_ids/bulk", json=[{"name": "a"}, {"name": "b"}])
+            return response_, {str(pk_) for pk_ in await Sticker.all().values_list("id", flat=True)}
+
+    response_, stored_ = asyncio.run(run())
+    assert response_.status_code == 200
+    assert set(response_.json()) == stored_ and len(stored_) == 2
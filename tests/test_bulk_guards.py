@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/18 17:10
+# @Author  : Tuffy
+# @Description : bulk_update、bulk_delete以一条语句修改或删除主键列表、查询条件匹配的数据，两者都为空时拒绝请求
+import asyncio
+from contextlib import asynccontextmanager
+
+import httpx
+from fastapi import APIRouter, FastAPI
+from tortoise import Tortoise, fields, models
+from tortoise.contrib.pydantic import pydantic_model_creator
+
+from fast_cbv import BaseViewSet
+from fast_cbv.testing import capture_queries
+
+
+class Crate(models.Model):
+    zone = fields.CharField(max_length=8, index=True)
+    status = fields.CharField(max_length=16, default="new")
+
+    class Meta:
+        app = "models"
+
+
+CratePydantic = pydantic_model_creator(Crate, name="CratePydantic")
+CrateIn = pydantic_model_creator(Crate, name="CrateIn", exclude_readonly=True, optional=("zone", "status"))
+
+
+class CrateViewSet(BaseViewSet):
+    model = Crate
+    schema = CratePydantic
+    pk_type = int
+    views = {
+        "filter": {"zone": (None, str)},
+        "bulk_update": CrateIn,
+        "bulk_delete": None,
+    }
+
+
+def _app() -> FastAPI:
+    router_ = APIRouter()
+    CrateViewSet.register(router_)
+    app_ = FastAPI()
+    app_.include_router(router_)
+    return app_
+
+
+@asynccontextmanager
+async def _client():
+    await Tortoise.init(db_url="sqlite://:memory:", modules={"models": [__name__]})
+    try:
+        await Tortoise.generate_schemas()
+        await Crate.bulk_create([Crate(zone="a"), Crate(zone="a"), Crate(zone="b"), Crate(zone="c")])
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=_app()), base_url="http://test") as client_:
+            yield client_
+    finally:
+        await Tortoise.close_connections()
+
+
+def test_bulk_requires_pks_or_query():
+    async def run():
+        async with _client() as client_:
+            update_ = await client_.patch("/crate/bulk", json={"status": "x"})
+            delete_ = await client_.delete("/crate/bulk")
+            return update_, delete_, await Crate.filter(status="new").count()
+
+    update_, delete_, untouched_ = asyncio.run(run())
+    # 主键列表与查询参数都为空时不修改、不删除全表
+    assert update_.status_code == 400 and delete_.status_code == 400
+    assert untouched_ == 4
+
+
+def test_bulk_update():
+    async def run():
+        async with _client() as client_:
+            with capture_queries() as queries_:
+                by_pks_ = await client_.patch("/crate/bulk", params={"pks": [1, 3]}, json={"status": "picked"})
+            by_query_ = await client_.patch("/crate/bulk", params={"zone": "c"}, json={"status": "shipped"})
+            # 主键列表与查询参数同时使用时取交集
+            both_ = await client_.patch("/crate/bulk", params={"pks": [1, 2], "zone": "b"}, json={"status": "lost"})
+            empty_ = await client_.patch("/crate/bulk", params={"zone": "a"}, json={})
+            stored_ = await Crate.all().order_by("id").values_list("status", flat=True)
+            return by_pks_.json(), len(queries_), by_query_.json(), both_.json(), empty_.json(), stored_
+
+    by_pks_, queries_, by_query_, both_, empty_, stored_ = asyncio.run(run())
+    assert by_pks_ == {"count": 2} and queries_ == 1
+    assert by_query_ == {"count": 1} and both_ == {"count": 0} and empty_ == {"count": 0}
+    assert stored_ == ["picked", "new", "picked", "shipped"]
+
+
+def test_bulk_delete():
+    async def run():
+        async with _client() as client_:
+            with capture_queries() as queries_:
+                by_pks_ = await client_.delete("/crate/bulk", params={"pks": [1, 4, 99]})
+            by_query_ = await client_.delete("/crate/bulk", params={"zone": "a"})
+            return by_pks_.json(), len(queries_), by_query_.json(), await Crate.all().values_list("zone", flat=True)
+
+    by_pks_, queries_, by_query_, remaining_ = asyncio.run(run())
+    assert by_pks_ == {"count": 2} and queries_ == 1
+    assert by_query_ == {"count": 1}
+    assert remaining_ == ["b"]
@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/18 10:20
+# @Author  : Tuffy
+# @Description : 响应缓存的命中、失效，以及缓存前后响应的状态码、响应头、response_class一致
+import asyncio
+from contextlib import asynccontextmanager
+
+import httpx
+from fastapi import APIRouter, FastAPI, Response
+from fastapi.responses import PlainTextResponse
+from tortoise import Tortoise, fields, models
+from tortoise.contrib.pydantic import pydantic_model_creator
+
+from fast_cbv import Action, BaseViewSet, MemoryCacheBackend
+from fast_cbv.testing import capture_queries
+
+
+class Shelf(models.Model):
+    name = fields.CharField(max_length=32)
+
+    class Meta:
+        app = "models"
+
+
+ShelfPydantic = pydantic_model_creator(Shelf, name="ShelfPydantic")
+
+
+class ShelfViewSet(BaseViewSet):
+    model = Shelf
+    schema = ShelfPydantic
+    pk_type = int
+    views = {"get": None, "all": None}
+    cache_backend = MemoryCacheBackend()
+
+    @Action.post("/{pk}/rename", mutating=True)
+    async def rename(self, pk: int, name: str):
+        await Shelf.filter(pk=pk).update(name=name)
+        return {"pk": pk}
+
+    @Action.get("/text", response_class=PlainTextResponse, cache=True)
+    async def text(self):
+        return "hello"
+
+    @Action.get("/created", cache=True)
+    async def created(self, response: Response):
+        response.status_code = 201
+        response.headers["X-Shelf"] = "created"
+        response.set_cookie("seen", "1")
+        return {"created": True}
+
+
+def _app() -> FastAPI:
+    router_ = APIRouter()
+    ShelfViewSet.register(router_)
+    app_ = FastAPI()
+    app_.include_router(router_)
+    return app_
+
+
+@asynccontextmanager
+async def _client():
+    ShelfViewSet.cache_backend.clear()
+    await Tortoise.init(db_url="sqlite://:memory:", modules={"models": [__name__]})
+    try:
+        await Tortoise.generate_schemas()
+        await Shelf.create(name="a")
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=_app()), base_url="http://test") as client_:
+            yield client_
+    finally:
+        await Tortoise.close_connections()
+
+
+def test_cache_hit_and_invalidation():
+    async def run():
+        async with _client() as client_:
+            with capture_queries() as miss_:
+                first_ = await client_.get("/shelf/1")
+            with capture_queries() as hit_:
+                second_ = await client_.get("/shelf/1")
+            assert first_.json()["name"] == "a" and len(miss_) == 1
+            assert second_.content == first_.content and not hit_
+            assert second_.headers["content-type"] == first_.headers["content-type"]
+
+            # 修改类视图删除同一命名空间的缓存
+            assert (await client_.post("/shelf/1/rename", params={"name": "b"})).status_code == 200
+            with capture_queries() as refreshed_:
+                third_ = await client_.get("/shelf/1")
+            assert third_.json()["name"] == "b" and len(refreshed_) == 1
+
+    asyncio.run(run())
+
+
+def test_cache_keeps_response_class():
+    async def run():
+        async with _client() as client_:
+            for _ in range(2):
+                response_ = await client_.get("/shelf/text")
+                assert response_.headers["content-type"].startswith("text/plain")
+                assert response_.text == "hello"
+
+    asyncio.run(run())
+
+
+def test_cache_keeps_status_and_headers():
+    async def run():
+        async with _client() as client_:
+            miss_ = await client_.get("/shelf/created")
+            assert miss_.status_code == 201 and miss_.json() == {"created": True}
+            assert miss_.headers["x-shelf"] == "created" and miss_.cookies.get("seen") == "1"
+
+            # 命中时重放状态码与响应头，cookie只属于执行视图的请求
+            client_.cookies.clear()
+            hit_ = await client_.get("/shelf/created")
+            assert hit_.status_code == 201 and hit_.content == miss_.content
+            assert hit_.headers["x-shelf"] == "created" and "set-cookie" not in hit_.headers
+
+    asyncio.run(run())
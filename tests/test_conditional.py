@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/18 10:50
+# @Author  : Tuffy
+# @Description : 条件请求的ETag/Last-Modified与304，以及开启条件请求后响应的状态码、cookie、response_class不变
+import asyncio
+from contextlib import asynccontextmanager
+
+import httpx
+from fastapi import APIRouter, FastAPI, Response
+from fastapi.responses import PlainTextResponse
+from tortoise import Tortoise, fields, models
+from tortoise.contrib.pydantic import pydantic_model_creator
+
+from fast_cbv import Action, BaseViewSet, MemoryCacheBackend
+from fast_cbv.testing import capture_queries
+
+
+class Note(models.Model):
+    title = fields.CharField(max_length=32)
+    modified_at = fields.DatetimeField(auto_now=True)
+
+    class Meta:
+        app = "models"
+
+
+NotePydantic = pydantic_model_creator(Note, name="NotePydantic")
+
+
+class NoteViewSet(BaseViewSet):
+    model = Note
+    schema = NotePydantic
+    pk_type = int
+    views = {"get": None, "all": None}
+    etag = True
+
+    @Action.get("/text", response_class=PlainTextResponse)
+    async def text(self):
+        return "hello"
+
+    @Action.get("/accepted")
+    async def accepted(self, response: Response):
+        response.status_code = 202
+        response.set_cookie("seen", "1")
+        return {"accepted": True}
+
+
+class CachedNoteViewSet(NoteViewSet):
+    cache_backend = MemoryCacheBackend()
+
+
+def _app() -> FastAPI:
+    router_ = APIRouter()
+    NoteViewSet.register(router_)
+    CachedNoteViewSet.register(router_)
+    app_ = FastAPI()
+    app_.include_router(router_)
+    return app_
+
+
+@asynccontextmanager
+async def _client():
+    CachedNoteViewSet.cache_backend.clear()
+    await Tortoise.init(db_url="sqlite://:memory:", modules={"models": [__name__]})
+    try:
+        await Tortoise.generate_schemas()
+        await Note.create(title="a")
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=_app()), base_url="http://test") as client_:
+            yield client_
+    finally:
+        await Tortoise.close_connections()
+
+
+def test_etag_not_modified():
+    async def run():
+        async with _client() as client_:
+            for url_ in ("/note/1", "/note/all", "/note/text"):
+                response_ = await client_.get(url_)
+                etag_ = response_.headers["etag"]
+                assert response_.status_code == 200, url_
+                not_modified_ = await client_.get(url_, headers={"If-None-Match": etag_})
+                assert not_modified_.status_code == 304 and not not_modified_.content, url_
+                assert not_modified_.headers["etag"] == etag_
+
+            # 数据变化后ETag不同，QuerySet.update不更新auto_now的字段
+            etag_ = (await client_.get("/note/1")).headers["etag"]
+            note_ = await Note.get(pk=1)
+            note_.title = "b"
+            await note_.save()
+            changed_ = await client_.get("/note/1", headers={"If-None-Match": etag_})
+            assert changed_.status_code == 200 and changed_.json()["title"] == "b"
+
+            # validator未变化时不执行视图的查询
+            with capture_queries() as queries_:
+                await client_.get("/note/1", headers={"If-None-Match": changed_.headers["etag"]})
+            assert len(queries_) == 1
+
+    asyncio.run(run())
+
+
+def test_etag_if_modified_since():
+    async def run():
+        async with _client() as client_:
+            response_ = await client_.get("/note/1")
+            last_modified_ = response_.headers["last-modified"]
+            not_modified_ = await client_.get("/note/1", headers={"If-Modified-Since": last_modified_})
+            assert not_modified_.status_code == 304
+
+    asyncio.run(run())
+
+
+def test_etag_keeps_response():
+    async def run():
+        async with _client() as client_:
+            text_ = await client_.get("/note/text")
+            assert text_.headers["content-type"].startswith("text/plain") and text_.text == "hello"
+
+            accepted_ = await client_.get("/note/accepted")
+            assert accepted_.status_code == 202 and accepted_.cookies.get("seen") == "1"
+            assert "etag" not in accepted_.headers
+
+    asyncio.run(run())
+
+
+def test_etag_with_cache_skips_validator():
+    async def run():
+        async with _client() as client_:
+            etag_ = (await client_.get("/cached_note/1")).headers["etag"]
+            with capture_queries() as queries_:
+                hit_ = await client_.get("/cached_note/1")
+                not_modified_ = await client_.get("/cached_note/1", headers={"If-None-Match": etag_})
+            assert hit_.status_code == 200 and hit_.headers["etag"] == etag_
+            assert not_modified_.status_code == 304 and not queries_
+
+    asyncio.run(run())
@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/18 16:50
+# @Author  : Tuffy
+# @Description : count、exists视图以一条聚合查询返回匹配的数量与是否存在，查询参数与filter视图相同
+import asyncio
+from contextlib import asynccontextmanager
+
+import httpx
+from fastapi import APIRouter, FastAPI
+from tortoise import Tortoise, fields, models
+from tortoise.contrib.pydantic import pydantic_model_creator
+
+from fast_cbv import BaseViewSet
+from fast_cbv.testing import capture_queries
+
+
+class Parcel(models.Model):
+    city = fields.CharField(max_length=32, index=True)
+    weight = fields.IntField()
+
+    class Meta:
+        app = "models"
+
+
+ParcelPydantic = pydantic_model_creator(Parcel, name="ParcelPydantic")
+
+
+class ParcelViewSet(BaseViewSet):
+    model = Parcel
+    schema = ParcelPydantic
+    pk_type = int
+    views = {
+        "get": None,
+        "filter": {"city": (None, str), "weight__gte": (None, int)},
+        "count": None,
+        "exists": None,
+    }
+
+
+def _app() -> FastAPI:
+    router_ = APIRouter()
+    ParcelViewSet.register(router_)
+    app_ = FastAPI()
+    app_.include_router(router_)
+    return app_
+
+
+@asynccontextmanager
+async def _client():
+    await Tortoise.init(db_url="sqlite://:memory:", modules={"models": [__name__]})
+    try:
+        await Tortoise.generate_schemas()
+        await Parcel.bulk_create([Parcel(city="Oslo", weight=1), Parcel(city="Oslo", weight=5), Parcel(city="Rome", weight=3)])
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=_app()), base_url="http://test") as client_:
+            yield client_
+    finally:
+        await Tortoise.close_connections()
+
+
+def test_count():
+    async def run():
+        async with _client() as client_:
+            results_ = [(await client_.get("/parcel/count", params=params_)).json() for params_ in (
+                {}, {"city": "Oslo"}, {"city": "Oslo", "weight__gte": 2}, {"city": "Paris"},
+            )]
+            with capture_queries() as queries_:
+                await client_.get("/parcel/count", params={"city": "Oslo"})
+            return results_, queries_
+
+    results_, queries_ = asyncio.run(run())
+    assert results_ == [{"count": 3}, {"count": 2}, {"count": 1}, {"count": 0}]
+    # 只有一条 COUNT 查询，不读取数据行
+    assert len(queries_) == 1 and "COUNT(" in queries_[0].upper()
+
+
+def test_exists():
+    async def run():
+        async with _client() as client_:
+            results_ = [(await client_.get("/parcel/exists", params=params_)).json() for params_ in (
+                {"city": "Rome"}, {"city": "Rome", "weight__gte": 4}, {},
+            )]
+            with capture_queries() as queries_:
+                await client_.get("/parcel/exists", params={"city": "Oslo"})
+            return results_, queries_
+
+    results_, queries_ = asyncio.run(run())
+    assert results_ == [{"exists": True}, {"exists": False}, {"exists": True}]
+    assert len(queries_) == 1 and "LIMIT" in queries_[0].upper()
+
+
+def test_count_invalid_param():
+    async def run():
+        async with _client() as client_:
+            return await client_.get("/parcel/count", params={"weight__gte": "heavy"})
+
+    assert asyncio.run(run()).status_code == 422
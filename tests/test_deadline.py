@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/18 14:00
+# @Author  : Tuffy
+# @Description : 视图超时返回504，客户端断开连接时取消视图；FastAPI已读取请求体时不再读取
+import asyncio
+from typing import Dict, List
+
+import httpx
+import pytest
+from fastapi import APIRouter, FastAPI, HTTPException, Response
+from starlette.requests import Request
+
+from fast_cbv import Action, BaseViewSet
+from fast_cbv.dispatch import deadline_layer
+
+events: List[str] = []
+
+
+class SlowViewSet(BaseViewSet):
+    cancel_on_disconnect = True
+
+    @Action.get("/slow", timeout=0.05)
+    async def slow(self):
+        try:
+            await asyncio.sleep(1)
+        except asyncio.CancelledError:
+            events.append("cancelled")
+            raise
+        return {"finished": True}
+
+    @Action.post("/echo", timeout=1)
+    async def echo(self, payload: Dict[str, int]):
+        return payload
+
+
+def _app() -> FastAPI:
+    router_ = APIRouter()
+    SlowViewSet.register(router_)
+    app_ = FastAPI()
+    app_.include_router(router_)
+    return app_
+
+
+def _request(*messages: Dict, disconnect_after: float = 3600) -> Request:
+    """
+    依次收到messages，之后等待disconnect_after秒收到断开连接
+    """
+    queue_ = list(messages)
+
+    async def receive() -> Dict:
+        if queue_:
+            return queue_.pop(0)
+        await asyncio.sleep(disconnect_after)
+        return {"type": "http.disconnect"}
+
+    return Request({"type": "http", "method": "POST", "path": "/", "headers": [], "query_string": b""}, receive)
+
+
+async def _request_app(app: FastAPI, method: str, url: str, **kwargs) -> httpx.Response:
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client_:
+        return await client_.request(method, url, **kwargs)
+
+
+def test_deadline_timeout():
+    events.clear()
+    response_ = asyncio.run(_request_app(_app(), "GET", "/slow/slow"))
+    assert response_.status_code == 504
+    assert response_.json()["detail"]["error"] == "timeout" and response_.json()["detail"]["timeout"] == 0.05
+    assert events == ["cancelled"]
+
+
+def test_deadline_reads_json_body_once():
+    response_ = asyncio.run(_request_app(_app(), "POST", "/slow/echo", json={"a": 1}))
+    assert response_.status_code == 200 and response_.json() == {"a": 1}
+
+
+def test_deadline_cancels_on_disconnect():
+    async def view(request: Request, response: Response, view_kwargs: Dict) -> str:
+        try:
+            await asyncio.sleep(1)
+        except asyncio.CancelledError:
+            events.append("cancelled")
+            raise
+        return "finished"
+
+    async def run():
+        request_ = _request({"type": "http.request", "body": b"", "more_body": False}, disconnect_after=0.02)
+        with pytest.raises(HTTPException) as e:
+            await deadline_layer(None, True)(view)(request_, Response(), {})
+        return e.value
+
+    events.clear()
+    error_ = asyncio.run(run())
+    assert error_.status_code == 504 and error_.detail["error"] == "client_disconnected"
+    assert events == ["cancelled"]
+
+
+def test_deadline_after_stream_consumed():
+    # Form、File参数的请求体由FastAPI以流的方式读取，不会缓存，不能再次读取
+    async def view(request: Request, response: Response, view_kwargs: Dict) -> str:
+        return "ok"
+
+    async def run():
+        request_ = _request({"type": "http.request", "body": b"a=1", "more_body": False})
+        async for _ in request_.stream():
+            pass
+        return await deadline_layer(1, True)(view)(request_, Response(), {})
+
+    assert asyncio.run(run()) == "ok"
+
+
+def test_deadline_form_view():
+    pytest.importorskip("multipart")
+    from fastapi import Form
+
+    class FormViewSet(BaseViewSet):
+        cancel_on_disconnect = True
+
+        @Action.post("/submit")
+        async def submit(self, name: str = Form(...)):
+            return {"name": name}
+
+    router_ = APIRouter()
+    FormViewSet.register(router_)
+    app_ = FastAPI()
+    app_.include_router(router_)
+    response_ = asyncio.run(_request_app(app_, "POST", "/form/submit", data={"name": "a"}))
+    assert response_.status_code == 200 and response_.json() == {"name": "a"}
@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/18 13:30
+# @Author  : Tuffy
+# @Description : FilterSet的查询方式、排序白名单与索引检查
+import asyncio
+from contextlib import asynccontextmanager
+from typing import List
+
+import httpx
+import pytest
+from fastapi import APIRouter, FastAPI
+from tortoise import Tortoise, fields, models
+from tortoise.contrib.pydantic import pydantic_model_creator
+
+from fast_cbv import BaseViewSet, FilterSet
+
+
+class Gadget(models.Model):
+    name = fields.CharField(max_length=32)
+    code = fields.CharField(max_length=12, index=True)
+    weight = fields.IntField()
+    note = fields.TextField(null=True)
+
+    class Meta:
+        app = "models"
+
+
+GadgetPydantic = pydantic_model_creator(Gadget, name="GadgetPydantic")
+
+
+class GadgetViewSet(BaseViewSet):
+    model = Gadget
+    schema = GadgetPydantic
+    pk_type = int
+    views = {
+        "all": None,
+        "get": None,
+        "filter": {
+            "code": (None, str),
+            "code__startswith": (None, str),
+            "name__icontains": (None, str),
+            "id__in": (None, List[int]),
+            "weight__range": (None, List[int]),
+            "note__isnull": (None, bool),
+            "ordering": ("id", ("id", "weight")),
+        },
+    }
+
+
+def _app() -> FastAPI:
+    router_ = APIRouter()
+    GadgetViewSet.register(router_)
+    app_ = FastAPI()
+    app_.include_router(router_)
+    return app_
+
+
+@asynccontextmanager
+async def _client():
+    await Tortoise.init(db_url="sqlite://:memory:", modules={"models": [__name__]})
+    try:
+        await Tortoise.generate_schemas()
+        await Gadget.bulk_create([
+            Gadget(name="Red Lamp", code="ab1", weight=3, note="x"),
+            Gadget(name="Blue Lamp", code="ab2", weight=1),
+            Gadget(name="Red Chair", code="cd1", weight=2),
+        ])
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=_app()), base_url="http://test") as client_:
+            yield client_
+    finally:
+        await Tortoise.close_connections()
+
+
+def test_filter_lookups():
+    async def run():
+        async with _client() as client_:
+            async def names(params):
+                response_ = await client_.get("/gadget/filter", params=params)
+                assert response_.status_code == 200, response_.text
+                return [row_["name"] for row_ in response_.json()]
+
+            assert await names({"code": "ab1"}) == ["Red Lamp"]
+            assert await names({"code__startswith": "ab"}) == ["Red Lamp", "Blue Lamp"]
+            assert await names({"name__icontains": "lamp"}) == ["Red Lamp", "Blue Lamp"]
+            assert await names({"id__in": [1, 3]}) == ["Red Lamp", "Red Chair"]
+            assert await names({"weight__range": [2, 3]}) == ["Red Lamp", "Red Chair"]
+            assert await names({"note__isnull": True}) == ["Blue Lamp", "Red Chair"]
+            assert await names({"ordering": "-weight"}) == ["Red Lamp", "Red Chair", "Blue Lamp"]
+
+            # 其它视图不受filter配置影响
+            assert (await client_.get("/gadget/all")).status_code == 200
+            assert (await client_.get("/gadget/1")).json()["code"] == "ab1"
+
+            invalid_ = await client_.get("/gadget/filter", params={"ordering": "name"})
+            assert invalid_.status_code == 400
+
+    asyncio.run(run())
+
+
+def test_filter_unindexed():
+    filter_set_ = FilterSet(Gadget, {"code": (None, str), "name__icontains": (None, str), "weight__gte": (None, int)})
+    assert filter_set_.unindexed == ["name__icontains", "weight__gte"]
+
+    with pytest.raises(ValueError, match="name__icontains"):
+        FilterSet(Gadget, {"code": (None, str), "name__icontains": (None, str)}, require_index=True)
+    with pytest.raises(ValueError, match="weight"):
+        FilterSet(Gadget, {"ordering": ("id", ("id", "weight"))}, require_index=True)
+    assert FilterSet(Gadget, {"code__startswith": (None, str), "id__in": (None, List[int])}, require_index=True).unindexed == []
+
+
+def test_filter_invalid_config():
+    with pytest.raises(ValueError, match="has no field \"colour\""):
+        type("BrokenGadgetViewSet", (BaseViewSet,), dict(
+            model=Gadget, schema=GadgetPydantic, pk_type=int, views={"get": None, "filter": {"colour": (None, str)}},
+        ))
+    with pytest.raises(ValueError, match="cannot use an index"):
+        type("StrictGadgetViewSet", (BaseViewSet,), dict(
+            model=Gadget, schema=GadgetPydantic, pk_type=int, filter_require_index=True,
+            views={"filter": {"name__icontains": (None, str)}},
+        ))
@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/17 23:59
+# @Author  : Tuffy
+# @Description : import fast_cbv 与只使用Action的视图集不导入tortoise、loguru
+import subprocess
+import sys
+from pathlib import Path
+from typing import Set
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+LAZY_PACKAGES = ("tortoise", "loguru")
+
+ACTION_ONLY = """
+from fastapi import APIRouter
+from fast_cbv import Action, BaseViewSet
+
+
+class PingViewSet(BaseViewSet):
+    @Action.get("/ping")
+    async def ping(self):
+        return "pong"
+
+
+PingViewSet.register(APIRouter())
+"""
+
+
+def _imported_modules(code: str) -> Set[str]:
+    """
+    在新的解释器中以 -X importtime 执行code，返回导入的模块
+    """
+    result_ = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    # 每行格式为 "import time: self [us] | cumulative | imported package"
+    return {
+        line_.rsplit("|", 1)[1].strip()
+        for line_ in result_.stderr.splitlines()
+        if line_.startswith("import time:") and line_.count("|") == 2
+    }
+
+
+@pytest.mark.parametrize("code", ["import fast_cbv", ACTION_ONLY], ids=["import", "action_only"])
+def test_lazy_imports(code):
+    modules_ = _imported_modules(code)
+    assert "fast_cbv" in modules_
+    imported_ = sorted({m.split(".")[0] for m in modules_} & set(LAZY_PACKAGES))
+    assert not imported_, f"{', '.join(imported_)} imported eagerly"
@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/18 12:00
+# @Author  : Tuffy
+# @Description : metrics_sink记录各阶段耗时，且开启统计前后的响应一致
+import asyncio
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+from fastapi import APIRouter, FastAPI, Response
+from fastapi.responses import PlainTextResponse
+
+from fast_cbv import Action, BaseMetricsSink, BaseViewSet
+
+
+class ListSink(BaseMetricsSink):
+    def __init__(self):
+        self.records: List[Tuple[str, str, Dict[str, float], Optional[int]]] = []
+
+    def record(self, viewset: str, action: str, timings: Dict[str, float], rows: Optional[int]) -> None:
+        self.records.append((viewset, action, timings, rows))
+
+
+class PlainGaugeViewSet(BaseViewSet):
+    @Action.get("/text", response_class=PlainTextResponse)
+    async def text(self):
+        return "hello"
+
+    @Action.post("/created")
+    async def created(self, response: Response):
+        response.status_code = 201
+        response.set_cookie("made", "1")
+        return {"created": True}
+
+
+class MeasuredGaugeViewSet(PlainGaugeViewSet):
+    metrics_sink = ListSink()
+
+
+def _app() -> FastAPI:
+    router_ = APIRouter()
+    PlainGaugeViewSet.register(router_)
+    MeasuredGaugeViewSet.register(router_)
+    app_ = FastAPI()
+    app_.include_router(router_)
+    return app_
+
+
+async def _fetch(prefix: str) -> List[httpx.Response]:
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=_app()), base_url="http://test") as client_:
+        return [await client_.get(f"/{prefix}/text"), await client_.post(f"/{prefix}/created")]
+
+
+def test_metrics_keeps_response():
+    plain_ = asyncio.run(_fetch("plain_gauge"))
+    measured_ = asyncio.run(_fetch("measured_gauge"))
+    for plain_response_, measured_response_ in zip(plain_, measured_):
+        assert measured_response_.status_code == plain_response_.status_code
+        assert measured_response_.content == plain_response_.content
+        assert measured_response_.headers["content-type"] == plain_response_.headers["content-type"]
+        assert measured_response_.headers.get("set-cookie") == plain_response_.headers.get("set-cookie")
+    assert measured_[1].status_code == 201 and measured_[1].cookies.get("made") == "1"
+
+
+def test_metrics_records_timings():
+    MeasuredGaugeViewSet.metrics_sink.records.clear()
+    asyncio.run(_fetch("measured_gauge"))
+    records_ = MeasuredGaugeViewSet.metrics_sink.records
+    assert [(viewset_, action_) for viewset_, action_, _, _ in records_] == [
+        ("MeasuredGaugeViewSet", "text"), ("MeasuredGaugeViewSet", "created"),
+    ]
+    for _, _, timings_, _ in records_:
+        assert set(timings_) == {"total", "dispatch", "view", "db", "model", "serialize"}
+        assert timings_["serialize"] > 0 and timings_["total"] >= timings_["view"] + timings_["serialize"]
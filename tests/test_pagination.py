@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/18 17:30
+# @Author  : Tuffy
+# @Description : 游标分页的翻页、limit范围、非法游标与cursor_field检查
+import asyncio
+import base64
+from contextlib import asynccontextmanager
+from typing import List
+
+import httpx
+import orjson
+from fastapi import APIRouter, FastAPI
+from tortoise import Tortoise, fields, models
+from tortoise.contrib.pydantic import pydantic_model_creator
+
+from fast_cbv import BaseViewSet
+
+
+class Score(models.Model):
+    rank = fields.IntField()
+    note = fields.CharField(max_length=16, null=True)
+
+    class Meta:
+        app = "models"
+
+
+ScorePydantic = pydantic_model_creator(Score, name="ScorePydantic")
+
+
+class ScoreViewSet(BaseViewSet):
+    model = Score
+    schema = ScorePydantic
+    pk_type = int
+    page_size = 2
+    max_page_size = 3
+    cursor_field = "-rank"
+    views = {"all": None}
+
+
+class ScoreNoteViewSet(BaseViewSet):
+    model = Score
+    schema = ScorePydantic
+    pk_type = int
+    page_size = 2
+    # 可为空的列不能作为游标字段，回退为按主键分页
+    cursor_field = "note"
+    views = {"all": None}
+
+
+def _app() -> FastAPI:
+    router_ = APIRouter()
+    ScoreViewSet.register(router_)
+    ScoreNoteViewSet.register(router_)
+    app_ = FastAPI()
+    app_.include_router(router_)
+    return app_
+
+
+@asynccontextmanager
+async def _client():
+    await Tortoise.init(db_url="sqlite://:memory:", modules={"models": [__name__]})
+    try:
+        await Tortoise.generate_schemas()
+        await Score.bulk_create([Score(rank=rank_, note=None if rank_ == 2 else "x") for rank_ in (1, 3, 2, 3, 5)])
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=_app()), base_url="http://test") as client_:
+            yield client_
+    finally:
+        await Tortoise.close_connections()
+
+
+async def _walk(client: httpx.AsyncClient, url: str, **params) -> List[List[int]]:
+    """
+    依次请求每一页，返回每页数据的主键
+    """
+    pages_, after_ = [], None
+    while True:
+        response_ = await client.get(url, params={**params, **({"after": after_} if after_ else {})})
+        assert response_.status_code == 200, response_.text
+        pages_.append([row_["id"] for row_ in response_.json()["items"]])
+        after_ = response_.json()["next"]
+        if after_ is None:
+            return pages_
+
+
+def test_cursor_pages():
+    async def run():
+        async with _client() as client_:
+            return await _walk(client_, "/score/all"), await _walk(client_, "/score/all", limit=3)
+
+    default_, limited_ = asyncio.run(run())
+    # 按rank倒序，rank相同时按主键倒序
+    assert default_ == [[5, 4], [2, 3], [1]]
+    assert limited_ == [[5, 4, 2], [3, 1]]
+
+
+def test_limit_bounds():
+    async def run():
+        async with _client() as client_:
+            return [(await client_.get("/score/all", params={"limit": limit_})).status_code for limit_ in (0, 3, 4)]
+
+    assert asyncio.run(run()) == [422, 200, 422]
+
+
+def test_invalid_cursor():
+    wrong_arity_ = base64.urlsafe_b64encode(orjson.dumps([1])).rstrip(b"=").decode()
+    wrong_type_ = base64.urlsafe_b64encode(orjson.dumps({"rank": 1})).rstrip(b"=").decode()
+
+    async def run():
+        async with _client() as client_:
+            return [
+                (await client_.get("/score/all", params={"after": after_})).status_code
+                for after_ in ("not-a-cursor!", wrong_arity_, wrong_type_)
+            ]
+
+    assert asyncio.run(run()) == [400, 400, 400]
+
+
+def test_nullable_cursor_field_falls_back_to_pk():
+    async def run():
+        async with _client() as client_:
+            return await _walk(client_, "/score_note/all")
+
+    # 游标字段为可为空的列时NULL的行不会丢失
+    assert asyncio.run(run()) == [[1, 2], [3, 4], [5]]
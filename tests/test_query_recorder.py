@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/18 12:30
+# @Author  : Tuffy
+# @Description : record_queries的响应头不改变视图的响应，数据库客户端只在注册时包装
+import asyncio
+from contextlib import asynccontextmanager
+
+import httpx
+from fastapi import APIRouter, FastAPI, Response
+from fastapi.responses import PlainTextResponse
+from tortoise import Tortoise, fields, models
+from tortoise.backends.base.client import BaseDBAsyncClient
+from tortoise.contrib.pydantic import pydantic_model_creator
+
+from fast_cbv import Action, BaseViewSet, queries
+
+
+class Ticket(models.Model):
+    title = fields.CharField(max_length=32)
+
+    class Meta:
+        app = "models"
+
+
+TicketPydantic = pydantic_model_creator(Ticket, name="TicketPydantic")
+
+
+class TicketViewSet(BaseViewSet):
+    model = Ticket
+    schema = TicketPydantic
+    pk_type = int
+    views = {"all": None}
+    record_queries = True
+
+    @Action.get("/titles", response_class=PlainTextResponse)
+    async def titles(self, response: Response):
+        response.status_code = 203
+        response.set_cookie("listed", "1")
+        return ",".join(await Ticket.all().values_list("title", flat=True))
+
+
+def _app() -> FastAPI:
+    router_ = APIRouter()
+    TicketViewSet.register(router_)
+    app_ = FastAPI()
+    app_.include_router(router_)
+    return app_
+
+
+@asynccontextmanager
+async def _client():
+    app_ = _app()
+    await Tortoise.init(db_url="sqlite://:memory:", modules={"models": [__name__]})
+    try:
+        await Tortoise.generate_schemas()
+        await Ticket.bulk_create([Ticket(title="a"), Ticket(title="b")])
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app_), base_url="http://test") as client_:
+            yield client_
+    finally:
+        await Tortoise.close_connections()
+
+
+def test_query_headers_keep_response():
+    async def run():
+        async with _client() as client_:
+            titles_ = await client_.get("/ticket/titles")
+            assert titles_.status_code == 203 and titles_.text == "a,b"
+            assert titles_.headers["content-type"].startswith("text/plain") and titles_.cookies.get("listed") == "1"
+            assert titles_.headers["x-query-count"] == "1" and float(titles_.headers["x-query-time"]) >= 0
+
+            all_ = await client_.get("/ticket/all")
+            assert [row_["title"] for row_ in all_.json()] == ["a", "b"]
+            assert all_.headers["x-query-count"] == "1"
+
+    asyncio.run(run())
+
+
+def test_query_recorder_installed_at_registration(monkeypatch):
+    def install_query_recorder():
+        raise AssertionError("install_query_recorder called while handling a request")
+
+    # 注册时已包装，请求时不再遍历客户端类
+    app_ = _app()
+    assert queries._installed
+    monkeypatch.setattr(queries, "install_query_recorder", install_query_recorder)
+
+    async def run():
+        await Tortoise.init(db_url="sqlite://:memory:", modules={"models": [__name__]})
+        try:
+            await Tortoise.generate_schemas()
+            async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app_), base_url="http://test") as client_:
+                assert (await client_.get("/ticket/all")).headers["x-query-count"] == "1"
+        finally:
+            await Tortoise.close_connections()
+
+    asyncio.run(run())
+
+
+def test_query_recorder_wraps_later_clients():
+    # 注册之后导入的客户端类在定义时包装
+    _app()
+
+    class LateClient(BaseDBAsyncClient):
+        async def execute_query(self, query, values=None):
+            return 0, []
+
+    assert getattr(LateClient.__dict__["execute_query"], "__fast_recorded__", False)
@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/17 23:55
+# @Author  : Tuffy
+# @Description : raw_response 跳过Pydantic后的响应与默认方式逐字节一致
+import asyncio
+from contextlib import asynccontextmanager
+from decimal import Decimal
+
+import httpx
+import pytest
+from fastapi import APIRouter, FastAPI
+from tortoise import Tortoise, fields, models
+from tortoise.contrib.pydantic import pydantic_model_creator
+
+from fast_cbv import BaseViewSet
+from fast_cbv.responses import ValuesJSONResponse
+
+
+class Product(models.Model):
+    name = fields.CharField(max_length=32)
+    code = fields.CharField(max_length=12, index=True)
+    price = fields.DecimalField(max_digits=10, decimal_places=2)
+    stock = fields.IntField()
+    ratio = fields.FloatField()
+    on_sale = fields.BooleanField(default=False)
+    note = fields.TextField(null=True)
+    created_at = fields.DatetimeField(auto_now_add=True)
+
+    class Meta:
+        app = "models"
+
+
+ProductPydantic = pydantic_model_creator(Product, name="ProductPydantic")
+VIEWS = {"get": None, "all": None, "filter": {"code": (None, str)}}
+URLS = ("/1", "/all", "/filter?code=a", "/filter?code=missing")
+
+
+def _viewset(name: str, **attrs) -> type:
+    return type(name, (BaseViewSet,), dict(model=Product, schema=ProductPydantic, pk_type=int, views=VIEWS, **attrs))
+
+
+PlainViewSet = _viewset("PlainViewSet")
+RawViewSet = _viewset("RawViewSet", raw_response=True)
+PlainPageViewSet = _viewset("PlainPageViewSet", page_size=2)
+RawPageViewSet = _viewset("RawPageViewSet", page_size=2, raw_response=True)
+
+
+def _app() -> FastAPI:
+    router_ = APIRouter()
+    for viewset_ in (PlainViewSet, RawViewSet, PlainPageViewSet, RawPageViewSet):
+        viewset_.register(router_)
+    app_ = FastAPI()
+    app_.include_router(router_)
+    return app_
+
+
+@asynccontextmanager
+async def _products():
+    await Tortoise.init(db_url="sqlite://:memory:", modules={"models": [__name__]})
+    try:
+        await Tortoise.generate_schemas()
+        for idx_ in range(5):
+            await Product.create(
+                name=f"product {idx_} 产品",
+                code="a" if idx_ % 2 else "b",
+                price=Decimal(f"{idx_}.5{idx_}"),
+                stock=idx_ * 10,
+                ratio=idx_ / 3,
+                on_sale=bool(idx_ % 2),
+                note=None if idx_ % 2 else f"note \"{idx_}\"",
+            )
+        yield
+    finally:
+        await Tortoise.close_connections()
+
+
+async def _fetch(prefixes, urls):
+    results_ = {}
+    async with _products():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=_app()), base_url="http://test") as client_:
+            for prefix_ in prefixes:
+                for url_ in urls:
+                    response_ = await client_.get(f"/{prefix_}{url_}")
+                    results_[(prefix_, url_)] = (response_.status_code, response_.content)
+    return results_
+
+
+async def _get(viewset):
+    async with _products():
+        return await viewset().get(1)
+
+
+def test_raw_response_skips_pydantic():
+    assert isinstance(asyncio.run(_get(RawViewSet)), ValuesJSONResponse)
+    assert isinstance(asyncio.run(_get(PlainViewSet)), ProductPydantic)
+
+
+@pytest.mark.parametrize("plain, raw, urls", [
+    ("plain", "raw", URLS),
+    ("plain_page", "raw_page", URLS + ("/all?limit=1", "/all?after=WzJd")),
+])
+def test_raw_response_bytes(plain, raw, urls):
+    results_ = asyncio.run(_fetch((plain, raw), urls))
+    for url_ in urls:
+        assert results_[(plain, url_)][0] == 200
+        assert results_[(raw, url_)] == results_[(plain, url_)], url_
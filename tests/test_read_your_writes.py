@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/18 11:40
+# @Author  : Tuffy
+# @Description : read_your_writes写入后读主库，且不改变修改类视图的响应
+import asyncio
+
+import httpx
+from fastapi import APIRouter, FastAPI, Response
+from fastapi.responses import PlainTextResponse
+
+from fast_cbv import Action, BaseViewSet
+from fast_cbv.db import PRIMARY_COOKIE, use_primary
+
+
+class DraftViewSet(BaseViewSet):
+    read_your_writes = 5
+
+    @Action.post("/text", response_class=PlainTextResponse, status_code=201, mutating=True)
+    async def text(self, response: Response):
+        response.set_cookie("saved", "1")
+        return "saved"
+
+    @Action.post("/failed", mutating=True)
+    async def failed(self, response: Response):
+        response.status_code = 409
+        return {"saved": False}
+
+    @Action.get("/primary")
+    async def primary(self):
+        return {"primary": use_primary.get()}
+
+
+def _app() -> FastAPI:
+    router_ = APIRouter()
+    DraftViewSet.register(router_)
+    app_ = FastAPI()
+    app_.include_router(router_)
+    return app_
+
+
+async def _run():
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=_app()), base_url="http://test") as client_:
+        before_ = await client_.get("/draft/primary")
+        failed_ = await client_.post("/draft/failed")
+        written_ = await client_.post("/draft/text")
+        after_ = await client_.get("/draft/primary")
+        return before_, failed_, written_, after_
+
+
+def test_read_your_writes():
+    before_, failed_, written_, after_ = asyncio.run(_run())
+    assert before_.json() == {"primary": False}
+    assert failed_.status_code == 409 and PRIMARY_COOKIE not in failed_.cookies
+
+    assert written_.status_code == 201 and written_.text == "saved"
+    assert written_.headers["content-type"].startswith("text/plain")
+    assert written_.cookies.get("saved") == "1" and PRIMARY_COOKIE in written_.cookies
+    assert after_.json() == {"primary": True}
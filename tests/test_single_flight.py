@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/18 11:20
+# @Author  : Tuffy
+# @Description : single_flight合并参数相同的并发请求，参数不同或无法按值区分时不合并
+import asyncio
+from typing import List
+
+import httpx
+from fastapi import APIRouter, Depends, FastAPI, HTTPException, Response
+
+from fast_cbv import Action, BaseViewSet
+
+calls: List[str] = []
+
+
+class User(object):
+    def __init__(self, name: str):
+        self.name = name
+
+    def __str__(self) -> str:
+        # 不同用户的str()相同，不能作为合并的依据
+        return "User"
+
+
+def current_user(user: str) -> User:
+    return User(user)
+
+
+class ReportViewSet(BaseViewSet):
+    single_flight = True
+
+    @Action.get("/summary", cache=True)
+    async def summary(self, response: Response, q: int = 0):
+        calls.append(f"summary:{q}")
+        await asyncio.sleep(0.05)
+        response.status_code = 201
+        response.set_cookie("ran", "1")
+        return {"q": q}
+
+    @Action.get("/mine", cache=True)
+    async def mine(self, user: User = Depends(current_user)):
+        calls.append(f"mine:{user.name}")
+        await asyncio.sleep(0.05)
+        return {"user": user.name}
+
+    @Action.get("/missing", cache=True)
+    async def missing(self):
+        calls.append("missing")
+        await asyncio.sleep(0.05)
+        raise HTTPException(status_code=404, detail="missing")
+
+
+def _app() -> FastAPI:
+    router_ = APIRouter()
+    ReportViewSet.register(router_)
+    app_ = FastAPI()
+    app_.include_router(router_)
+    return app_
+
+
+async def _gather(*urls: str) -> List[httpx.Response]:
+    calls.clear()
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=_app()), base_url="http://test") as client_:
+        return list(await asyncio.gather(*(client_.get(url_) for url_ in urls)))
+
+
+def test_single_flight_coalesces():
+    responses_ = asyncio.run(_gather(*["/report/summary?q=1"] * 5))
+    assert calls == ["summary:1"]
+    assert {(r.status_code, r.content) for r in responses_} == {(201, b'{"q":1}')}
+    # cookie只属于执行视图的请求
+    assert sum("set-cookie" in r.headers for r in responses_) == 1
+
+
+def test_single_flight_distinct_params():
+    asyncio.run(_gather("/report/summary?q=1", "/report/summary?q=2"))
+    assert sorted(calls) == ["summary:1", "summary:2"]
+
+
+def test_single_flight_skips_opaque_params():
+    responses_ = asyncio.run(_gather("/report/mine?user=a", "/report/mine?user=b"))
+    assert sorted(calls) == ["mine:a", "mine:b"]
+    assert [r.json() for r in responses_] == [{"user": "a"}, {"user": "b"}]
+
+
+def test_single_flight_shares_errors():
+    responses_ = asyncio.run(_gather(*["/report/missing"] * 3))
+    assert calls == ["missing"]
+    assert [r.status_code for r in responses_] == [404] * 3
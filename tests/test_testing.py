@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/18 12:50
+# @Author  : Tuffy
+# @Description : fast_cbv.testing 中查询次数断言在预算内通过、超出时失败
+import asyncio
+from contextlib import asynccontextmanager
+
+import httpx
+import pytest
+from fastapi import APIRouter, FastAPI
+from tortoise import Tortoise, fields, models
+
+from fast_cbv import Action, BaseViewSet
+from fast_cbv.testing import assert_max_queries, capture_queries, enforce_query_budgets
+
+
+class Badge(models.Model):
+    name = fields.CharField(max_length=32)
+
+    class Meta:
+        app = "models"
+
+
+class BadgeViewSet(BaseViewSet):
+    query_budget = 1
+
+    @Action.get("/one")
+    async def one(self):
+        return await Badge.all().values_list("name", flat=True)
+
+    @Action.get("/each")
+    async def each(self):
+        # 逐行查询，超出预算
+        return [(await Badge.get(pk=pk_)).name for pk_ in await Badge.all().values_list("id", flat=True)]
+
+    @Action.get("/loose", query_budget=10)
+    async def loose(self):
+        return await self.each()
+
+
+def _app() -> FastAPI:
+    router_ = APIRouter()
+    BadgeViewSet.register(router_)
+    app_ = FastAPI()
+    app_.include_router(router_)
+    return app_
+
+
+@asynccontextmanager
+async def _client():
+    app_ = _app()
+    await Tortoise.init(db_url="sqlite://:memory:", modules={"models": [__name__]})
+    try:
+        await Tortoise.generate_schemas()
+        await Badge.bulk_create([Badge(name=f"badge {idx_}") for idx_ in range(3)])
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app_), base_url="http://test") as client_:
+            yield client_
+    finally:
+        await Tortoise.close_connections()
+
+
+def test_capture_queries():
+    async def run():
+        async with _client() as client_:
+            with capture_queries() as queries_:
+                await client_.get("/badge/each")
+            assert len(queries_) == 4 and all(sql_.startswith("SELECT") for sql_ in queries_)
+
+    asyncio.run(run())
+
+
+def test_assert_max_queries():
+    async def run():
+        async with _client() as client_:
+            with assert_max_queries(1) as queries_:
+                await client_.get("/badge/one")
+            assert len(queries_) == 1
+
+            with pytest.raises(AssertionError, match="Expected at most 2 queries, 4 were executed"):
+                with assert_max_queries(2):
+                    await client_.get("/badge/each")
+
+    asyncio.run(run())
+
+
+def test_enforce_query_budgets():
+    async def run():
+        async with _client() as client_:
+            with enforce_query_budgets() as violations_:
+                await client_.get("/badge/one")
+                await client_.get("/badge/loose")
+            assert violations_ == []
+
+            with pytest.raises(AssertionError, match="BadgeViewSet.each executed 4 queries, exceeding its budget of 1"):
+                with enforce_query_budgets() as violations_:
+                    await client_.get("/badge/each")
+            assert [(viewset_, action_, budget_) for viewset_, action_, budget_, _ in violations_] == [
+                ("BadgeViewSet", "each", 1),
+            ]
+
+    asyncio.run(run())
@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/18 16:20
+# @Author  : Tuffy
+# @Description : update、delete视图的 save、update_fields、direct 执行方式
+import asyncio
+from contextlib import asynccontextmanager
+
+import httpx
+from fastapi import APIRouter, FastAPI
+from fastapi.responses import JSONResponse
+from tortoise import Tortoise, fields, models
+from tortoise.contrib.pydantic import pydantic_model_creator
+from tortoise.exceptions import DoesNotExist
+
+from fast_cbv import BaseViewSet
+from fast_cbv.testing import capture_queries
+
+
+class Memo(models.Model):
+    title = fields.CharField(max_length=32)
+    body = fields.TextField(default="")
+    modified_at = fields.DatetimeField(auto_now=True)
+
+    class Meta:
+        app = "models"
+
+
+MemoPydantic = pydantic_model_creator(Memo, name="MemoPydantic")
+MemoIn = pydantic_model_creator(Memo, name="MemoIn", exclude_readonly=True, optional=("title", "body"))
+
+STRATEGIES = ("save", "update_fields", "direct")
+VIEWSETS = tuple(
+    type(f"Memo{strategy_.title().replace('_', '')}ViewSet", (BaseViewSet,), dict(
+        model=Memo, schema=MemoPydantic, pk_type=int, update_strategy=strategy_,
+        views={"get": None, "update": MemoIn, "delete": None},
+    ))
+    for strategy_ in STRATEGIES
+)
+PREFIXES = dict(zip(STRATEGIES, ("/memo_save", "/memo_update_fields", "/memo_direct")))
+
+
+def _app() -> FastAPI:
+    router_ = APIRouter()
+    for viewset_ in VIEWSETS:
+        viewset_.register(router_)
+    app_ = FastAPI()
+    app_.include_router(router_)
+    # 与 register_tortoise(add_exception_handlers=True) 相同，数据不存在时404
+    app_.add_exception_handler(DoesNotExist, lambda request, exc: JSONResponse(status_code=404, content={"detail": str(exc)}))
+    return app_
+
+
+@asynccontextmanager
+async def _client():
+    await Tortoise.init(db_url="sqlite://:memory:", modules={"models": [__name__]})
+    try:
+        await Tortoise.generate_schemas()
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=_app()), base_url="http://test") as client_:
+            yield client_
+    finally:
+        await Tortoise.close_connections()
+
+
+def test_update_strategies():
+    async def run():
+        results_ = {}
+        async with _client() as client_:
+            for strategy_, prefix_ in PREFIXES.items():
+                memo_ = await Memo.create(title="old", body="keep")
+                with capture_queries() as queries_:
+                    response_ = await client_.patch(f"{prefix_}/{memo_.pk}", json={"title": "new"})
+                results_[strategy_] = response_, len(queries_), await Memo.get(pk=memo_.pk), memo_.modified_at
+        return results_
+
+    for strategy_, (response_, queries_, stored_, created_at_) in asyncio.run(run()).items():
+        assert response_.status_code == 200, strategy_
+        assert response_.json()["title"] == "new" and response_.json()["body"] == "keep", strategy_
+        assert stored_.title == "new" and stored_.body == "keep", strategy_
+        # auto_now字段在所有方式下都会刷新
+        assert stored_.modified_at > created_at_, strategy_
+        # direct以 UPDATE ... RETURNING 一次往返完成，其它方式先查询再保存
+        assert queries_ == (1 if strategy_ == "direct" else 2), strategy_
+
+
+def test_update_not_found():
+    async def run():
+        async with _client() as client_:
+            return [(await client_.patch(f"{prefix_}/99", json={"title": "x"})).status_code for prefix_ in PREFIXES.values()]
+
+    assert asyncio.run(run()) == [404, 404, 404]
+
+
+def test_delete_strategies():
+    async def run():
+        results_ = {}
+        async with _client() as client_:
+            for strategy_, prefix_ in PREFIXES.items():
+                memo_ = await Memo.create(title=strategy_)
+                with capture_queries() as queries_:
+                    response_ = await client_.delete(f"{prefix_}/{memo_.pk}")
+                missing_ = await client_.delete(f"{prefix_}/{memo_.pk}")
+                results_[strategy_] = response_, len(queries_), missing_.status_code, await Memo.exists(pk=memo_.pk)
+        return results_
+
+    for strategy_, (response_, queries_, missing_, exists_) in asyncio.run(run()).items():
+        # 所有方式都返回删除的数据
+        assert response_.status_code == 200 and response_.json()["title"] == strategy_, strategy_
+        assert queries_ == (1 if strategy_ == "direct" else 2), strategy_
+        assert missing_ == 404 and not exists_, strategy_